@@ -23,6 +23,7 @@ from performance_model import (
     PerformanceModel, PowerModel, ScalingModel,
     Precision
 )
+from power_capping import capped_operating_point
 
 
 @dataclass
@@ -43,6 +44,7 @@ class ArchitectureVariant:
         fp16_peak = perf_model.peak_compute(Precision.FP16)
         total_power = power_model.total_power(1.0)
         efficiency = power_model.power_efficiency(Precision.FP16, 1.0)
+        capped = capped_operating_point(self.soc_config, 1.0, Precision.FP16)
         
         return {
             'name': self.name,
@@ -51,10 +53,15 @@ class ArchitectureVariant:
             'total_power_w': total_power,
             'efficiency_tflops_per_w': efficiency,
             'total_area_mm2': self.soc_config.total_area_mm2,
-            'num_chiplets': self.soc_config.num_chiplets,
+            'num_chiplets': self.soc_config.total_chiplets,
             'total_sms': self.soc_config.total_sms,
             'meets_density_target': fp16_density >= 2.0,
             'meets_power_target': total_power <= 500.0,
+            # Throttled to fit 500W instead of failing
+            'capped_clock_mhz': float(capped['sustained_clock_mhz']),
+            'capped_tflops': float(capped['capped_tflops']),
+            'capped_density_tflops_per_mm2': float(capped['capped_tflops']) / self.soc_config.total_area_mm2,
+            'capped_power_w': float(capped['total_power_w']),
         }
 
 
@@ -257,8 +264,9 @@ def compare_variants(variants: List[ArchitectureVariant],
     print("\n" + "=" * 100)
     print("ARCHITECTURE VARIANT COMPARISON")
     print("=" * 100)
-    print(f"\n{'Variant':<25} {'FP16 TFLOPS':<15} {'Density':<15} {'Power (W)':<15} {'TFLOPS/W':<15} {'Status':<15}")
-    print("-" * 100)
+    print(f"\n{'Variant':<25} {'FP16 TFLOPS':<15} {'Density':<15} {'Power (W)':<15} {'TFLOPS/W':<15} "
+          f"{'Capped TFLOPS':<15} {'Status':<15}")
+    print("-" * 115)
     
     for r in results:
         density = r['fp16_density_tflops_per_mm2']
@@ -273,7 +281,8 @@ def compare_variants(variants: List[ArchitectureVariant],
             status.append("✗")
         
         print(f"{r['name']:<25} {r['fp16_tflops']:<15.1f} {density:<15.3f} "
-              f"{power:<15.1f} {r['efficiency_tflops_per_w']:<15.2f} {' '.join(status):<15}")
+              f"{power:<15.1f} {r['efficiency_tflops_per_w']:<15.2f} {r['capped_tflops']:<15.1f} "
+              f"{' '.join(status):<15}")
     
     # Create comparison plots
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
@@ -362,6 +371,8 @@ def compare_variants(variants: List[ArchitectureVariant],
         else:
             excess = r['total_power_w'] - 500.0
             print(f"  ✗ Exceeds power target by {excess:.1f} W")
+            print(f"  Capped at 500W: {r['capped_clock_mhz']:.0f} MHz, "
+                  f"{r['capped_tflops']:.1f} TFLOPS ({r['capped_density_tflops_per_mm2']:.3f} TFLOPS/mm²)")
 
 
 def main():
@@ -401,6 +412,14 @@ def main():
         print(f"  Power: {best_density['total_power_w']:.1f} W")
         print(f"  Efficiency: {best_density['efficiency_tflops_per_w']:.2f} TFLOPS/W")
     
+    # Over-budget designs throttle rather than fail; rank by sustained performance
+    best_capped = max(results, key=lambda x: x['capped_density_tflops_per_mm2'])
+    print(f"\n✓ Best configuration throttled to the power target: {best_capped['name']}")
+    print(f"  Sustained clock: {best_capped['capped_clock_mhz']:.0f} MHz")
+    print(f"  Capped FP16: {best_capped['capped_tflops']:.1f} TFLOPS "
+          f"({best_capped['capped_density_tflops_per_mm2']:.3f} TFLOPS/mm²)")
+    print(f"  Power: {best_capped['capped_power_w']:.1f} W")
+    
     # Check if any meet density target
     meets_density = [r for r in results if r['meets_density_target']]
     if not meets_density:
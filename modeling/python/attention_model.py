@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Attention Kernel Model (Naive vs Fused)
+
+Derives attention FLOPs, HBM traffic and intensity from the layer shape
+and the chip instead of the fixed 5 / 50 FLOPS/Byte roofline markers.
+
+Naive (unfused) kernel:
+- QK^T, softmax and PV run as separate kernels; the Sq x Skv score matrix
+  is written and read back twice (scores, then probabilities)
+- Causal masking is applied after computing the full matrix
+- The score matrix must also fit in HBM, which fails at long context
+
+Fused (FlashAttention-style) kernel:
+- A Br-row query tile (all query heads sharing a KV head, packed) stays
+  on chip while Bc-row K/V tiles stream through shared memory; scores
+  and the output accumulator live in registers
+- K/V are re-read once per query tile; fully masked causal tiles are
+  skipped
+- When there are fewer query tiles than SM slots (decode), the KV
+  sequence is split across CTAs (split-KV)
+
+Tiles are chosen per shape against SMConfig.shared_memory_kb and
+register_file_kb, as in gemm_model.py. All shape arguments broadcast, so
+sequence-length sweeps to 128k+ are one call.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import (
+    SoCConfig, PerformanceModel,
+    Precision, BYTES_PER_ELEMENT
+)
+from memory_footprint import TransformerConfig, LLAMA_8B, LLAMA_70B
+from gemm_model import (
+    TILE_MN, PIPELINE_STAGES, ACCUMULATOR_BYTES, ACCUMULATOR_REGISTER_FRACTION
+)
+
+
+# KV tile rows searched for the fused kernel (query tile rows use TILE_MN)
+TILE_KV = (32, 64, 128)
+
+
+@dataclass
+class AttentionShape:
+    """Attention layer shape for a batch of sequences"""
+    batch: int
+    num_heads: int
+    num_kv_heads: int
+    head_dim: int
+    causal: bool = True
+
+    @classmethod
+    def from_transformer(cls, model: TransformerConfig, batch: int = 1) -> 'AttentionShape':
+        return cls(batch, model.num_heads, model.num_kv_heads, model.head_dim)
+
+    @property
+    def group_size(self) -> int:
+        """Query heads per KV head"""
+        return self.num_heads // self.num_kv_heads
+
+
+class AttentionModel:
+    """Attention FLOPs, traffic and time on one SoC configuration"""
+
+    def __init__(self, soc_config: SoCConfig, precision: Precision = Precision.FP16):
+        self.config = soc_config
+        self.precision = precision
+        self.sm_config = soc_config.chiplet_config.sm_config
+        self.perf_model = PerformanceModel(soc_config)
+
+        self.element_bytes = BYTES_PER_ELEMENT[precision]
+        self.peak_flops = self.perf_model.peak_compute(precision) * 1e12
+        self.sm_peak_flops = self.sm_config.peak_tflops(precision) * 1e12
+        self.bandwidth_bytes_per_s = self.perf_model.memory_bandwidth_tbps() * 1e12
+
+    def attended_pairs(self, shape: AttentionShape, q_len: np.ndarray,
+                       kv_len: np.ndarray) -> np.ndarray:
+        """Unmasked (query, key) pairs per head; queries are the last q_len positions"""
+        q_len = np.asarray(q_len, dtype=float)
+        kv_len = np.asarray(kv_len, dtype=float)
+        if not shape.causal:
+            return q_len * kv_len
+        return q_len * kv_len - q_len * (q_len - 1) / 2
+
+    def flops(self, shape: AttentionShape, q_len: np.ndarray,
+              kv_len: np.ndarray) -> np.ndarray:
+        """Useful QK^T + PV FLOPs (masked pairs excluded)"""
+        pairs = self.attended_pairs(shape, q_len, kv_len)
+        return 4.0 * shape.batch * shape.num_heads * shape.head_dim * pairs
+
+    def _qkvo_bytes(self, shape: AttentionShape, q_len, kv_len, kv_reads) -> np.ndarray:
+        """Q read + O write + K/V reads (kv_reads passes over each KV head)"""
+        q_len = np.asarray(q_len, dtype=float)
+        kv_len = np.asarray(kv_len, dtype=float)
+        qo = 2 * shape.batch * shape.num_heads * q_len * shape.head_dim
+        kv = 2 * shape.batch * shape.num_kv_heads * kv_len * shape.head_dim * kv_reads
+        return (qo + kv) * self.element_bytes
+
+    def _result(self, flops, hbm_bytes, compute_time, **extra) -> Dict[str, np.ndarray]:
+        memory_time = hbm_bytes / self.bandwidth_bytes_per_s
+        time = np.maximum(compute_time, memory_time)
+        result = {
+            'flops': flops,
+            'hbm_bytes': hbm_bytes,
+            'arithmetic_intensity': flops / hbm_bytes,
+            'time_ms': time * 1e3,
+            'achieved_tflops': flops / time / 1e12,
+            'memory_bound': memory_time > compute_time,
+        }
+        result.update(extra)
+        return result
+
+    def naive(self, shape: AttentionShape, q_len: np.ndarray,
+              kv_len: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Unfused attention: QK^T -> HBM -> softmax -> HBM -> PV
+
+        Args:
+            shape: Layer shape
+            q_len: Query tokens per sequence (prefill: sequence length; decode: 1)
+            kv_len: Keys per sequence (context length)
+
+        Returns:
+            Dictionary of arrays with the broadcast shape of q_len/kv_len
+        """
+        q_len, kv_len = np.broadcast_arrays(np.asarray(q_len, dtype=float),
+                                            np.asarray(kv_len, dtype=float))
+        scores = shape.batch * shape.num_heads * q_len * kv_len
+        score_bytes = scores * self.element_bytes
+
+        # K/V are broadcast to every query head of the group
+        hbm_bytes = self._qkvo_bytes(shape, q_len, kv_len, shape.group_size) + 4 * score_bytes
+        computed_flops = 4.0 * shape.head_dim * scores  # full matrix, masked after
+        fits_hbm = score_bytes <= self.config.total_hbm_capacity_gb * 1e9
+
+        return self._result(self.flops(shape, q_len, kv_len), hbm_bytes,
+                            computed_flops / self.peak_flops,
+                            score_bytes=score_bytes, fits_hbm=fits_hbm)
+
+    def fused_tiles(self, head_dim: int) -> Dict[str, np.ndarray]:
+        """Query/KV tile sizes that fit shared memory and the register budget"""
+        br, bc = (a.ravel() for a in np.meshgrid(TILE_MN, TILE_KV, indexing='ij'))
+        d = head_dim
+
+        smem_tile = (br * d + PIPELINE_STAGES * 2 * bc * d) * self.element_bytes
+        regs_tile = (br * bc + br * d) * ACCUMULATOR_BYTES  # scores + output accumulator
+        smem_budget = self.sm_config.shared_memory_kb * 1024
+        regs_budget = self.sm_config.register_file_kb * 1024 * ACCUMULATOR_REGISTER_FRACTION
+
+        ctas = np.minimum(smem_budget // smem_tile, regs_budget // regs_tile).astype(np.int64)
+        fits = ctas >= 1
+        if not fits.any():
+            raise ValueError(f"No attention tile fits head_dim {d} in "
+                             f"{self.sm_config.shared_memory_kb} KB shared memory / "
+                             f"{self.sm_config.register_file_kb} KB registers")
+        return {'q': br[fits], 'kv': bc[fits], 'ctas_per_sm': ctas[fits]}
+
+    def fused(self, shape: AttentionShape, q_len: np.ndarray,
+              kv_len: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Fused attention with on-chip softmax, GQA packing and split-KV
+
+        Args:
+            shape: Layer shape
+            q_len: Query tokens per sequence (prefill: sequence length; decode: 1)
+            kv_len: Keys per sequence (context length)
+
+        Returns:
+            Dictionary of arrays with the broadcast shape of q_len/kv_len,
+            including the chosen tile and KV split
+        """
+        q_len, kv_len = np.broadcast_arrays(np.asarray(q_len, dtype=float),
+                                            np.asarray(kv_len, dtype=float))
+        t = self.fused_tiles(shape.head_dim)
+        br, bc, ctas = t['q'], t['kv'], t['ctas_per_sm']
+
+        # Trailing tile axis
+        q = q_len[..., np.newaxis]
+        kv = kv_len[..., np.newaxis]
+        pairs = self.attended_pairs(shape, q, kv)
+        keys_per_query = pairs / q  # average visible keys (causal tiles skipped)
+
+        rows = q * shape.group_size
+        q_tiles = np.ceil(rows / br)
+        kv_tiles = np.ceil(keys_per_query / bc)
+        work = shape.batch * shape.num_kv_heads * q_tiles
+
+        # Split the KV sequence when query tiles alone cannot fill the SMs
+        slots = self.config.total_sms * ctas
+        splits = np.clip(np.ceil(slots / work), 1, kv_tiles)
+        items = work * splits
+        waves = np.ceil(items / slots)
+        item_time = 4.0 * br * np.ceil(kv_tiles / splits) * bc * shape.head_dim / (
+            self.sm_peak_flops / ctas)
+        compute_time = waves * item_time
+
+        kv_bytes = (2 * shape.batch * shape.num_kv_heads * keys_per_query *
+                    shape.head_dim * q_tiles * self.element_bytes)
+        qo_bytes = self._qkvo_bytes(shape, q, 0, 0)
+        hbm_bytes = kv_bytes + qo_bytes
+        time = np.maximum(compute_time, hbm_bytes / self.bandwidth_bytes_per_s)
+
+        best = np.argmin(time, axis=-1)[..., np.newaxis]
+        pick = lambda x: np.take_along_axis(np.broadcast_to(x, time.shape), best, -1)[..., 0]
+
+        return self._result(self.flops(shape, q_len, kv_len), pick(hbm_bytes),
+                            pick(compute_time),
+                            tile_q=pick(br), tile_kv=pick(bc), kv_splits=pick(splits),
+                            fits_hbm=np.ones(q_len.shape, dtype=bool))
+
+    def kernel(self, name: str):
+        kernels = {'naive': self.naive, 'fused': self.fused}
+        if name not in kernels:
+            raise ValueError(f"Unknown attention kernel: {name}")
+        return kernels[name]
+
+    def prefill(self, shape: AttentionShape, seq_len: np.ndarray,
+                kernel: str = 'fused') -> Dict[str, np.ndarray]:
+        """Attention over a full prompt of seq_len tokens"""
+        return self.kernel(kernel)(shape, seq_len, seq_len)
+
+    def decode(self, shape: AttentionShape, context: np.ndarray,
+               kernel: str = 'fused') -> Dict[str, np.ndarray]:
+        """Attention for one new token per sequence against the context"""
+        return self.kernel(kernel)(shape, np.ones_like(np.asarray(context)), context)
+
+
+def main():
+    """Long-context attention projections from chip parameters"""
+    print("=" * 100)
+    print("NexGen-AI SoC Attention Kernel Model")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    perf_model = PerformanceModel(soc)
+    model = AttentionModel(soc, Precision.FP16)
+    seq = 2 ** np.arange(10, 19)  # 1k .. 256k
+
+    for transformer in (LLAMA_8B, LLAMA_70B):
+        prefill_shape = AttentionShape.from_transformer(transformer, batch=1)
+        decode_shape = AttentionShape.from_transformer(transformer, batch=16)
+        results = {
+            'Prefill (naive)': model.prefill(prefill_shape, seq, 'naive'),
+            'Prefill (fused)': model.prefill(prefill_shape, seq, 'fused'),
+            'Decode b16 (naive)': model.decode(decode_shape, seq, 'naive'),
+            'Decode b16 (fused)': model.decode(decode_shape, seq, 'fused'),
+        }
+
+        print(f"\n{transformer.name}, one layer, FP16 "
+              f"(heads {transformer.num_heads}/{transformer.num_kv_heads}, "
+              f"head dim {transformer.head_dim})")
+        print(f"\n{'Seq Len':<10}" + ''.join(f"{name + ' AI / ms':<30}" for name in results))
+        print("-" * 130)
+        for i, s in enumerate(seq):
+            cells = []
+            for r in results.values():
+                ms = f"{r['time_ms'][i]:.3f}" if r['fits_hbm'][i] else 'OOM'
+                cells.append(f"{r['arithmetic_intensity'][i]:.1f} / {ms}")
+            print(f"{s:<10}" + ''.join(f"{c:<30}" for c in cells))
+
+        fused = results['Prefill (fused)']
+        decode = results['Decode b16 (fused)']
+        print(f"\nFused prefill tile: {fused['tile_q'][-1]:.0f}x{fused['tile_kv'][-1]:.0f}; "
+              f"decode tile {decode['tile_q'][-1]:.0f}x{decode['tile_kv'][-1]:.0f} "
+              f"with {decode['kv_splits'][-1]:.0f}-way split-KV")
+
+    # Roofline with derived attention intensities (70B, 8k prefill)
+    shape = AttentionShape.from_transformer(LLAMA_70B)
+    workloads = {
+        'Attention (Fused, 8k prefill)':
+            float(model.prefill(shape, 8192, 'fused')['arithmetic_intensity']),
+        'Attention (Naive, 8k prefill)':
+            float(model.prefill(shape, 8192, 'naive')['arithmetic_intensity']),
+        'Attention (Fused, 8k decode)':
+            float(model.decode(shape, 8192, 'fused')['arithmetic_intensity']),
+        'Elementwise': 0.5,
+    }
+
+    sweep = np.logspace(10, 17.5, 200, base=2)
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for kernel, style in (('fused', '-'), ('naive', '--')):
+        for phase, fn in (('Prefill', model.prefill), ('Decode b16', model.decode)):
+            batch = 1 if phase == 'Prefill' else 16
+            r = fn(AttentionShape.from_transformer(LLAMA_70B, batch), sweep, kernel)
+            label = f'{phase} ({kernel})'
+            axes[0].loglog(sweep, r['arithmetic_intensity'], style, linewidth=2, label=label)
+            axes[1].loglog(sweep, np.where(r['fits_hbm'], r['achieved_tflops'], np.nan),
+                           style, linewidth=2, label=label)
+    ridge = perf_model.peak_compute(Precision.FP16) / perf_model.memory_bandwidth_tbps()
+    axes[0].axhline(ridge, color='r', linestyle=':', label='Ridge Point')
+    axes[0].set_ylabel('Arithmetic Intensity (FLOPS/Byte)', fontsize=12)
+    axes[1].set_ylabel('Achieved TFLOPS', fontsize=12)
+    for ax in axes:
+        ax.set_xlabel('Sequence / Context Length (tokens)', fontsize=12)
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=9)
+    fig.suptitle(f'Attention vs Context Length - {LLAMA_70B.name}, FP16', fontsize=14)
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'attention_model.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Attention sweep plot saved: {save_path}")
+
+    roofline_path = os.path.join(outputs_dir, 'roofline_attention.png')
+    perf_model.plot_roofline(Precision.FP16, save_path=roofline_path, workloads=workloads)
+    print(f"✓ Roofline with derived attention intensities saved: {roofline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Forward-Mode Automatic Differentiation
+
+Exact gradients of any model metric with respect to every numeric config
+field, from a single evaluation. Each seeded parameter is replaced by a
+Dual number carrying a value and a gradient vector; the models in
+performance_model.py are plain arithmetic on their inputs, so duals flow
+through them unchanged and the metric comes back with its full gradient.
+
+Gradients are stored with the derivative axis last (value shape + (n,)),
+so duals may also hold array values and broadcast like NumPy arrays.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import copy
+import numpy as np
+from dataclasses import fields, is_dataclass
+from typing import Callable, Dict, List, Tuple
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import (
+    SoCConfig, ChipletConfig, SMConfig,
+    PerformanceModel, PowerModel,
+    Precision
+)
+from batch_model import get_param, set_param, POWER_PREFIX, POWER_TARGET_W
+
+
+def _value(x):
+    return x.value if isinstance(x, Dual) else x
+
+
+def _grad(x, n: int):
+    """Gradient of x with the derivative axis last (zeros for constants)"""
+    if isinstance(x, Dual):
+        return x.grad
+    return np.zeros(np.shape(x) + (n,))
+
+
+def _expand(v):
+    """Add a trailing axis so a value broadcasts against gradients"""
+    return np.asarray(v)[..., np.newaxis]
+
+
+class Dual:
+    """Dual number: value plus gradient w.r.t. n seeded inputs"""
+
+    def __init__(self, value, grad):
+        self.value = value
+        self.grad = np.asarray(grad, dtype=float)
+
+    @classmethod
+    def variable(cls, value, index: int, n: int) -> 'Dual':
+        """Seed input number `index` of n"""
+        grad = np.zeros(np.shape(value) + (n,))
+        grad[..., index] = 1.0
+        return cls(value, grad)
+
+    @property
+    def n(self) -> int:
+        return self.grad.shape[-1]
+
+    def __repr__(self):
+        return f"Dual(value={self.value}, grad={self.grad})"
+
+    # Arithmetic goes through __array_ufunc__ so ndarray (op) Dual also works
+    def __add__(self, other): return np.add(self, other)
+    def __radd__(self, other): return np.add(other, self)
+    def __sub__(self, other): return np.subtract(self, other)
+    def __rsub__(self, other): return np.subtract(other, self)
+    def __mul__(self, other): return np.multiply(self, other)
+    def __rmul__(self, other): return np.multiply(other, self)
+    def __truediv__(self, other): return np.true_divide(self, other)
+    def __rtruediv__(self, other): return np.true_divide(other, self)
+    def __pow__(self, other): return np.power(self, other)
+    def __rpow__(self, other): return np.power(other, self)
+    def __neg__(self): return np.negative(self)
+    def __pos__(self): return self
+    def __abs__(self): return np.absolute(self)
+
+    # Comparisons act on values only
+    def __lt__(self, other): return _value(self) < _value(other)
+    def __le__(self, other): return _value(self) <= _value(other)
+    def __gt__(self, other): return _value(self) > _value(other)
+    def __ge__(self, other): return _value(self) >= _value(other)
+
+    def __float__(self):
+        return float(self.value)
+
+    def __getitem__(self, idx):
+        value = np.asarray(self.value)[idx]
+        return Dual(value, self.grad[idx])
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs.get('out') is not None:
+            return NotImplemented
+
+        n = next(x.n for x in inputs if isinstance(x, Dual))
+        values = [_value(x) for x in inputs]
+        grads = [_grad(x, n) for x in inputs]
+
+        if ufunc in (np.less, np.less_equal, np.greater, np.greater_equal,
+                     np.equal, np.not_equal):
+            return ufunc(*values)
+
+        if ufunc is np.add:
+            a, b = values
+            return Dual(a + b, grads[0] + grads[1])
+        if ufunc is np.subtract:
+            a, b = values
+            return Dual(a - b, grads[0] - grads[1])
+        if ufunc is np.multiply:
+            a, b = values
+            return Dual(a * b, grads[0] * _expand(b) + _expand(a) * grads[1])
+        if ufunc is np.true_divide:
+            a, b = values
+            value = a / b
+            return Dual(value, (grads[0] - _expand(value) * grads[1]) / _expand(b))
+        if ufunc is np.power:
+            a, b = values
+            value = np.power(a, b)
+            grad = _expand(b * np.power(a, b - 1)) * grads[0]
+            if isinstance(inputs[1], Dual):
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    log_a = np.where(np.asarray(a) > 0, np.log(np.maximum(a, 1e-300)), 0.0)
+                grad = grad + _expand(value * log_a) * grads[1]
+            return Dual(value, grad)
+        if ufunc is np.negative:
+            return Dual(-values[0], -grads[0])
+        if ufunc is np.absolute:
+            return Dual(np.abs(values[0]), _expand(np.sign(values[0])) * grads[0])
+        if ufunc is np.square:
+            return Dual(np.square(values[0]), _expand(2 * values[0]) * grads[0])
+        if ufunc is np.sqrt:
+            value = np.sqrt(values[0])
+            with np.errstate(divide='ignore'):
+                return Dual(value, grads[0] / _expand(2 * value))
+        if ufunc is np.exp:
+            value = np.exp(values[0])
+            return Dual(value, _expand(value) * grads[0])
+        if ufunc is np.log:
+            return Dual(np.log(values[0]), grads[0] / _expand(values[0]))
+        if ufunc in (np.minimum, np.maximum):
+            a, b = values
+            pick_a = (a <= b) if ufunc is np.minimum else (a >= b)
+            value = np.where(pick_a, a, b)
+            grad = np.where(_expand(pick_a), grads[0], grads[1])
+            return Dual(value, grad)
+
+        return NotImplemented
+
+
+def numeric_param_paths(soc: SoCConfig, include_power: bool = True) -> List[str]:
+    """
+    List every numeric configuration field as a dotted path
+
+    Args:
+        soc: SoC configuration to walk
+        include_power: Also list PowerModel coefficients ('power.' paths)
+
+    Returns:
+        List of dotted parameter paths
+    """
+    paths = []
+    seen = set()
+
+    def walk(obj, prefix):
+        # chiplet_config aliases a group's config in heterogeneous SoCs
+        if id(obj) in seen:
+            return
+        seen.add(id(obj))
+        for f in fields(obj):
+            value = getattr(obj, f.name)
+            path = prefix + f.name
+            if is_dataclass(value):
+                walk(value, path + '.')
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    if is_dataclass(item):
+                        walk(item, f"{path}.{i}.")
+            elif isinstance(value, dict):
+                paths.extend(f"{path}.{key.name}" for key in value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                paths.append(path)
+
+    walk(soc, '')
+    if include_power:
+        for name, value in vars(PowerModel(soc)).items():
+            if isinstance(value, dict):
+                paths.extend(f"{POWER_PREFIX}{name}.{key.name}" for key in value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                paths.append(POWER_PREFIX + name)
+    return paths
+
+
+def dual_models(base_soc: SoCConfig, paths: List[str],
+                values: np.ndarray = None) -> Tuple[SoCConfig, PerformanceModel, PowerModel]:
+    """
+    Build models with the given parameters seeded as Dual inputs
+
+    Args:
+        base_soc: Base SoC configuration (left unmodified)
+        paths: Dotted parameter paths to differentiate against
+        values: Optional values for the paths (default: current values)
+
+    Returns:
+        Tuple of (soc_config, performance_model, power_model)
+    """
+    soc = copy.deepcopy(base_soc)
+    power_model = PowerModel(soc)
+    n = len(paths)
+    for i, path in enumerate(paths):
+        value = float(values[i]) if values is not None else float(get_param(soc, path, power_model))
+        set_param(soc, path, Dual.variable(value, i, n), power_model)
+    return soc, PerformanceModel(soc), power_model
+
+
+def value_and_grad(
+    base_soc: SoCConfig,
+    metric_func: Callable,
+    paths: List[str] = None
+) -> Tuple[float, Dict[str, float]]:
+    """
+    Evaluate a metric and its exact gradient in one pass
+
+    Args:
+        base_soc: Design point
+        metric_func: Function (soc, perf_model, power_model) -> metric
+        paths: Parameters to differentiate against (default: all numeric fields)
+
+    Returns:
+        Tuple of (metric value, {path: d metric / d parameter})
+    """
+    paths = paths if paths is not None else numeric_param_paths(base_soc)
+    result = metric_func(*dual_models(base_soc, paths))
+    if not isinstance(result, Dual):
+        return float(result), {path: 0.0 for path in paths}
+    return float(result.value), dict(zip(paths, result.grad.tolist()))
+
+
+def elasticities(
+    base_soc: SoCConfig,
+    metric_func: Callable,
+    paths: List[str] = None
+) -> Dict[str, float]:
+    """
+    Normalized sensitivities d ln(metric) / d ln(parameter)
+
+    An elasticity of 1.0 means a 1% parameter change moves the metric 1%.
+    """
+    paths = paths if paths is not None else numeric_param_paths(base_soc)
+    value, grad = value_and_grad(base_soc, metric_func, paths)
+    power_model = PowerModel(base_soc)
+    return {path: grad[path] * float(get_param(base_soc, path, power_model)) / value
+            for path in paths}
+
+
+def objective(
+    base_soc: SoCConfig,
+    metric_func: Callable,
+    paths: List[str]
+) -> Callable[[np.ndarray], Tuple[float, np.ndarray]]:
+    """
+    Wrap a metric as f(x) -> (value, gradient) over a parameter vector
+
+    Suitable for gradient-based optimizers that accept a combined
+    value/Jacobian callable (e.g. scipy.optimize.minimize with jac=True).
+    """
+    def func(x: np.ndarray) -> Tuple[float, np.ndarray]:
+        result = metric_func(*dual_models(base_soc, paths, x))
+        if not isinstance(result, Dual):
+            return float(result), np.zeros(len(paths))
+        return float(result.value), np.array(result.grad, dtype=float)
+
+    return func
+
+
+def main():
+    """Exact elasticities at the baseline design point"""
+    from scipy.optimize import minimize
+
+    print("=" * 100)
+    print("NexGen-AI SoC Automatic Differentiation")
+    print("=" * 100)
+
+    base_soc = SoCConfig(chiplet_config=ChipletConfig(sm_config=SMConfig()))
+
+    metrics = {
+        'Density': lambda soc, perf, power: perf.compute_density(Precision.FP16),
+        'Power': lambda soc, perf, power: power.total_power(1.0),
+        'TFLOPS/W': lambda soc, perf, power: power.power_efficiency(Precision.FP16, 1.0),
+        'GEMM TFLOPS': lambda soc, perf, power: perf.roofline_performance(
+            np.array([100.0]), Precision.FP16)[0],
+    }
+
+    paths = numeric_param_paths(base_soc)
+    results = {name: elasticities(base_soc, func, paths) for name, func in metrics.items()}
+
+    print(f"\nElasticities d ln(metric) / d ln(parameter), {len(paths)} parameters, "
+          f"one evaluation per metric")
+    print(f"\n{'Parameter':<58}" + ''.join(f"{name:<14}" for name in metrics))
+    print("-" * 114)
+    for path in paths:
+        row = [results[name][path] for name in metrics]
+        if any(abs(v) > 1e-12 for v in row):
+            print(f"{path:<58}" + ''.join(f"{v:<14.3f}" for v in row))
+
+    # Cross-check one derivative against a central finite difference
+    path = 'chiplet_config.sm_config.clock_mhz'
+    _, grad = value_and_grad(base_soc, metrics['Density'], [path])
+    h = 1.0
+    plus, minus = copy.deepcopy(base_soc), copy.deepcopy(base_soc)
+    set_param(plus, path, 2000 + h)
+    set_param(minus, path, 2000 - h)
+    fd = (PerformanceModel(plus).compute_density(Precision.FP16) -
+          PerformanceModel(minus).compute_density(Precision.FP16)) / (2 * h)
+    print(f"\nd density / d clock: AD = {grad[path]:.6e}, finite difference = {fd:.6e}")
+
+    # Gradient-based design search over continuous parameters
+    print("\n" + "=" * 100)
+    print("GRADIENT-BASED DESIGN SEARCH")
+    print("=" * 100)
+
+    design_paths = [
+        'chiplet_config.num_sms',
+        'chiplet_config.area_mm2',
+        'chiplet_config.sm_config.clock_mhz',
+    ]
+    bounds = [(16, 64), (250, 450), (1500, 3000)]
+    density = objective(base_soc, metrics['Density'], design_paths)
+    power = objective(base_soc, metrics['Power'], design_paths)
+
+    x0 = np.array([float(get_param(base_soc, p)) for p in design_paths])
+    result = minimize(
+        lambda x: tuple(-v for v in density(x)), x0, jac=True,
+        bounds=bounds, method='SLSQP',
+        constraints=[{
+            'type': 'ineq',
+            'fun': lambda x: POWER_TARGET_W - power(x)[0],
+            'jac': lambda x: -power(x)[1],
+        }],
+    )
+
+    print(f"\nMaximize FP16 density subject to power <= {POWER_TARGET_W:.0f} W "
+          f"({result.nit} iterations, {result.nfev} evaluations)")
+    for path, start, end in zip(design_paths, x0, result.x):
+        print(f"  {path:<40} {start:>8.1f} -> {end:>8.1f}")
+    print(f"  Density: {density(x0)[0]:.3f} -> {density(result.x)[0]:.3f} TFLOPS/mm²")
+    print(f"  Power:   {power(x0)[0]:.1f} -> {power(result.x)[0]:.1f} W")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Batch Evaluation Helpers
+
+Evaluates the analytic models in performance_model.py over many design
+points at once. Instead of building one dataclass per design point, a
+single SoCConfig is built whose fields hold NumPy arrays; the model
+formulas are plain arithmetic, so every metric comes back as an array.
+
+Parameters are addressed by dotted paths relative to SoCConfig, e.g.
+'num_chiplets', 'chiplet_config.num_sms',
+'chiplet_config.sm_config.clock_mhz' or
+'chiplet_config.sm_config.tensor_core_ops_per_cycle.FP16'. Integer
+components index lists, so heterogeneous SoCs are addressed as e.g.
+'chiplet_groups.1.count' (their num_chiplets is derived and cannot be
+set). Paths starting with 'power.' address PowerModel coefficients
+such as 'power.sm_dynamic_power_mw'.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import copy
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Tuple
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+import profiling
+from performance_model import (
+    SoCConfig, PerformanceModel, PowerModel,
+    Precision
+)
+
+
+# PRD targets used throughout the exploration tools
+DENSITY_TARGET = 2.0  # TFLOPS/mm² (FP16)
+POWER_TARGET_W = 500.0
+
+POWER_PREFIX = 'power.'
+
+
+def _child(obj, key: str):
+    """Resolve one component of a dotted path"""
+    if isinstance(obj, list):
+        try:
+            return obj[int(key)]
+        except (ValueError, IndexError):
+            raise ValueError(f"Unknown parameter: {key}")
+    if isinstance(obj, dict):
+        try:
+            return obj[Precision[key]]
+        except KeyError:
+            raise ValueError(f"Unknown parameter: {key}")
+    if not hasattr(obj, key):
+        raise ValueError(f"Unknown parameter: {key}")
+    return getattr(obj, key)
+
+
+def get_param(soc: SoCConfig, path: str, power_model: PowerModel = None):
+    """
+    Read a parameter by dotted path
+
+    Args:
+        soc: SoC configuration
+        path: Dotted parameter path
+        power_model: PowerModel used for 'power.' paths (default: PowerModel(soc))
+
+    Returns:
+        Parameter value
+    """
+    if path.startswith(POWER_PREFIX):
+        obj = power_model if power_model is not None else PowerModel(soc)
+        path = path[len(POWER_PREFIX):]
+    else:
+        obj = soc
+    for key in path.split('.'):
+        obj = _child(obj, key)
+    return obj
+
+
+def set_param(soc: SoCConfig, path: str, value, power_model: PowerModel = None) -> None:
+    """
+    Assign a parameter in place by dotted path
+
+    Args:
+        soc: SoC configuration to modify
+        path: Dotted parameter path
+        value: New value (scalar or array)
+        power_model: PowerModel receiving 'power.' paths
+    """
+    if path.startswith(POWER_PREFIX):
+        if power_model is None:
+            raise ValueError(f"Parameter {path} requires a PowerModel")
+        obj = power_model
+        path = path[len(POWER_PREFIX):]
+    else:
+        obj = soc
+        if path == 'num_chiplets' and soc.chiplet_groups is not None:
+            raise ValueError("num_chiplets is derived from chiplet_groups on heterogeneous SoCs; "
+                             "set chiplet_groups.<i>.count instead")
+
+    *parents, leaf = path.split('.')
+    for key in parents:
+        obj = _child(obj, key)
+
+    if isinstance(obj, dict):
+        _child(obj, leaf)  # validates the key
+        obj[Precision[leaf]] = value
+    else:
+        _child(obj, leaf)
+        setattr(obj, leaf, value)
+
+    # Keep the derived chiplet count in step with the group counts
+    if obj is not soc and soc.chiplet_groups is not None and parents[:1] == ['chiplet_groups']:
+        soc.num_chiplets = soc.total_chiplets
+
+
+@profiling.timed('batch_model.batch_models')
+def batch_models(
+    base_soc: SoCConfig,
+    overrides: Dict[str, np.ndarray]
+) -> Tuple[SoCConfig, PerformanceModel, PowerModel]:
+    """
+    Build models whose parameters are arrays
+
+    The base configuration is deep-copied and every override is assigned
+    at its dotted path. Overrides must be mutually broadcastable; use
+    shapes such as (n, 1) and (1, m) to build grids.
+
+    Args:
+        base_soc: Base SoC configuration (left unmodified)
+        overrides: Mapping of dotted path -> array of values
+
+    Returns:
+        Tuple of (soc_config, performance_model, power_model)
+    """
+    soc = copy.deepcopy(base_soc)
+    power_model = PowerModel(soc)
+
+    for path, values in overrides.items():
+        set_param(soc, path, np.asarray(values), power_model)
+
+    # The SM config reference is captured at construction time
+    return soc, PerformanceModel(soc), power_model
+
+
+@profiling.timed('batch_model.evaluate_batch')
+def evaluate_batch(
+    base_soc: SoCConfig,
+    overrides: Dict[str, np.ndarray],
+    precision: Precision = Precision.FP16,
+    utilization: float = 1.0
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate density, power and efficiency over arrays of parameters
+
+    Args:
+        base_soc: Base SoC configuration
+        overrides: Mapping of dotted path -> array of values
+        precision: Compute precision
+        utilization: Workload utilization (0.0-1.0)
+
+    Returns:
+        Dictionary of metric arrays broadcast to a common shape
+    """
+    soc, perf_model, power_model = batch_models(base_soc, overrides)
+
+    peak = perf_model.peak_compute(precision)
+    density = perf_model.compute_density(precision)
+    power = power_model.total_power(utilization, precision)
+    efficiency = peak * utilization / power
+
+    peak, density, power, efficiency, area = np.broadcast_arrays(
+        peak, density, power, efficiency, soc.total_area_mm2
+    )
+    profiling.evaluations('batch_model.evaluate_batch', peak.size)
+
+    return {
+        'peak_tflops': peak,
+        'density_tflops_per_mm2': density,
+        'total_power_w': power,
+        'efficiency_tflops_per_w': efficiency,
+        'total_area_mm2': area,
+    }
+
+
+def _evaluate_rows(
+    samples: np.ndarray,
+    base_soc: SoCConfig,
+    paths: List[str],
+    precision: Precision,
+    utilization: float
+) -> Dict[str, np.ndarray]:
+    """Evaluate a block of sample rows (one column per path)"""
+    overrides = {path: samples[:, i] for i, path in enumerate(paths)}
+    return evaluate_batch(base_soc, overrides, precision, utilization)
+
+
+def evaluate_samples(
+    base_soc: SoCConfig,
+    paths: List[str],
+    samples: np.ndarray,
+    precision: Precision = Precision.FP16,
+    utilization: float = 1.0,
+    workers: int = 1,
+    chunk_size: int = 1_000_000
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate a sample matrix, optionally split across worker processes
+
+    Args:
+        base_soc: Base SoC configuration
+        paths: Dotted parameter path for each column of samples
+        samples: Array of shape (num_samples, len(paths))
+        precision: Compute precision
+        utilization: Workload utilization (0.0-1.0)
+        workers: Number of worker processes
+        chunk_size: Maximum rows evaluated at once (bounds peak memory)
+
+    Returns:
+        Dictionary of 1-D metric arrays, one entry per sample row
+    """
+    samples = np.asarray(samples, dtype=float)
+    num_chunks = max(-(-len(samples) // chunk_size), workers)
+    blocks = np.array_split(samples, num_chunks)
+    func = partial(_evaluate_rows, base_soc=base_soc, paths=paths,
+                   precision=precision, utilization=utilization)
+
+    with profiling.stage('batch_model.evaluate_samples', len(samples)):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(func, blocks))
+        else:
+            results = [func(block) for block in blocks]
+
+    return {name: np.concatenate([r[name] for r in results])
+            for name in results[0]}
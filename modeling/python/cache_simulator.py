@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Trace-Driven Set-Associative Cache Simulator
+
+The stack-distance model in reuse_distance.py assumes a fully-
+associative LRU cache. This simulator checks associativity and line-size
+effects of the SMConfig.l1_cache_kb and ChipletConfig.l2_cache_mb
+choices against real traces.
+
+Simulation is exact set-associative LRU, vectorized across sets: within
+a chunk of the trace, accesses are grouped by set and processed in
+rounds, where round r handles the r-th access to every set at once.
+Accesses to different sets are independent, so each round is a handful
+of NumPy operations over all active sets. Traces are memory-mapped and
+streamed in chunks, and every configured cache is advanced on each chunk,
+so many configurations are simulated in a single pass over the trace.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from typing import Dict, List
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, PerformanceModel, Precision
+from reuse_distance import (
+    ReuseProfile, load_trace, synthetic_trace,
+    effective_arithmetic_intensity
+)
+
+
+@dataclass
+class CacheConfig:
+    """Geometry of one set-associative cache"""
+    name: str
+    capacity_bytes: int
+    line_bytes: int = 128
+    ways: int = 16
+    upstream: str = None  # name of a cache whose misses feed this one
+
+    @property
+    def num_sets(self) -> int:
+        return max(self.capacity_bytes // (self.line_bytes * self.ways), 1)
+
+
+def soc_cache_configs(soc: SoCConfig, line_bytes: int = 128,
+                      l1_ways: int = 4, l2_ways: int = 16) -> List[CacheConfig]:
+    """
+    L1 -> L2 hierarchy of a SoC for a chip-wide trace
+
+    Matches reuse_distance.cache_traffic: L1 is aggregated over all SMs and
+    L2 over all chiplets; L2 sees only L1 misses.
+    """
+    l1 = soc.total_sms * soc.chiplet_config.sm_config.l1_cache_kb * 1024
+    l2 = soc.total_l2_cache_mb * 1024 ** 2
+    return [
+        CacheConfig('L1', l1, line_bytes, l1_ways),
+        CacheConfig('L2', l2, line_bytes, l2_ways, upstream='L1'),
+    ]
+
+
+class SetAssociativeCache:
+    """LRU set-associative cache state, advanced in vectorized batches"""
+
+    def __init__(self, config: CacheConfig):
+        self.config = config
+        self.tags = np.full((config.num_sets, config.ways), -1, dtype=np.int64)
+        self.stamps = np.full((config.num_sets, config.ways), -1, dtype=np.int64)
+        self.time = 0
+        self.accesses = 0
+        self.hits = 0
+
+    def access(self, addresses: np.ndarray) -> np.ndarray:
+        """
+        Simulate a batch of accesses in order
+
+        Args:
+            addresses: Byte addresses in program order
+
+        Returns:
+            Boolean hit mask aligned with addresses
+        """
+        cfg = self.config
+        m = len(addresses)
+        hit = np.zeros(m, dtype=bool)
+        if m == 0:
+            return hit
+
+        lines = np.asarray(addresses, dtype=np.uint64) // np.uint64(cfg.line_bytes)
+        set_idx = (lines % np.uint64(cfg.num_sets)).astype(np.int64)
+        tag = (lines // np.uint64(cfg.num_sets)).astype(np.int64)
+        stamp = self.time + np.arange(m, dtype=np.int64)
+
+        # Rank of each access among the accesses to its set
+        by_set = np.argsort(set_idx, kind='stable')
+        counts = np.bincount(set_idx, minlength=cfg.num_sets)
+        starts = np.cumsum(counts) - counts
+        rank = np.empty(m, dtype=np.int64)
+        rank[by_set] = np.arange(m) - starts[set_idx[by_set]]
+
+        # Round r = the r-th access to every set; sets within a round are distinct
+        by_round = np.argsort(rank, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(rank))])
+
+        tags, stamps = self.tags, self.stamps
+        for r in range(len(bounds) - 1):
+            idx = by_round[bounds[r]:bounds[r + 1]]
+            s, g = set_idx[idx], tag[idx]
+
+            match = tags[s] == g[:, np.newaxis]
+            is_hit = match.any(axis=1)
+            # Hit: touch the matching way; miss: fill invalid/LRU way
+            way = np.where(is_hit, match.argmax(axis=1), stamps[s].argmin(axis=1))
+            tags[s, way] = g
+            stamps[s, way] = stamp[idx]
+            hit[idx] = is_hit
+
+        self.time += m
+        self.accesses += m
+        self.hits += int(hit.sum())
+        return hit
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.accesses if self.accesses else 0.0
+
+    @property
+    def miss_bytes(self) -> int:
+        return (self.accesses - self.hits) * self.config.line_bytes
+
+
+def simulate_trace(trace, configs: List[CacheConfig],
+                   chunk_size: int = 1 << 20, dtype=np.uint64) -> Dict[str, Dict]:
+    """
+    Simulate several caches in one streaming pass over a trace
+
+    Args:
+        trace: Path to a binary address trace, or an array of addresses
+        configs: Caches to simulate; a cache with `upstream` set only sees
+            the misses of that (earlier-listed) cache
+        chunk_size: Addresses read and simulated per chunk
+        dtype: Element type of the trace file
+
+    Returns:
+        Cache name -> {accesses, hits, hit_rate, miss_bytes}
+    """
+    addresses = load_trace(trace, dtype) if isinstance(trace, str) else np.asarray(trace)
+    caches = {cfg.name: SetAssociativeCache(cfg) for cfg in configs}
+
+    for start in range(0, len(addresses), chunk_size):
+        chunk = np.asarray(addresses[start:start + chunk_size])
+        misses = {}
+        for cfg in configs:
+            stream = chunk if cfg.upstream is None else misses[cfg.upstream]
+            hit = caches[cfg.name].access(stream)
+            misses[cfg.name] = stream[~hit]
+
+    return {
+        name: {
+            'accesses': c.accesses,
+            'hits': c.hits,
+            'hit_rate': c.hit_rate,
+            'miss_bytes': c.miss_bytes,
+        }
+        for name, c in caches.items()
+    }
+
+
+def main():
+    """Associativity and line-size study against the fully-associative model"""
+    import time
+
+    print("=" * 100)
+    print("NexGen-AI SoC Set-Associative Cache Simulation")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    perf_model = PerformanceModel(soc)
+    l2_bytes = soc.total_l2_cache_mb * 1024 ** 2
+
+    configs = soc_cache_configs(soc)
+    for ways in (1, 4, 8, 16):
+        configs.append(CacheConfig(f'L2 {ways}-way/128B', l2_bytes, 128, ways))
+    for line in (64, 256):
+        configs.append(CacheConfig(f'L2 16-way/{line}B', l2_bytes, line, 16))
+
+    num_accesses = 4_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic_trace.bin')
+        synthetic_trace(num_accesses).tofile(path)
+
+        start = time.perf_counter()
+        results = simulate_trace(path, configs)
+        elapsed = time.perf_counter() - start
+        profile = ReuseProfile.from_trace(path)
+
+    print(f"\nTrace: {num_accesses:,} accesses; {len(configs)} caches simulated in one pass "
+          f"in {elapsed:.2f} s")
+
+    flops = 8.0 * num_accesses  # FLOPs per line touched, as in reuse_distance.py
+    fa_miss = float(profile.miss_ratio(l2_bytes))
+
+    print(f"\n{'Cache':<20} {'Sets':<8} {'Hit Rate':<10} {'Miss Traffic (MB)':<20} "
+          f"{'AI (FLOP/B)':<14} {'FP16 TFLOPS':<12}")
+    print("-" * 90)
+    for cfg in configs:
+        r = results[cfg.name]
+        ai = effective_arithmetic_intensity(flops, r['miss_bytes'])
+        tflops = perf_model.roofline_performance(np.array([ai]), Precision.FP16)[0]
+        print(f"{cfg.name:<20} {cfg.num_sets:<8} {r['hit_rate']:<10.3f} "
+              f"{r['miss_bytes'] / 1e6:<20.1f} {ai:<14.3f} {tflops:<12.2f}")
+    print(f"\nFully-associative LRU reference (stack distance), 128B lines: "
+          f"hit rate {1 - fa_miss:.3f}")
+
+    names = [cfg.name for cfg in configs if cfg.name.startswith('L2 ')]
+    plt.figure(figsize=(10, 6))
+    plt.bar(names, [results[n]['hit_rate'] for n in names], color='blue', alpha=0.7)
+    plt.axhline(1 - fa_miss, color='r', linestyle='--', label='Fully-associative LRU (128B)')
+    plt.ylabel('L2 Hit Rate', fontsize=12)
+    plt.title(f'L2 Associativity / Line Size ({l2_bytes / 1024 ** 2:.0f} MB)', fontsize=14)
+    plt.xticks(rotation=30)
+    plt.grid(True, alpha=0.3, axis='y')
+    plt.legend()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'cache_simulation.png')
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Cache simulation plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+GEMM Tiling Model
+
+Derives GEMM arithmetic intensity and throughput from the SM's on-chip
+storage instead of fixed roofline markers. For an M x N x K GEMM at a
+given precision:
+
+1. Enumerate output tiles (BM x BN, K-step BK) whose double-buffered A/B
+   panels fit in SMConfig.shared_memory_kb and whose FP32/INT32
+   accumulators fit in the register file budget
+2. HBM traffic: every output tile streams a BM x K panel of A and a
+   K x BN panel of B, plus one write of C (no inter-tile L2 reuse, so
+   intensity is a conservative lower bound)
+3. Tiles are scheduled in waves over total_sms x CTAs-per-SM; partial
+   waves and padded edge tiles cost full tile time
+4. Kernel time = max(compute time, HBM time); the best tile maximizes
+   achieved TFLOPS
+
+Shapes are evaluated as a (shapes x tiles) array in one pass, and the
+best tile is memoized per (shape, config) so layer lists with repeated
+shapes and repeated sweeps are lookups.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+import profiling
+from performance_model import (
+    SoCConfig, PerformanceModel,
+    Precision, BYTES_PER_ELEMENT
+)
+from memory_footprint import TransformerConfig, LLAMA_8B, LLAMA_70B, LLAMA_405B
+
+
+# Tile search space
+TILE_MN = (16, 32, 64, 128, 256)
+TILE_K = (16, 32, 64, 128)
+PIPELINE_STAGES = 2                  # Double-buffered shared-memory panels
+ACCUMULATOR_BYTES = 4                # FP32 / INT32 accumulators
+ACCUMULATOR_REGISTER_FRACTION = 0.5  # Rest of the register file: fragments, addresses
+
+RESULT_FIELDS = ('tile_m', 'tile_n', 'tile_k', 'ctas_per_sm', 'arithmetic_intensity',
+                 'waves', 'wave_efficiency', 'time_us', 'achieved_tflops', 'memory_bound')
+
+# (config key, M, N, K) -> best-tile result row, shared by all GemmModel instances.
+# LRU-bounded: config sweeps add entries for every design point.
+BEST_TILE_CACHE_SIZE = 65536
+_BEST_TILE_CACHE: 'OrderedDict[Tuple, Tuple]' = OrderedDict()
+
+
+def clear_cache():
+    """Drop all memoized best-tile results"""
+    _BEST_TILE_CACHE.clear()
+
+
+class GemmModel:
+    """Tile selection and throughput for GEMMs on one SoC configuration"""
+
+    def __init__(self, soc_config: SoCConfig, precision: Precision = Precision.FP16):
+        self.config = soc_config
+        self.precision = precision
+        self.sm_config = soc_config.chiplet_config.sm_config
+        self.perf_model = PerformanceModel(soc_config)
+
+        self.input_bytes = BYTES_PER_ELEMENT[precision]
+        self.output_bytes = max(self.input_bytes, 2)  # Low-precision GEMMs write BF16
+        self.sm_peak_flops = self.sm_config.peak_tflops(precision) * 1e12
+        self.bandwidth_bytes_per_s = self.perf_model.memory_bandwidth_tbps() * 1e12
+
+        self.tiles = self.tile_candidates()
+
+    @property
+    def config_key(self) -> Tuple:
+        """Every config value the tile choice depends on"""
+        return (self.precision, self.sm_config.shared_memory_kb, self.sm_config.register_file_kb,
+                self.sm_peak_flops, self.config.total_sms, self.bandwidth_bytes_per_s)
+
+    def tile_candidates(self) -> Dict[str, np.ndarray]:
+        """Tiles that fit shared memory and the accumulator register budget"""
+        bm, bn, bk = (a.ravel() for a in np.meshgrid(TILE_MN, TILE_MN, TILE_K, indexing='ij'))
+
+        smem_tile = PIPELINE_STAGES * (bm * bk + bk * bn) * self.input_bytes
+        regs_tile = bm * bn * ACCUMULATOR_BYTES
+        smem_budget = self.sm_config.shared_memory_kb * 1024
+        regs_budget = self.sm_config.register_file_kb * 1024 * ACCUMULATOR_REGISTER_FRACTION
+
+        ctas = np.minimum(smem_budget // smem_tile, regs_budget // regs_tile).astype(np.int64)
+        fits = ctas >= 1
+        if not fits.any():
+            raise ValueError(f"No GEMM tile fits {self.sm_config.shared_memory_kb} KB shared "
+                             f"memory / {self.sm_config.register_file_kb} KB registers")
+
+        return {'m': bm[fits], 'n': bn[fits], 'k': bk[fits], 'ctas_per_sm': ctas[fits]}
+
+    def evaluate_tiles(self, shapes: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every candidate tile for every shape
+
+        Args:
+            shapes: Integer array (S, 3) of (M, N, K)
+
+        Returns:
+            Dictionary of (S, T) arrays
+        """
+        shapes = np.asarray(shapes, dtype=np.int64).reshape(-1, 3)
+        M, N, K = (shapes[:, i, np.newaxis].astype(float) for i in range(3))
+        t = self.tiles
+        bm, bn, bk, ctas = t['m'], t['n'], t['k'], t['ctas_per_sm']
+
+        tiles_m = np.ceil(M / bm)
+        tiles_n = np.ceil(N / bn)
+        k_padded = np.ceil(K / bk) * bk
+
+        flops = 2.0 * M * N * K
+        hbm_bytes = (self.input_bytes * K * (tiles_n * M + tiles_m * N) +
+                     self.output_bytes * M * N)
+
+        slots = self.config.total_sms * ctas
+        waves = np.ceil(tiles_m * tiles_n / slots)
+        wave_efficiency = tiles_m * tiles_n / (waves * slots)
+
+        # Co-resident CTAs share the SM's tensor cores
+        tile_time = 2.0 * bm * bn * k_padded / (self.sm_peak_flops / ctas)
+        compute_time = waves * tile_time
+        memory_time = hbm_bytes / self.bandwidth_bytes_per_s
+        time = np.maximum(compute_time, memory_time)
+
+        return {
+            'tile_m': np.broadcast_to(bm, time.shape),
+            'tile_n': np.broadcast_to(bn, time.shape),
+            'tile_k': np.broadcast_to(bk, time.shape),
+            'ctas_per_sm': np.broadcast_to(ctas, time.shape),
+            'arithmetic_intensity': flops / hbm_bytes,
+            'waves': waves,
+            'wave_efficiency': wave_efficiency,
+            'time_us': time * 1e6,
+            'achieved_tflops': flops / time / 1e12,
+            'memory_bound': memory_time > compute_time,
+        }
+
+    def _solve(self, shapes: np.ndarray) -> np.ndarray:
+        """Best tile per shape as an (S, len(RESULT_FIELDS)) array"""
+        r = self.evaluate_tiles(shapes)
+        # Fastest tile; ties (memory-bound plateaus) go to the least traffic
+        order = np.lexsort((-r['arithmetic_intensity'], r['time_us']), axis=-1)
+        best = order[:, 0]
+        rows = np.arange(len(best))
+        return np.stack([r[f][rows, best].astype(float) for f in RESULT_FIELDS], axis=-1)
+
+    def best_tiles(self, shapes: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Best tile per shape, memoized per (shape, config) in an LRU cache
+
+        Args:
+            shapes: Integer array (S, 3) of (M, N, K); duplicates are solved once
+
+        Returns:
+            Dictionary of (S,) arrays, one per RESULT_FIELDS entry
+        """
+        shapes = np.asarray(shapes, dtype=np.int64).reshape(-1, 3)
+        unique, inverse = np.unique(shapes, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+
+        key = self.config_key
+        keys = [(key,) + tuple(int(v) for v in shape) for shape in unique]
+        rows = [_BEST_TILE_CACHE.get(k) for k in keys]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        profiling.cache_hit('gemm_model.best_tiles', len(keys) - len(missing))
+        profiling.cache_miss('gemm_model.best_tiles', len(missing))
+        for k, row in zip(keys, rows):
+            if row is not None:
+                _BEST_TILE_CACHE.move_to_end(k)
+        if missing:
+            for i, row in zip(missing, self._solve(unique[missing])):
+                rows[i] = _BEST_TILE_CACHE[keys[i]] = tuple(row)
+            while len(_BEST_TILE_CACHE) > BEST_TILE_CACHE_SIZE:
+                _BEST_TILE_CACHE.popitem(last=False)
+
+        table = np.array(rows).reshape(-1, len(RESULT_FIELDS))
+        result = {f: table[inverse, j] for j, f in enumerate(RESULT_FIELDS)}
+        result['memory_bound'] = result['memory_bound'].astype(bool)
+        return result
+
+    def gemm(self, m: int, n: int, k: int) -> Dict[str, float]:
+        """Best tile and throughput for a single GEMM"""
+        r = self.best_tiles(np.array([[m, n, k]]))
+        return {f: v[0].item() for f, v in r.items()}
+
+
+def transformer_gemm_shapes(model: TransformerConfig,
+                            tokens: int) -> List[Tuple[str, int, int, int]]:
+    """(name, M, N, K) for one decoder layer's GEMMs plus the LM head"""
+    q_dim = model.num_heads * model.head_dim
+    kv_dim = model.num_kv_heads * model.head_dim
+    h, i = model.hidden_size, model.intermediate_size
+    return [
+        ('qkv_proj', tokens, q_dim + 2 * kv_dim, h),
+        ('o_proj', tokens, h, q_dim),
+        ('gate_up_proj', tokens, 2 * i, h),
+        ('down_proj', tokens, h, i),
+        ('lm_head', tokens, model.vocab_size, h),
+    ]
+
+
+def model_gemm_summary(gemm_model: GemmModel, model: TransformerConfig,
+                       tokens: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-forward GEMM time and effective TFLOPS/intensity vs tokens in flight
+
+    Args:
+        gemm_model: Tiling model for the target SoC/precision
+        model: Transformer shape
+        tokens: Array of token counts (decode batch or prefill chunk)
+
+    Returns:
+        Dictionary of arrays with the shape of tokens
+    """
+    tokens = np.asarray(tokens)
+    layers = [transformer_gemm_shapes(model, int(t)) for t in tokens.ravel()]
+    shapes = np.array([s[1:] for layer in layers for s in layer])
+    per_layer = len(layers[0])
+    repeats = np.tile([model.num_layers] * (per_layer - 1) + [1], len(layers))
+
+    r = gemm_model.best_tiles(shapes)
+    flops = 2.0 * shapes.prod(axis=1) * repeats
+    time = r['time_us'] * 1e-6 * repeats
+    traffic = flops / r['arithmetic_intensity']
+
+    split = lambda x: x.reshape(len(layers), per_layer).sum(axis=1).reshape(tokens.shape)
+    total_flops, total_time, total_bytes = split(flops), split(time), split(traffic)
+    return {
+        'time_ms': total_time * 1e3,
+        'achieved_tflops': total_flops / total_time / 1e12,
+        'arithmetic_intensity': total_flops / total_bytes,
+    }
+
+
+def main():
+    """GEMM tiling for reference transformer shapes"""
+    import time
+
+    print("=" * 100)
+    print("NexGen-AI SoC GEMM Tiling Model")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    perf_model = PerformanceModel(soc)
+    gemm_model = GemmModel(soc, Precision.FP16)
+    sm = soc.chiplet_config.sm_config
+
+    print(f"\nSM storage: {sm.shared_memory_kb} KB shared memory, {sm.register_file_kb} KB registers; "
+          f"{len(gemm_model.tiles['m'])} candidate tiles fit (FP16)")
+
+    print(f"\n{'GEMM (M x N x K)':<28} {'Tile':<16} {'CTA/SM':<8} {'AI (FLOP/B)':<13} "
+          f"{'Waves':<7} {'Wave Eff':<10} {'TFLOPS':<10} {'Bound':<8}")
+    print("-" * 105)
+    for tokens in (1, 64, 4096):
+        for name, m, n, k in transformer_gemm_shapes(LLAMA_70B, tokens):
+            r = gemm_model.gemm(m, n, k)
+            tile = f"{r['tile_m']:.0f}x{r['tile_n']:.0f}x{r['tile_k']:.0f}"
+            label = f"{name} {m}x{n}x{k}"
+            print(f"{label:<28} {tile:<16} {r['ctas_per_sm']:<8.0f} "
+                  f"{r['arithmetic_intensity']:<13.1f} {r['waves']:<7.0f} "
+                  f"{r['wave_efficiency']:<10.2f} {r['achieved_tflops']:<10.1f} "
+                  f"{'Memory' if r['memory_bound'] else 'Compute':<8}")
+
+    # Batched sweep over layer lists: every model x token count
+    tokens = np.unique(np.logspace(0, 14, 2000, base=2).astype(int))
+    models = [LLAMA_8B, LLAMA_70B, LLAMA_405B]
+    clear_cache()
+    start = time.perf_counter()
+    summaries = {m.name: model_gemm_summary(gemm_model, m, tokens) for m in models}
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    for m in models:
+        model_gemm_summary(gemm_model, m, tokens)
+    warm = time.perf_counter() - start
+    num_shapes = len(models) * len(tokens) * len(transformer_gemm_shapes(LLAMA_8B, 1))
+    print(f"\nSweep: {num_shapes:,} GEMM shapes in {cold * 1e3:.0f} ms "
+          f"(memoized re-run: {warm * 1e3:.0f} ms, {len(_BEST_TILE_CACHE):,} cached)")
+
+    print(f"\n{'Model':<16} {'Tokens':<8} {'GEMM Time (ms)':<16} {'TFLOPS':<10} {'AI (FLOP/B)':<12}")
+    print("-" * 65)
+    for name, s in summaries.items():
+        for t in (1, 32, 256, 4096):
+            i = np.searchsorted(tokens, t)
+            print(f"{name:<16} {t:<8} {s['time_ms'][i]:<16.3f} "
+                  f"{s['achieved_tflops'][i]:<10.1f} {s['arithmetic_intensity'][i]:<12.1f}")
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for name, s in summaries.items():
+        ax.semilogx(tokens, s['achieved_tflops'], linewidth=2, label=name)
+    ax.axhline(perf_model.peak_compute(Precision.FP16), color='r', linestyle='--',
+               label='FP16 Peak')
+    ax.set_xlabel('Tokens per Forward Pass (batch x chunk)', fontsize=12)
+    ax.set_ylabel('GEMM Throughput (TFLOPS)', fontsize=12)
+    ax.set_title('Tiled GEMM Throughput vs Tokens in Flight (FP16)', fontsize=14)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'gemm_tiling.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ GEMM tiling plot saved: {save_path}")
+
+    # Roofline with derived (not assumed) GEMM intensities
+    decode = gemm_model.gemm(*transformer_gemm_shapes(LLAMA_70B, 32)[2][1:])
+    prefill = gemm_model.gemm(*transformer_gemm_shapes(LLAMA_70B, 4096)[2][1:])
+    roofline_path = os.path.join(outputs_dir, 'roofline_gemm.png')
+    perf_model.plot_roofline(Precision.FP16, save_path=roofline_path, workloads={
+        'GEMM (Prefill, 4096 tok)': prefill['arithmetic_intensity'],
+        'GEMM (Decode, batch 32)': decode['arithmetic_intensity'],
+        'Elementwise': 0.5,
+        'Reduction': 1,
+    })
+    print(f"✓ Roofline with derived GEMM intensities saved: {roofline_path}")
+
+
+if __name__ == "__main__":
+    main()
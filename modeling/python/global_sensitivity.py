@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Global Sensitivity Analysis
+
+The one-at-a-time sweeps in sensitivity_analysis.py vary a single
+parameter around the baseline and cannot see interactions (e.g. clock x
+SM count). This tool computes variance-based global indices over the
+whole parameter box:
+
+1. Morris elementary effects (mu*, sigma) for cheap screening
+2. First-order and total Sobol indices from Saltelli sampling
+
+All sample matrices are evaluated in one vectorized batch through
+batch_model.evaluate_samples, optionally split across worker processes.
+Confidence intervals for the Sobol indices use the normal approximation
+of the per-sample estimator terms, which is accurate for the large N
+used here; Morris intervals are bootstrapped over trajectories.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, ChipletConfig, SMConfig, Precision
+from batch_model import evaluate_samples
+
+
+# Two-sided z-values for common confidence levels
+Z_VALUES = {0.90: 1.645, 0.95: 1.960, 0.99: 2.576}
+
+
+@dataclass
+class SobolIndices:
+    """First-order and total Sobol indices with confidence half-widths"""
+    names: List[str]
+    first_order: np.ndarray
+    first_order_conf: np.ndarray
+    total: np.ndarray
+    total_conf: np.ndarray
+
+
+@dataclass
+class MorrisIndices:
+    """Morris screening statistics (in units of the metric per unit range)"""
+    names: List[str]
+    mu: np.ndarray
+    mu_star: np.ndarray
+    mu_star_conf: np.ndarray
+    sigma: np.ndarray
+
+
+class GlobalSensitivity:
+    """Variance-based and screening sensitivity over a parameter box"""
+
+    def __init__(self, base_soc: SoCConfig,
+                 bounds: Dict[str, Tuple[float, float]],
+                 precision: Precision = Precision.FP16,
+                 utilization: float = 1.0,
+                 workers: int = 1):
+        """
+        Args:
+            base_soc: Base SoC configuration
+            bounds: Dotted parameter path -> (low, high), sampled uniformly
+            precision: Compute precision
+            utilization: Workload utilization (0.0-1.0)
+            workers: Number of worker processes for evaluation
+        """
+        self.base_soc = base_soc
+        self.paths = list(bounds)
+        self.low = np.array([bounds[p][0] for p in self.paths], dtype=float)
+        self.high = np.array([bounds[p][1] for p in self.paths], dtype=float)
+        self.precision = precision
+        self.utilization = utilization
+        self.workers = workers
+
+    @property
+    def num_params(self) -> int:
+        return len(self.paths)
+
+    def _evaluate_unit(self, unit_samples: np.ndarray) -> Dict[str, np.ndarray]:
+        """Evaluate samples given in the unit hypercube"""
+        samples = self.low + unit_samples * (self.high - self.low)
+        return evaluate_samples(self.base_soc, self.paths, samples,
+                                self.precision, self.utilization,
+                                workers=self.workers)
+
+    def saltelli_samples(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Build the stacked Saltelli matrix [A; B; AB_1; ...; AB_k]
+
+        AB_i equals A with column i taken from B. Shape is (n*(k+2), k).
+        """
+        k = self.num_params
+        a = rng.random((n, k))
+        b = rng.random((n, k))
+        ab = np.repeat(a[np.newaxis], k, axis=0)
+        ab[np.arange(k), :, np.arange(k)] = b.T
+        return np.concatenate([a, b, ab.reshape(k * n, k)])
+
+    def sobol(self, n: int = 2 ** 16, seed: int = 0,
+              confidence: float = 0.95) -> Dict[str, SobolIndices]:
+        """
+        First-order (Saltelli 2010) and total (Jansen 1999) Sobol indices
+
+        Args:
+            n: Base sample size; n*(k+2) model evaluations are made
+            seed: Random seed
+            confidence: Confidence level for the intervals
+
+        Returns:
+            Metric name -> SobolIndices
+        """
+        k = self.num_params
+        rng = np.random.default_rng(seed)
+        metrics = self._evaluate_unit(self.saltelli_samples(n, rng))
+        z = Z_VALUES[confidence]
+
+        results = {}
+        for name, values in metrics.items():
+            f_a = values[:n]
+            f_b = values[n:2 * n]
+            f_ab = values[2 * n:].reshape(k, n)
+            variance = np.var(np.concatenate([f_a, f_b]))
+            if variance == 0:
+                zeros = np.zeros(k)
+                results[name] = SobolIndices(self.paths, zeros, zeros, zeros, zeros)
+                continue
+
+            first_terms = f_b * (f_ab - f_a)
+            total_terms = 0.5 * (f_a - f_ab) ** 2
+
+            results[name] = SobolIndices(
+                names=self.paths,
+                first_order=first_terms.mean(axis=1) / variance,
+                first_order_conf=z * first_terms.std(axis=1) / np.sqrt(n) / variance,
+                total=total_terms.mean(axis=1) / variance,
+                total_conf=z * total_terms.std(axis=1) / np.sqrt(n) / variance,
+            )
+        return results
+
+    def morris_trajectories(self, r: int, levels: int,
+                            rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Generate r random one-at-a-time trajectories on a p-level grid
+
+        Returns:
+            Tuple of (points (r, k+1, k), step order (r, k), signed steps (r, k))
+        """
+        k = self.num_params
+        delta = levels / (2.0 * (levels - 1))
+        base = rng.integers(0, levels // 2, (r, k)) / (levels - 1)
+        signs = rng.choice([-1.0, 1.0], (r, k))
+        start = base + (signs < 0) * delta
+        order = np.argsort(rng.random((r, k)), axis=1)
+
+        points = np.empty((r, k + 1, k))
+        points[:, 0] = start
+        rows = np.arange(r)
+        for j in range(k):
+            points[:, j + 1] = points[:, j]
+            points[rows, j + 1, order[:, j]] += signs[rows, order[:, j]] * delta
+        return points, order, signs * delta
+
+    def morris(self, r: int = 1000, levels: int = 8, seed: int = 0,
+               confidence: float = 0.95, num_resamples: int = 1000) -> Dict[str, MorrisIndices]:
+        """
+        Morris elementary-effects screening
+
+        Args:
+            r: Number of trajectories; r*(k+1) model evaluations are made
+            levels: Number of grid levels per parameter
+            seed: Random seed
+            confidence: Confidence level for the mu* interval
+            num_resamples: Bootstrap resamples over trajectories
+
+        Returns:
+            Metric name -> MorrisIndices
+        """
+        k = self.num_params
+        rng = np.random.default_rng(seed)
+        points, order, steps = self.morris_trajectories(r, levels, rng)
+        metrics = self._evaluate_unit(points.reshape(r * (k + 1), k))
+
+        rows = np.arange(r)[:, np.newaxis]
+        boot_idx = rng.integers(0, r, (num_resamples, r))
+        tail = (1 - confidence) / 2
+
+        results = {}
+        for name, values in metrics.items():
+            f = values.reshape(r, k + 1)
+            effects = np.empty((r, k))
+            effects[rows, order] = np.diff(f, axis=1) / steps[rows, order]
+
+            abs_effects = np.abs(effects)
+            boot = abs_effects[boot_idx].mean(axis=1)
+            low, high = np.quantile(boot, [tail, 1 - tail], axis=0)
+
+            results[name] = MorrisIndices(
+                names=self.paths,
+                mu=effects.mean(axis=0),
+                mu_star=abs_effects.mean(axis=0),
+                mu_star_conf=(high - low) / 2,
+                sigma=effects.std(axis=0, ddof=1),
+            )
+        return results
+
+
+def plot_global_sensitivity(sobol: Dict[str, SobolIndices],
+                            morris: Dict[str, MorrisIndices],
+                            metrics: List[Tuple[str, str]],
+                            labels: Dict[str, str],
+                            save_path: str = None):
+    """Sobol bar charts (top row) and Morris mu*-sigma plots (bottom row)"""
+    fig, axes = plt.subplots(2, len(metrics), figsize=(6 * len(metrics), 11))
+
+    for col, (name, title) in enumerate(metrics):
+        s = sobol[name]
+        names = [labels.get(p, p) for p in s.names]
+        y = np.arange(len(names))
+
+        ax = axes[0, col]
+        ax.barh(y - 0.2, s.first_order, height=0.4, xerr=s.first_order_conf,
+                color='blue', alpha=0.7, label='First-order S1')
+        ax.barh(y + 0.2, s.total, height=0.4, xerr=s.total_conf,
+                color='orange', alpha=0.7, label='Total ST')
+        ax.set_yticks(y)
+        ax.set_yticklabels(names)
+        ax.set_xlabel('Sobol Index', fontsize=11)
+        ax.set_title(f'Sobol Indices: {title}', fontsize=12, fontweight='bold')
+        ax.legend(fontsize=9)
+        ax.grid(True, alpha=0.3, axis='x')
+
+        m = morris[name]
+        ax = axes[1, col]
+        ax.errorbar(m.mu_star, m.sigma, xerr=m.mu_star_conf, fmt='o', markersize=8)
+        for i, label in enumerate(names):
+            ax.annotate(label, (m.mu_star[i], m.sigma[i]),
+                        xytext=(5, 5), textcoords='offset points', fontsize=9)
+        ax.set_xlabel('μ* (mean |elementary effect|)', fontsize=11)
+        ax.set_ylabel('σ (interaction / nonlinearity)', fontsize=11)
+        ax.set_title(f'Morris Screening: {title}', fontsize=12, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+
+    if save_path:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.close()
+        print(f"\n✓ Global sensitivity plot saved: {save_path}")
+    else:
+        plt.show()
+
+
+def main():
+    """Global sensitivity of the baseline over the sensitivity_analysis ranges"""
+    print("=" * 100)
+    print("NexGen-AI SoC Global Sensitivity Analysis")
+    print("=" * 100)
+
+    base_soc = SoCConfig(chiplet_config=ChipletConfig(sm_config=SMConfig()))
+
+    # Same ranges as analyze_all_parameters
+    bounds = {
+        'chiplet_config.num_sms': (16, 64),
+        'chiplet_config.area_mm2': (250, 450),
+        'chiplet_config.sm_config.clock_mhz': (1500, 3000),
+        'chiplet_config.sm_config.tensor_cores': (2, 10),
+        'chiplet_config.sm_config.tensor_core_ops_per_cycle.FP16': (64, 320),
+    }
+    labels = {
+        'chiplet_config.num_sms': 'SMs per Chiplet',
+        'chiplet_config.area_mm2': 'Chiplet Area',
+        'chiplet_config.sm_config.clock_mhz': 'Clock',
+        'chiplet_config.sm_config.tensor_cores': 'Tensor Cores',
+        'chiplet_config.sm_config.tensor_core_ops_per_cycle.FP16': 'FP16 Ops/Cycle',
+    }
+    metrics = [
+        ('density_tflops_per_mm2', 'Density'),
+        ('total_power_w', 'Power'),
+        ('efficiency_tflops_per_w', 'TFLOPS/W'),
+    ]
+
+    analysis = GlobalSensitivity(base_soc, bounds, workers=os.cpu_count() or 1)
+
+    n = 2 ** 18
+    print(f"\nSobol: N = {n:,}, {n * (analysis.num_params + 2):,} evaluations")
+    sobol = analysis.sobol(n=n, seed=2026)
+    morris = analysis.morris(r=2000, seed=2026)
+
+    for name, title in metrics:
+        print("\n" + "=" * 100)
+        print(f"{title.upper()}")
+        print("=" * 100)
+        print(f"\n{'Parameter':<20} {'S1':<18} {'ST':<18} {'ST - S1':<12} {'Morris μ*':<18} {'σ':<12}")
+        print("-" * 100)
+        s, m = sobol[name], morris[name]
+        for i, path in enumerate(s.names):
+            s1 = f"{s.first_order[i]:.3f} ± {s.first_order_conf[i]:.3f}"
+            st = f"{s.total[i]:.3f} ± {s.total_conf[i]:.3f}"
+            mu = f"{m.mu_star[i]:.3g} ± {m.mu_star_conf[i]:.2g}"
+            print(f"{labels[path]:<20} {s1:<18} {st:<18} "
+                  f"{s.total[i] - s.first_order[i]:<12.3f} {mu:<18} {m.sigma[i]:<12.3g}")
+        print(f"\nSum of S1: {s.first_order.sum():.3f} "
+              f"(1 - sum = {1 - s.first_order.sum():.3f} of variance from interactions)")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    plot_global_sensitivity(sobol, morris, metrics, labels,
+                            save_path=os.path.join(outputs_dir, 'global_sensitivity.png'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+PCIe Host-Transfer Model
+
+Models host<->device traffic over the SoC's PCIe link and how much of
+it shows up in step time:
+
+1. Link throughput from pcie_gen and pcie_lanes (GT/s per lane, line
+   encoding, TLP header overhead), capped by pcie_bandwidth_gbps
+2. Transfer time per step for each direction (full duplex) including a
+   DMA setup latency per chunk
+3. Overlap with compute: with double buffering, chunk i+1 transfers
+   while chunk i computes, so the steady-state step is
+   max(compute, transfer); with a single buffer they serialize
+4. Inference traffic: input tokens and sampled outputs, weights
+   streamed when they exceed HBM, and KV-cache blocks offloaded to host
+   memory when the KV cache overflows (fetched every decode step)
+
+Everything broadcasts over batch sizes, context lengths and array-valued
+configs from batch_model.py.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, Precision
+from memory_footprint import MemoryFootprintModel, TransformerConfig, LLAMA_70B, LLAMA_405B
+from batch_model import batch_models
+
+
+TLP_OVERHEAD_BYTES = 26          # Header, sequence number, LCRC, framing per TLP
+TOKEN_ID_BYTES = 4
+
+
+def pcie_encoding_efficiency(pcie_gen: np.ndarray) -> np.ndarray:
+    """Line-code efficiency: 128b/130b for Gen3-5, 242B/256B FLIT mode for Gen6+"""
+    pcie_gen = np.asarray(pcie_gen)
+    if np.any(pcie_gen < 3):
+        raise ValueError(f"Unknown PCIe generation: {pcie_gen}")
+    return np.where(pcie_gen >= 6, 242 / 256, 128 / 130)
+
+
+class HostTransferModel:
+    """Host<->device transfers over PCIe and their overlap with compute"""
+
+    def __init__(self, soc_config: SoCConfig, max_payload_bytes: int = 256,
+                 dma_latency_us: float = 2.0):
+        """
+        Args:
+            soc_config: SoC configuration (pcie_* fields may be arrays)
+            max_payload_bytes: PCIe max payload size per TLP
+            dma_latency_us: Setup and completion latency per DMA transfer
+        """
+        self.config = soc_config
+        self.max_payload_bytes = max_payload_bytes
+        self.dma_latency_s = dma_latency_us * 1e-6
+
+    def link_gbps(self) -> np.ndarray:
+        """Effective payload throughput per direction in GB/s"""
+        gen = np.asarray(self.config.pcie_gen)
+        signaling_gbps = 2.0 ** gen * self.config.pcie_lanes / 8  # Gen3 = 8 GT/s, doubling per gen
+        raw = np.minimum(self.config.pcie_bandwidth_gbps, signaling_gbps)
+        tlp_efficiency = self.max_payload_bytes / (self.max_payload_bytes + TLP_OVERHEAD_BYTES)
+        return raw * pcie_encoding_efficiency(gen) * tlp_efficiency
+
+    def transfer_time(self, bytes_moved: np.ndarray, transfers: np.ndarray = 1) -> np.ndarray:
+        """Time to move bytes in one direction as a number of DMA transfers"""
+        bytes_moved = np.asarray(bytes_moved, dtype=float)
+        return np.where(bytes_moved > 0,
+                        bytes_moved / (self.link_gbps() * 1e9) + transfers * self.dma_latency_s,
+                        0.0)
+
+    def step(self, compute_s: np.ndarray, h2d_bytes: np.ndarray, d2h_bytes: np.ndarray,
+             chunks: np.ndarray = 1, double_buffered: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Step time with host transfers
+
+        Args:
+            compute_s: Device time per step without transfers
+            h2d_bytes: Host-to-device bytes per step
+            d2h_bytes: Device-to-host bytes per step
+            chunks: DMA transfers per direction per step (e.g. one per layer)
+            double_buffered: Overlap transfers with compute
+
+        Returns:
+            Dictionary of arrays: transfer time, step time, exposed time
+            and exposed fraction of the step
+        """
+        transfer = np.maximum(self.transfer_time(h2d_bytes, chunks),
+                              self.transfer_time(d2h_bytes, chunks))  # Full duplex
+        if double_buffered:
+            step = np.maximum(compute_s, transfer)
+        else:
+            step = compute_s + transfer
+        exposed = step - compute_s
+        return {
+            'transfer_s': transfer,
+            'step_s': step,
+            'exposed_s': exposed,
+            'exposed_fraction': exposed / step,
+            'staging_bytes': (2 if double_buffered else 1) *
+                             np.maximum(h2d_bytes, d2h_bytes) / np.asarray(chunks),
+        }
+
+    def inference_step(self, model: TransformerConfig, batch: np.ndarray, context: np.ndarray,
+                       weight_precision: Precision = Precision.FP8,
+                       kv_precision: Precision = Precision.FP8,
+                       double_buffered: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Decode step with input/output, weight streaming and KV offload traffic
+
+        Weights take HBM first; whatever does not fit is streamed from the
+        host every step. The KV cache gets the HBM that remains and the
+        overflow lives in host memory: it is read every step and the new
+        token's KV is written back for offloaded sequences. Streams are
+        moved one layer per chunk.
+
+        Args:
+            model: Transformer shape
+            batch: Batch size(s)
+            context: Context length(s)
+            weight_precision: Storage precision of the weights
+            kv_precision: Storage precision of the KV cache
+            double_buffered: Overlap transfers with compute
+
+        Returns:
+            step() arrays plus per-stream bytes and the compute-only step time
+        """
+        footprint = MemoryFootprintModel(self.config, model, weight_precision, kv_precision)
+        batch = np.asarray(batch, dtype=float)
+        usable = footprint.usable_bytes()
+        weights = footprint.weight_bytes()
+        activations = footprint.activation_bytes(batch)
+
+        weight_stream = np.maximum(weights + activations - usable, 0.0)
+        kv_total = footprint.kv_cache_bytes(batch, context)
+        kv_room = np.maximum(usable - weights - activations, 0.0)
+        kv_offloaded = np.maximum(kv_total - kv_room, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offload_fraction = np.where(kv_total > 0, kv_offloaded / kv_total, 0.0)
+
+        io_bytes = batch * TOKEN_ID_BYTES
+        kv_writeback = offload_fraction * batch * footprint.kv_bytes_per_token()
+        h2d = io_bytes + weight_stream + kv_offloaded
+        d2h = io_bytes + kv_writeback
+        streaming = (weight_stream + kv_offloaded) > 0
+        chunks = np.where(streaming, model.num_layers, 1)
+
+        compute = footprint.decode_step(batch, context)['step_time_s']
+        result = self.step(compute, h2d, d2h, chunks, double_buffered)
+        result.update({
+            'compute_s': compute,
+            'input_output_bytes': io_bytes,
+            'weight_stream_bytes': weight_stream,
+            'kv_offload_bytes': kv_offloaded + kv_writeback,
+            'tokens_per_s': batch / result['step_s'],
+        })
+        return result
+
+
+def main():
+    """PCIe exposure of decode steps across batch sizes and link configs"""
+    print("=" * 100)
+    print("NexGen-AI SoC PCIe Host-Transfer Analysis")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    transfers = HostTransferModel(soc)
+    print(f"\nPCIe Gen{soc.pcie_gen} x{soc.pcie_lanes}: {float(transfers.link_gbps()):.1f} GB/s "
+          f"effective per direction (configured {soc.pcie_bandwidth_gbps} GB/s)")
+
+    batches = np.array([1, 8, 32, 64, 128, 256])
+    cases = [
+        ('70B FP8, 8k context', LLAMA_70B, 8192),
+        ('70B FP8, 128k context (KV offload)', LLAMA_70B, 131072),
+        ('405B FP8, 8k context (weight streaming)', LLAMA_405B, 8192),
+    ]
+    for label, model, context in cases:
+        print(f"\n{label}")
+        print(f"\n{'Batch':<8} {'Compute (ms)':<14} {'Weights (GB)':<14} {'KV off. (GB)':<14} "
+              f"{'PCIe (ms)':<11} {'Step (ms)':<11} {'Exposed %':<11} {'Serial %':<10} {'Tokens/s':<10}")
+        print("-" * 105)
+        overlapped = transfers.inference_step(model, batches, context)
+        serial = transfers.inference_step(model, batches, context, double_buffered=False)
+        for i, b in enumerate(batches):
+            print(f"{b:<8} {overlapped['compute_s'][i]*1e3:<14.2f} "
+                  f"{overlapped['weight_stream_bytes'][i]/1e9:<14.1f} "
+                  f"{overlapped['kv_offload_bytes'][i]/1e9:<14.1f} "
+                  f"{overlapped['transfer_s'][i]*1e3:<11.2f} {overlapped['step_s'][i]*1e3:<11.2f} "
+                  f"{overlapped['exposed_fraction'][i]*100:<11.1f} "
+                  f"{serial['exposed_fraction'][i]*100:<10.1f} {overlapped['tokens_per_s'][i]:<10.1f}")
+
+    # Vectorized over configs: PCIe generation x lanes, all batch sizes at once
+    gens = np.array([4, 5, 6, 7])
+    lanes = np.array([16, 32])
+    configs, _, _ = batch_models(soc, {
+        'pcie_gen': gens[:, np.newaxis, np.newaxis],
+        'pcie_lanes': lanes[np.newaxis, :, np.newaxis],
+        'pcie_bandwidth_gbps': np.array(1e6),  # Let gen and lanes set the link
+    })
+    sweep = HostTransferModel(configs).inference_step(LLAMA_70B, batches[np.newaxis, np.newaxis, :], 131072)
+    print(f"\n70B FP8, 128k context: exposed PCIe fraction by link ({sweep['step_s'].size} points in one call)")
+    print(f"\n{'Link':<14}" + ''.join(f"{f'B={b}':<10}" for b in batches))
+    print("-" * 74)
+    for i, g in enumerate(gens):
+        for j, n in enumerate(lanes):
+            print(f"{f'Gen{g} x{n}':<14}" +
+                  ''.join(f"{v*100:<10.1f}" for v in sweep['exposed_fraction'][i, j]))
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for label, model, context in cases:
+        r = transfers.inference_step(model, batches, context)
+        axes[0].plot(batches, r['exposed_fraction'] * 100, linewidth=2, marker='o', label=label)
+    axes[0].set_xlabel('Batch Size', fontsize=12)
+    axes[0].set_ylabel('Step Time Exposed to PCIe (%)', fontsize=12)
+    axes[0].set_title(f'Double-Buffered, Gen{soc.pcie_gen} x{soc.pcie_lanes}', fontsize=14, fontweight='bold')
+    for i, g in enumerate(gens):
+        for j, n in enumerate(lanes):
+            axes[1].plot(batches, sweep['tokens_per_s'][i, j], linewidth=2, marker='o',
+                         linestyle='-' if n == 16 else '--', label=f'Gen{g} x{n}')
+    axes[1].set_xlabel('Batch Size', fontsize=12)
+    axes[1].set_ylabel('Decode Tokens/s', fontsize=12)
+    axes[1].set_title('70B, 128k Context (KV Offload)', fontsize=14, fontweight='bold')
+    for ax in axes:
+        ax.set_xscale('log', base=2)
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=9)
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'host_transfer.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Host-transfer plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Parameter Interaction Analysis
+
+analyze_all_parameters varies one parameter at a time. This tool maps
+pairs (or N-tuples) of parameters jointly: each axis is a dotted config
+path, and the grid is formed by NumPy broadcasting inside a single
+array-valued SoCConfig, so no per-point dataclasses are built. A
+1000 x 1000 grid evaluates in a few milliseconds.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, ChipletConfig, SMConfig, Precision
+from batch_model import evaluate_batch, DENSITY_TARGET, POWER_TARGET_W
+
+
+METRIC_LABELS = {
+    'peak_tflops': 'Peak TFLOPS',
+    'density_tflops_per_mm2': 'Density (TFLOPS/mm²)',
+    'total_power_w': 'Power (W)',
+    'efficiency_tflops_per_w': 'Efficiency (TFLOPS/W)',
+    'total_area_mm2': 'Total Area (mm²)',
+}
+
+
+def interaction_grid(
+    base_soc: SoCConfig,
+    axes: Dict[str, np.ndarray],
+    precision: Precision = Precision.FP16,
+    utilization: float = 1.0
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate all metrics on the full N-D grid of the given axes
+
+    Args:
+        base_soc: Base SoC configuration
+        axes: Ordered mapping of dotted path -> 1-D values; axis i of the
+            result corresponds to the i-th entry
+        precision: Compute precision
+        utilization: Workload utilization (0.0-1.0)
+
+    Returns:
+        Dictionary of metric arrays with shape (len(axis_0), len(axis_1), ...)
+    """
+    ndim = len(axes)
+    overrides = {}
+    for i, (path, values) in enumerate(axes.items()):
+        shape = [1] * ndim
+        shape[i] = -1
+        overrides[path] = np.asarray(values, dtype=float).reshape(shape)
+    return evaluate_batch(base_soc, overrides, precision, utilization)
+
+
+def plot_interaction(
+    base_soc: SoCConfig,
+    x_path: str, x_values: np.ndarray,
+    y_path: str, y_values: np.ndarray,
+    metric: str = 'density_tflops_per_mm2',
+    labels: Dict[str, str] = None,
+    precision: Precision = Precision.FP16,
+    ax: plt.Axes = None
+) -> Dict[str, np.ndarray]:
+    """
+    Heatmap of a metric over two parameters with PRD target contours
+
+    Args:
+        base_soc: Base SoC configuration
+        x_path, x_values: Parameter and values on the x axis
+        y_path, y_values: Parameter and values on the y axis
+        metric: Metric used for the color scale
+        labels: Optional display labels for the paths
+        precision: Compute precision
+        ax: Axes to draw into (default: current axes)
+
+    Returns:
+        The evaluated grid (arrays indexed [y, x])
+    """
+    labels = labels or {}
+    ax = ax or plt.gca()
+    grid = interaction_grid(base_soc, {y_path: y_values, x_path: x_values}, precision)
+
+    mesh = ax.pcolormesh(x_values, y_values, grid[metric], shading='auto', cmap='viridis')
+    plt.colorbar(mesh, ax=ax, label=METRIC_LABELS.get(metric, metric))
+
+    # Target lines; contour silently draws nothing if a level is out of range
+    power = ax.contour(x_values, y_values, grid['total_power_w'], levels=[POWER_TARGET_W],
+                       colors='r', linewidths=2, linestyles='--')
+    ax.clabel(power, fmt=f'{POWER_TARGET_W:.0f} W', fontsize=9)
+    density = ax.contour(x_values, y_values, grid['density_tflops_per_mm2'],
+                         levels=[DENSITY_TARGET], colors='w', linewidths=2)
+    ax.clabel(density, fmt=f'{DENSITY_TARGET} TFLOPS/mm²', fontsize=9)
+
+    ax.set_xlabel(labels.get(x_path, x_path), fontsize=11)
+    ax.set_ylabel(labels.get(y_path, y_path), fontsize=11)
+    ax.set_title(f'{METRIC_LABELS.get(metric, metric)}: '
+                 f'{labels.get(y_path, y_path)} × {labels.get(x_path, x_path)}',
+                 fontsize=12, fontweight='bold')
+    return grid
+
+
+def main():
+    """Pairwise interaction maps around the baseline"""
+    print("=" * 100)
+    print("NexGen-AI SoC Parameter Interaction Analysis")
+    print("=" * 100)
+
+    base_soc = SoCConfig(chiplet_config=ChipletConfig(sm_config=SMConfig()))
+    labels = {
+        'chiplet_config.num_sms': 'SMs per Chiplet',
+        'chiplet_config.area_mm2': 'Chiplet Area (mm²)',
+        'chiplet_config.sm_config.clock_mhz': 'Clock (MHz)',
+        'chiplet_config.sm_config.tensor_cores': 'Tensor Cores per SM',
+        'num_chiplets': 'Number of Chiplets',
+    }
+
+    # Timing check on a dense grid
+    sms = np.linspace(16, 128, 1000)
+    area = np.linspace(150, 450, 1000)
+    start = time.perf_counter()
+    grid = interaction_grid(base_soc, {'chiplet_config.num_sms': sms,
+                                       'chiplet_config.area_mm2': area})
+    elapsed = time.perf_counter() - start
+    print(f"\n1000 x 1000 grid evaluated in {elapsed * 1000:.1f} ms "
+          f"({grid['density_tflops_per_mm2'].size / elapsed / 1e6:.1f} M points/s)")
+
+    within_power = grid['total_power_w'] <= POWER_TARGET_W
+    best = np.unravel_index(
+        np.argmax(np.where(within_power, grid['density_tflops_per_mm2'], -np.inf)),
+        within_power.shape)
+    print(f"\nBest density within {POWER_TARGET_W:.0f} W on this grid:")
+    print(f"  SMs per chiplet: {sms[best[0]]:.0f}, Chiplet area: {area[best[1]]:.0f} mm²")
+    print(f"  Density: {grid['density_tflops_per_mm2'][best]:.3f} TFLOPS/mm², "
+          f"Power: {grid['total_power_w'][best]:.1f} W")
+
+    # N-D example: SMs x clock x tensor cores
+    grid_3d = interaction_grid(base_soc, {
+        'chiplet_config.num_sms': np.arange(16, 129, 8),
+        'chiplet_config.sm_config.clock_mhz': np.arange(1500, 3001, 250),
+        'chiplet_config.sm_config.tensor_cores': np.arange(2, 11, 2),
+    })
+    feasible = ((grid_3d['total_power_w'] <= POWER_TARGET_W) &
+                (grid_3d['density_tflops_per_mm2'] >= DENSITY_TARGET))
+    print(f"\n3-D grid {grid_3d['density_tflops_per_mm2'].shape}: "
+          f"{feasible.sum()} of {feasible.size} points meet both targets")
+
+    fig, axes = plt.subplots(1, 3, figsize=(22, 6))
+    plot_interaction(base_soc,
+                     'chiplet_config.area_mm2', area,
+                     'chiplet_config.num_sms', sms,
+                     metric='density_tflops_per_mm2', labels=labels, ax=axes[0])
+    plot_interaction(base_soc,
+                     'chiplet_config.sm_config.clock_mhz', np.linspace(1500, 3000, 500),
+                     'chiplet_config.num_sms', np.linspace(16, 128, 500),
+                     metric='efficiency_tflops_per_w', labels=labels, ax=axes[1])
+    plot_interaction(base_soc,
+                     'num_chiplets', np.arange(2, 13),
+                     'chiplet_config.num_sms', np.linspace(16, 128, 500),
+                     metric='total_power_w', labels=labels, ax=axes[2])
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'interaction_analysis.png')
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Interaction plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
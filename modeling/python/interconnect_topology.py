@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Chiplet Interconnect Topology Model
+
+Builds the UCIe link graph for a chiplet layout and derives the metrics
+that decide how far a multi-chiplet SoC scales:
+
+- Hop counts: all-pairs shortest paths (level-synchronous BFS from every
+  chiplet at once, as boolean matrix products)
+- Bisection bandwidth: the smallest balanced cut over geometric cuts of
+  the layout and a spectral (Fiedler-vector) bisection
+- All-to-all throughput: uniform traffic split evenly over all shortest
+  paths; per-link load is the edge betweenness (Brandes' dependency
+  accumulation, vectorized over sources), and the most loaded link sets
+  the sustainable injection rate
+
+Layouts: ring, 2-D mesh, 2-D torus, a central switch die, and fully
+connected. Each link carries ucIe_bandwidth_gbps per direction. This
+module has no dependency on performance_model.py so ScalingModel can use
+it; results are cached per (topology, chiplet count, link bandwidth).
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Tuple
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+import profiling
+
+
+TOPOLOGIES = ('ring', 'mesh', 'torus', 'switch', 'fully_connected')
+
+
+@dataclass(frozen=True)
+class TopologyMetrics:
+    """Connectivity and bandwidth of one chiplet layout"""
+    topology: str
+    num_chiplets: int
+    num_links: int
+    diameter: int
+    average_hops: float
+    bisection_links: int
+    bisection_bandwidth_gbps: float
+    all_to_all_gbps: float              # Aggregate over all chiplets
+    per_chiplet_all_to_all_gbps: float  # Injection rate per chiplet
+
+
+def grid_shape(num_chiplets: int) -> Tuple[int, int]:
+    """Most square rows x cols factorization (rows <= cols)"""
+    rows = int(np.sqrt(num_chiplets))
+    while num_chiplets % rows:
+        rows -= 1
+    return rows, num_chiplets // rows
+
+
+def build_topology(topology: str, num_chiplets: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Link graph of a chiplet layout
+
+    Args:
+        topology: One of TOPOLOGIES
+        num_chiplets: Number of chiplets
+
+    Returns:
+        Tuple of (adjacency (N, N) bool, is_chiplet (N,) bool, coords (N, 2)),
+        where N includes switch nodes
+    """
+    n = num_chiplets
+    index = np.arange(n)
+
+    if topology in ('ring', 'fully_connected'):
+        angle = 2 * np.pi * index / n
+        coords = np.stack([np.cos(angle), np.sin(angle)], axis=-1)
+        adjacency = np.zeros((n, n), dtype=bool)
+        if topology == 'ring':
+            adjacency[index, (index + 1) % n] = True
+        else:
+            adjacency[:] = True
+        is_chiplet = np.ones(n, dtype=bool)
+
+    elif topology in ('mesh', 'torus'):
+        rows, cols = grid_shape(n)
+        r, c = np.divmod(index, cols)
+        coords = np.stack([r, c], axis=-1).astype(float)
+        adjacency = np.zeros((n, n), dtype=bool)
+        right = c + 1 < cols
+        down = r + 1 < rows
+        adjacency[index[right], index[right] + 1] = True
+        adjacency[index[down], index[down] + cols] = True
+        if topology == 'torus':
+            # Wraparound links only where they add a new neighbor
+            if cols > 2:
+                last = index[c == cols - 1]
+                adjacency[last, last - (cols - 1)] = True
+            if rows > 2:
+                bottom = index[r == rows - 1]
+                adjacency[bottom, bottom - (rows - 1) * cols] = True
+        is_chiplet = np.ones(n, dtype=bool)
+
+    elif topology == 'switch':
+        # Node n is the switch die; every chiplet has one link to it
+        angle = 2 * np.pi * index / n
+        coords = np.vstack([np.stack([np.cos(angle), np.sin(angle)], axis=-1), [[0.0, 0.0]]])
+        adjacency = np.zeros((n + 1, n + 1), dtype=bool)
+        adjacency[index, n] = True
+        is_chiplet = np.append(np.ones(n, dtype=bool), False)
+
+    else:
+        raise ValueError(f"Unknown topology: {topology}")
+
+    adjacency = adjacency | adjacency.T
+    np.fill_diagonal(adjacency, False)
+    return adjacency, is_chiplet, coords
+
+
+def hop_counts(adjacency: np.ndarray, sources: np.ndarray = None) -> np.ndarray:
+    """
+    Shortest-path hop counts by BFS from all sources at once
+
+    Args:
+        adjacency: (N, N) bool adjacency matrix
+        sources: Source node indices (default: all nodes)
+
+    Returns:
+        (S, N) integer distances, -1 where unreachable
+    """
+    n = len(adjacency)
+    sources = np.arange(n) if sources is None else np.asarray(sources)
+    adj = adjacency.astype(np.int32)
+
+    distances = np.full((len(sources), n), -1, dtype=np.int64)
+    frontier = np.zeros((len(sources), n), dtype=bool)
+    frontier[np.arange(len(sources)), sources] = True
+    visited = frontier.copy()
+    level = 0
+    while frontier.any():
+        distances[frontier] = level
+        frontier = ((frontier.astype(np.int32) @ adj) > 0) & ~visited
+        visited |= frontier
+        level += 1
+    return distances
+
+
+def edge_loads(adjacency: np.ndarray, is_chiplet: np.ndarray) -> np.ndarray:
+    """
+    Directed link load for uniform all-to-all traffic between chiplets
+
+    Each ordered chiplet pair sends one unit, split evenly across all
+    shortest paths (switch nodes forward but neither send nor receive).
+
+    Returns:
+        (N, N) array: units of traffic on link v -> w
+    """
+    sources = np.flatnonzero(is_chiplet)
+    dist = hop_counts(adjacency, sources)
+    adj = adjacency.astype(float)
+    levels = dist.max()
+
+    # Number of shortest paths from each source, level by level
+    sigma = np.zeros(dist.shape)
+    sigma[dist == 0] = 1.0
+    for d in range(1, levels + 1):
+        at_level = dist == d
+        sigma[at_level] = ((sigma * (dist == d - 1)) @ adj)[at_level]
+
+    # Backward dependency accumulation (Brandes), all sources at once
+    targets = is_chiplet.astype(float)[np.newaxis, :]
+    delta = np.zeros(dist.shape)
+    loads = np.zeros(adj.shape)
+    for d in range(levels - 1, -1, -1):
+        upper = (dist == d) * sigma
+        lower = dist == d + 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.where(lower, (targets + delta) / sigma, 0.0)
+        loads += adj * (upper.T @ x)
+        delta += upper * (x @ adj.T)
+    return loads
+
+
+def _cut_links(adjacency: np.ndarray, side: np.ndarray) -> int:
+    return int(adjacency[side][:, ~side].sum())
+
+
+def bisection_links(adjacency: np.ndarray, is_chiplet: np.ndarray, coords: np.ndarray) -> int:
+    """
+    Links crossing the narrowest balanced cut of the chiplets
+
+    Candidates are halves along each layout axis, contiguous halves of a
+    circular layout, and the spectral bisection; switch nodes go to
+    whichever side gives the smaller cut.
+    """
+    chiplets = np.flatnonzero(is_chiplet)
+    switches = np.flatnonzero(~is_chiplet)
+    half = len(chiplets) // 2
+    candidates: List[np.ndarray] = []
+
+    for axis in range(coords.shape[1]):
+        candidates.append(np.lexsort((chiplets, coords[chiplets, axis])))
+    angle = np.arctan2(coords[chiplets, 1], coords[chiplets, 0])
+    by_angle = np.argsort(angle, kind='stable')
+    for shift in range(len(chiplets)):
+        candidates.append(np.roll(by_angle, shift))
+
+    # Fiedler vector of the graph Laplacian
+    laplacian = np.diag(adjacency.sum(axis=1)) - adjacency.astype(float)
+    _, vectors = np.linalg.eigh(laplacian)
+    candidates.append(np.argsort(vectors[chiplets, 1], kind='stable'))
+
+    best = None
+    for order in candidates:
+        side = np.zeros(len(adjacency), dtype=bool)
+        side[chiplets[order[:half]]] = True
+        cuts = []
+        for assignment in range(2 ** len(switches)):
+            side[switches] = [(assignment >> i) & 1 for i in range(len(switches))]
+            cuts.append(_cut_links(adjacency, side))
+        cut = min(cuts)
+        best = cut if best is None else min(best, cut)
+    return best
+
+
+@lru_cache(maxsize=None)
+def topology_metrics(topology: str, num_chiplets: int,
+                     link_bandwidth_gbps: float) -> TopologyMetrics:
+    """
+    Hop counts, bisection and all-to-all bandwidth of a layout (cached)
+
+    Args:
+        topology: One of TOPOLOGIES
+        num_chiplets: Number of chiplets
+        link_bandwidth_gbps: Per-direction bandwidth of one UCIe link
+
+    Returns:
+        TopologyMetrics
+    """
+    adjacency, is_chiplet, coords = build_topology(topology, num_chiplets)
+    if num_chiplets < 2:
+        return TopologyMetrics(topology, num_chiplets, 0, 0, 0.0, 0, 0.0, 0.0, 0.0)
+
+    chiplets = np.flatnonzero(is_chiplet)
+    hops = hop_counts(adjacency, chiplets)[:, chiplets]
+    pairs = num_chiplets * (num_chiplets - 1)
+
+    cut = bisection_links(adjacency, is_chiplet, coords)
+    rate = link_bandwidth_gbps / edge_loads(adjacency, is_chiplet).max()
+
+    return TopologyMetrics(
+        topology=topology,
+        num_chiplets=num_chiplets,
+        num_links=int(adjacency.sum()) // 2,
+        diameter=int(hops.max()),
+        average_hops=float(hops.sum() / pairs),
+        bisection_links=cut,
+        bisection_bandwidth_gbps=cut * link_bandwidth_gbps,
+        all_to_all_gbps=float(rate * pairs),
+        per_chiplet_all_to_all_gbps=float(rate * (num_chiplets - 1)),
+    )
+
+
+profiling.register_cache('interconnect_topology.topology_metrics', topology_metrics)
+
+
+def main():
+    """Compare layouts from 4 to 128 chiplets"""
+    import time
+
+    print("=" * 100)
+    print("NexGen-AI SoC Chiplet Interconnect Topology")
+    print("=" * 100)
+
+    link_gbps = 256  # ChipletConfig.ucIe_bandwidth_gbps default
+    counts = [4, 8, 16, 32, 64, 128]
+
+    start = time.perf_counter()
+    metrics = {t: [topology_metrics(t, n, link_gbps) for n in counts] for t in TOPOLOGIES}
+    elapsed = time.perf_counter() - start
+    print(f"\nUCIe link: {link_gbps} GB/s per direction; "
+          f"{len(TOPOLOGIES) * len(counts)} layouts evaluated in {elapsed:.2f} s")
+
+    for topology, rows in metrics.items():
+        print(f"\n{topology.upper()}")
+        print(f"{'Chiplets':<10} {'Links':<8} {'Diameter':<10} {'Avg Hops':<10} "
+              f"{'Bisection (TB/s)':<18} {'All-to-All (TB/s)':<19} {'Per Chiplet (GB/s)':<18}")
+        print("-" * 95)
+        for m in rows:
+            print(f"{m.num_chiplets:<10} {m.num_links:<8} {m.diameter:<10} {m.average_hops:<10.2f} "
+                  f"{m.bisection_bandwidth_gbps / 1000:<18.2f} {m.all_to_all_gbps / 1000:<19.2f} "
+                  f"{m.per_chiplet_all_to_all_gbps:<18.1f}")
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for topology, rows in metrics.items():
+        axes[0].loglog(counts, [m.bisection_bandwidth_gbps / 1000 for m in rows], 'o-',
+                       linewidth=2, label=topology)
+        axes[1].semilogx(counts, [m.per_chiplet_all_to_all_gbps for m in rows], 'o-',
+                         linewidth=2, label=topology)
+    axes[0].set_ylabel('Bisection Bandwidth (TB/s)', fontsize=12)
+    axes[1].set_ylabel('All-to-All Injection per Chiplet (GB/s)', fontsize=12)
+    for ax in axes:
+        ax.set_xlabel('Number of Chiplets', fontsize=12)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+    fig.suptitle(f'Chiplet Interconnect Scaling ({link_gbps} GB/s UCIe links)', fontsize=14)
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'interconnect_topology.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Topology scaling plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
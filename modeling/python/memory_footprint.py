@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+HBM Capacity and KV-Cache Footprint Model
+
+Determines whether an LLM serving configuration fits in HBM and how
+large a batch it can hold. The footprint is split into:
+
+1. Weights (parameter count x weight precision)
+2. KV cache (2 x layers x KV heads x head dim x context x batch)
+3. Activation workspace (prefill chunk or decode batch) and logits
+4. A reserved fraction for runtime buffers and fragmentation
+
+The max-batch solver is closed-form and vectorized over context lengths
+(and any other broadcast axis). The resulting batch is fed into the
+roofline to give decode throughput at the memory limit.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import (
+    SoCConfig, PerformanceModel,
+    Precision, BYTES_PER_ELEMENT
+)
+
+
+@dataclass
+class TransformerConfig:
+    """Decoder-only transformer shape (gated MLP, grouped-query attention)"""
+    name: str
+    num_layers: int
+    hidden_size: int
+    num_heads: int
+    num_kv_heads: int
+    intermediate_size: int
+    vocab_size: int
+    head_dim: int = None
+
+    def __post_init__(self):
+        if self.head_dim is None:
+            self.head_dim = self.hidden_size // self.num_heads
+
+    @property
+    def params_per_layer(self) -> int:
+        q_dim = self.num_heads * self.head_dim
+        kv_dim = self.num_kv_heads * self.head_dim
+        attention = self.hidden_size * (2 * q_dim + 2 * kv_dim)  # Q, O, K, V
+        mlp = 3 * self.hidden_size * self.intermediate_size       # gate, up, down
+        return attention + mlp
+
+    @property
+    def num_params(self) -> int:
+        """Total parameters (untied input embedding and LM head)"""
+        return self.num_layers * self.params_per_layer + 2 * self.vocab_size * self.hidden_size
+
+    def kv_elements_per_token(self) -> int:
+        """K and V elements cached per token across all layers"""
+        return 2 * self.num_layers * self.num_kv_heads * self.head_dim
+
+    def decode_flops_per_token(self, context: np.ndarray) -> np.ndarray:
+        """FLOPs to generate one token at the given context length"""
+        matmul = 2 * (self.num_params - self.vocab_size * self.hidden_size)
+        attention = 4 * self.num_layers * self.num_heads * self.head_dim * np.asarray(context)
+        return matmul + attention
+
+
+# Reference model shapes
+LLAMA_8B = TransformerConfig('8B (GQA-8)', num_layers=32, hidden_size=4096, num_heads=32,
+                             num_kv_heads=8, intermediate_size=14336, vocab_size=128256)
+LLAMA_70B = TransformerConfig('70B (GQA-8)', num_layers=80, hidden_size=8192, num_heads=64,
+                              num_kv_heads=8, intermediate_size=28672, vocab_size=128256)
+LLAMA_405B = TransformerConfig('405B (GQA-8)', num_layers=126, hidden_size=16384, num_heads=128,
+                               num_kv_heads=8, intermediate_size=53248, vocab_size=128256)
+
+
+class MemoryFootprintModel:
+    """HBM footprint of serving one transformer on one SoC"""
+
+    def __init__(self, soc_config: SoCConfig, model: TransformerConfig,
+                 weight_precision: Precision = Precision.FP8,
+                 kv_precision: Precision = Precision.FP8,
+                 activation_precision: Precision = Precision.BF16,
+                 prefill_chunk_tokens: int = 8192,
+                 reserved_fraction: float = 0.05):
+        """
+        Args:
+            soc_config: SoC configuration (HBM capacity and roofline)
+            model: Transformer shape
+            weight_precision: Storage precision of the weights
+            kv_precision: Storage precision of the KV cache
+            activation_precision: Precision of activation workspace
+            prefill_chunk_tokens: Tokens per prefill chunk (sizes the workspace)
+            reserved_fraction: HBM held back for runtime and fragmentation
+        """
+        self.config = soc_config
+        self.model = model
+        self.weight_precision = weight_precision
+        self.kv_precision = kv_precision
+        self.activation_precision = activation_precision
+        self.prefill_chunk_tokens = prefill_chunk_tokens
+        self.reserved_fraction = reserved_fraction
+
+    def capacity_bytes(self) -> float:
+        return self.config.total_hbm_capacity_gb * 1e9
+
+    def usable_bytes(self) -> float:
+        return self.capacity_bytes() * (1 - self.reserved_fraction)
+
+    def weight_bytes(self) -> float:
+        return self.model.num_params * BYTES_PER_ELEMENT[self.weight_precision]
+
+    def kv_bytes_per_token(self) -> float:
+        return self.model.kv_elements_per_token() * BYTES_PER_ELEMENT[self.kv_precision]
+
+    def kv_cache_bytes(self, batch: np.ndarray, context: np.ndarray) -> np.ndarray:
+        return self.kv_bytes_per_token() * np.asarray(batch) * np.asarray(context)
+
+    def activation_bytes_per_token(self) -> float:
+        """Live activations per token in flight (residual, QKV, MLP intermediates)"""
+        m = self.model
+        elements = (4 * m.hidden_size + 2 * m.intermediate_size +
+                    (m.num_heads + 2 * m.num_kv_heads) * m.head_dim)
+        return elements * BYTES_PER_ELEMENT[self.activation_precision]
+
+    def logits_bytes_per_sequence(self) -> float:
+        return self.model.vocab_size * BYTES_PER_ELEMENT[Precision.FP32]
+
+    def activation_bytes(self, batch: np.ndarray) -> np.ndarray:
+        """Workspace for the larger of a prefill chunk and the decode batch"""
+        tokens = np.maximum(np.asarray(batch), self.prefill_chunk_tokens)
+        return (tokens * self.activation_bytes_per_token() +
+                np.asarray(batch) * self.logits_bytes_per_sequence())
+
+    def total_bytes(self, batch: np.ndarray, context: np.ndarray) -> np.ndarray:
+        return (self.weight_bytes() + self.kv_cache_bytes(batch, context) +
+                self.activation_bytes(batch))
+
+    def fits(self, batch: np.ndarray, context: np.ndarray) -> np.ndarray:
+        return self.total_bytes(batch, context) <= self.usable_bytes()
+
+    def max_batch(self, context: np.ndarray) -> np.ndarray:
+        """
+        Largest batch whose footprint fits at each context length
+
+        The activation workspace is max(batch, chunk) tokens, so the
+        footprint is linear in batch on either side of the chunk size;
+        both pieces are solved in closed form and the valid one kept.
+
+        Args:
+            context: Context length(s) in tokens (any shape)
+
+        Returns:
+            Integer array of max batch sizes (0 if even one sequence does not fit)
+        """
+        context = np.asarray(context, dtype=float)
+        free = self.usable_bytes() - self.weight_bytes()
+        act = self.activation_bytes_per_token()
+        per_seq = self.kv_bytes_per_token() * context + self.logits_bytes_per_sequence()
+        chunk = self.prefill_chunk_tokens
+
+        # batch <= chunk: workspace fixed at chunk tokens
+        small = np.clip(np.floor((free - chunk * act) / per_seq), 0, chunk)
+        # batch > chunk: workspace grows with the batch
+        large = np.floor(free / (per_seq + act))
+        return np.where(large > chunk, large, small).astype(np.int64)
+
+    def decode_step(self, batch: np.ndarray, context: np.ndarray,
+                    compute_precision: Precision = None) -> Dict[str, np.ndarray]:
+        """
+        Roofline estimate of one decode step (one token for every sequence)
+
+        Args:
+            batch: Batch size(s)
+            context: Context length(s)
+            compute_precision: Tensor-core precision (default: weight precision)
+
+        Returns:
+            Dictionary with step time, tokens/s, achieved TFLOPS and intensity
+        """
+        precision = compute_precision or self.weight_precision
+        batch = np.asarray(batch, dtype=float)
+        flops = batch * self.model.decode_flops_per_token(context)
+        bytes_moved = self.weight_bytes() + self.kv_cache_bytes(batch, context)
+        intensity = flops / bytes_moved
+
+        perf_model = PerformanceModel(self.config)
+        achieved = perf_model.roofline_performance(np.atleast_1d(intensity), precision)
+        achieved = achieved.reshape(np.shape(intensity))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step_time = np.where(batch > 0, flops / (achieved * 1e12), np.nan)
+            tokens_per_s = np.where(batch > 0, batch / step_time, 0.0)
+
+        return {
+            'step_time_s': step_time,
+            'tokens_per_s': tokens_per_s,
+            'achieved_tflops': achieved,
+            'arithmetic_intensity': intensity,
+        }
+
+    def throughput_at_memory_limit(self, context: np.ndarray) -> Dict[str, np.ndarray]:
+        """Decode throughput with the batch set to the max that fits"""
+        batch = self.max_batch(context)
+        result = self.decode_step(batch, context)
+        result['max_batch'] = batch
+        return result
+
+
+def main():
+    """Capacity limits and decode throughput at the memory limit"""
+    print("=" * 100)
+    print("NexGen-AI SoC HBM Capacity and KV-Cache Analysis")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    print(f"\nHBM: {soc.hbm3e_stacks} stacks x {soc.hbm3e_capacity_gb_per_stack} GB = "
+          f"{soc.total_hbm_capacity_gb} GB, "
+          f"{PerformanceModel(soc).memory_bandwidth_tbps():.2f} TB/s")
+
+    contexts = np.array([2048, 4096, 8192, 16384, 32768, 65536, 131072])
+    scenarios = [
+        (LLAMA_8B, Precision.FP8, Precision.FP8),
+        (LLAMA_70B, Precision.FP8, Precision.FP8),
+        (LLAMA_70B, Precision.FP4, Precision.FP8),
+        (LLAMA_405B, Precision.FP4, Precision.FP8),
+    ]
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+
+    for model, weight_precision, kv_precision in scenarios:
+        fp = MemoryFootprintModel(soc, model, weight_precision, kv_precision)
+        label = f"{model.name}, W{weight_precision.value}/KV{kv_precision.value}"
+
+        print("\n" + "=" * 100)
+        print(label.upper())
+        print("=" * 100)
+        print(f"\n  Parameters: {model.num_params / 1e9:.1f} B")
+        print(f"  Weights: {fp.weight_bytes() / 1e9:.1f} GB")
+        print(f"  KV cache per token: {fp.kv_bytes_per_token() / 1024:.1f} KB")
+        print(f"  Usable HBM: {fp.usable_bytes() / 1e9:.1f} GB")
+
+        if fp.weight_bytes() > fp.usable_bytes():
+            print(f"  ✗ Weights alone exceed usable HBM capacity")
+            continue
+
+        r = fp.throughput_at_memory_limit(contexts)
+        print(f"\n  {'Context':<10} {'Max Batch':<12} {'KV (GB)':<12} {'Tokens/s':<14} "
+              f"{'TFLOPS':<10} {'AI (FLOP/B)':<12}")
+        print("  " + "-" * 76)
+        for i, ctx in enumerate(contexts):
+            kv = fp.kv_cache_bytes(r['max_batch'][i], ctx) / 1e9
+            print(f"  {ctx:<10} {r['max_batch'][i]:<12} {kv:<12.1f} "
+                  f"{r['tokens_per_s'][i]:<14.0f} {r['achieved_tflops'][i]:<10.1f} "
+                  f"{r['arithmetic_intensity'][i]:<12.1f}")
+
+        axes[0].loglog(contexts, np.maximum(r['max_batch'], 0.5), 'o-', linewidth=2, label=label)
+        axes[1].semilogx(contexts, r['tokens_per_s'], 'o-', linewidth=2, label=label)
+
+    axes[0].set_xlabel('Context Length (tokens)', fontsize=12)
+    axes[0].set_ylabel('Max Batch Size', fontsize=12)
+    axes[0].set_title('Max Batch at HBM Capacity', fontsize=14, fontweight='bold')
+    axes[1].set_xlabel('Context Length (tokens)', fontsize=12)
+    axes[1].set_ylabel('Decode Throughput (tokens/s)', fontsize=12)
+    axes[1].set_title('Decode Throughput at Memory Limit', fontsize=14, fontweight='bold')
+    for ax in axes:
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=9)
+
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'memory_footprint.png')
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Memory footprint plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Uncertainty Propagation
+
+Process variation and binning turn point parameters (clock, SM power,
+leakage, die area) into distributions. This tool samples those
+distributions and propagates them through the analytic models to report
+quantiles of density, power and efficiency, and the probability of
+meeting the PRD targets.
+
+Samples are evaluated in fixed-size chunks so memory stays bounded for
+10^7+ samples. Each chunk draws from its own random stream spawned from
+a single seed, so results are reproducible and independent of the number
+of worker processes.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, PowerModel, Precision
+from batch_model import evaluate_batch, DENSITY_TARGET, POWER_TARGET_W
+from arch_exploration import create_aggressive_optimized
+
+
+METRICS = [
+    ('density_tflops_per_mm2', 'Density (TFLOPS/mm²)'),
+    ('total_power_w', 'Power (W)'),
+    ('efficiency_tflops_per_w', 'Efficiency (TFLOPS/W)'),
+]
+
+# Log-spaced histogram used for streaming quantiles (~0.1% resolution)
+HIST_LOG10_MIN = -6.0
+HIST_LOG10_MAX = 6.0
+HIST_BINS_PER_DECADE = 2000
+
+
+@dataclass
+class ParameterDistribution:
+    """
+    Distribution of a single configuration parameter
+
+    kind / params:
+        'normal'     (mean, std)
+        'uniform'    (low, high)
+        'triangular' (low, mode, high)
+        'lognormal'  (median, sigma)
+        'choice'     (value, value, ...) with optional weights (bins)
+    """
+    kind: str
+    params: Tuple[float, ...]
+    weights: Tuple[float, ...] = None
+    clip: Tuple[float, float] = None
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Draw samples using the given random generator"""
+        if self.kind == 'normal':
+            mean, std = self.params
+            values = rng.normal(mean, std, size)
+        elif self.kind == 'uniform':
+            low, high = self.params
+            values = rng.uniform(low, high, size)
+        elif self.kind == 'triangular':
+            low, mode, high = self.params
+            values = rng.triangular(low, mode, high, size)
+        elif self.kind == 'lognormal':
+            median, sigma = self.params
+            values = rng.lognormal(np.log(median), sigma, size)
+        elif self.kind == 'choice':
+            p = None
+            if self.weights is not None:
+                p = np.asarray(self.weights, dtype=float)
+                p = p / p.sum()
+            values = rng.choice(np.asarray(self.params, dtype=float), size=size, p=p)
+        else:
+            raise ValueError(f"Unknown distribution: {self.kind}")
+
+        if self.clip is not None:
+            values = np.clip(values, *self.clip)
+        return values
+
+
+@dataclass
+class MetricAccumulator:
+    """Streaming statistics of a positive metric (mergeable across chunks)"""
+    counts: np.ndarray = None
+    count: int = 0
+    total: float = 0.0
+    total_sq: float = 0.0
+    min_value: float = np.inf
+    max_value: float = -np.inf
+
+    def __post_init__(self):
+        if self.counts is None:
+            num_bins = int((HIST_LOG10_MAX - HIST_LOG10_MIN) * HIST_BINS_PER_DECADE)
+            # Extra bins at both ends collect under/overflow
+            self.counts = np.zeros(num_bins + 2, dtype=np.int64)
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.ravel(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_values = np.log10(values)
+        idx = np.floor((log_values - HIST_LOG10_MIN) * HIST_BINS_PER_DECADE)
+        idx = np.clip(np.nan_to_num(idx, nan=-1, neginf=-1), -1, len(self.counts) - 2)
+        self.counts += np.bincount(idx.astype(np.int64) + 1, minlength=len(self.counts))
+
+        self.count += values.size
+        self.total += float(values.sum())
+        self.total_sq += float(np.square(values).sum())
+        self.min_value = min(self.min_value, float(values.min()))
+        self.max_value = max(self.max_value, float(values.max()))
+
+    def merge(self, other: 'MetricAccumulator') -> None:
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+
+    @property
+    def std(self) -> float:
+        return np.sqrt(max(self.total_sq / self.count - self.mean ** 2, 0.0))
+
+    def bin_edges(self) -> np.ndarray:
+        """Edges of the interior histogram bins"""
+        num_bins = len(self.counts) - 2
+        return 10 ** (HIST_LOG10_MIN + np.arange(num_bins + 1) / HIST_BINS_PER_DECADE)
+
+    def quantile(self, q: float) -> float:
+        """Quantile interpolated geometrically within a histogram bin"""
+        cumulative = np.cumsum(self.counts)
+        target = q * self.count
+        i = int(np.searchsorted(cumulative, target, side='left'))
+        if i == 0:
+            return self.min_value
+        if i >= len(self.counts) - 1:
+            return self.max_value
+
+        below = cumulative[i - 1]
+        frac = (target - below) / self.counts[i] if self.counts[i] else 0.0
+        log_low = HIST_LOG10_MIN + (i - 1) / HIST_BINS_PER_DECADE
+        value = 10 ** (log_low + frac / HIST_BINS_PER_DECADE)
+        return float(np.clip(value, self.min_value, self.max_value))
+
+
+@dataclass
+class MonteCarloResult:
+    """Aggregated Monte Carlo statistics"""
+    num_samples: int = 0
+    metrics: Dict[str, MetricAccumulator] = field(default_factory=dict)
+    meets_power: int = 0
+    meets_density: int = 0
+    meets_both: int = 0
+
+    def __post_init__(self):
+        for name, _ in METRICS:
+            self.metrics.setdefault(name, MetricAccumulator())
+
+    def merge(self, other: 'MonteCarloResult') -> None:
+        self.num_samples += other.num_samples
+        for name, acc in other.metrics.items():
+            self.metrics[name].merge(acc)
+        self.meets_power += other.meets_power
+        self.meets_density += other.meets_density
+        self.meets_both += other.meets_both
+
+    def quantiles(self, qs: List[float] = (0.01, 0.05, 0.5, 0.95, 0.99)) -> Dict[str, Dict[float, float]]:
+        return {name: {q: acc.quantile(q) for q in qs}
+                for name, acc in self.metrics.items()}
+
+    @property
+    def probability_power(self) -> float:
+        return self.meets_power / self.num_samples
+
+    @property
+    def probability_density(self) -> float:
+        return self.meets_density / self.num_samples
+
+    @property
+    def probability_both(self) -> float:
+        return self.meets_both / self.num_samples
+
+
+class MonteCarloAnalysis:
+    """Propagate parameter distributions through the performance/power models"""
+
+    def __init__(self, base_soc: SoCConfig,
+                 distributions: Dict[str, ParameterDistribution],
+                 precision: Precision = Precision.FP16,
+                 utilization: float = 1.0,
+                 density_target: float = DENSITY_TARGET,
+                 power_target_w: float = POWER_TARGET_W):
+        self.base_soc = base_soc
+        self.distributions = distributions
+        self.precision = precision
+        self.utilization = utilization
+        self.density_target = density_target
+        self.power_target_w = power_target_w
+
+    def sample(self, rng: np.random.Generator, size: int) -> Dict[str, np.ndarray]:
+        """Draw one set of parameter samples (dotted path -> values)"""
+        return {path: dist.sample(rng, size)
+                for path, dist in self.distributions.items()}
+
+    def evaluate_chunk(self, seed: np.random.SeedSequence, size: int) -> MonteCarloResult:
+        """Sample and evaluate one chunk using its own random stream"""
+        rng = np.random.default_rng(seed)
+        metrics = evaluate_batch(self.base_soc, self.sample(rng, size),
+                                 self.precision, self.utilization)
+
+        result = MonteCarloResult(num_samples=size)
+        for name, _ in METRICS:
+            result.metrics[name].add(metrics[name])
+
+        meets_power = metrics['total_power_w'] <= self.power_target_w
+        meets_density = metrics['density_tflops_per_mm2'] >= self.density_target
+        result.meets_power = int(meets_power.sum())
+        result.meets_density = int(meets_density.sum())
+        result.meets_both = int((meets_power & meets_density).sum())
+        return result
+
+    def run(self, num_samples: int, chunk_size: int = 1_000_000,
+            workers: int = 1, seed: int = 0) -> MonteCarloResult:
+        """
+        Run the Monte Carlo analysis
+
+        Args:
+            num_samples: Total number of samples
+            chunk_size: Samples evaluated per chunk (bounds peak memory)
+            workers: Number of worker processes
+            seed: Root seed; each chunk gets an independent spawned stream
+
+        Returns:
+            Aggregated MonteCarloResult
+        """
+        num_chunks = -(-num_samples // chunk_size)
+        sizes = [chunk_size] * (num_chunks - 1) + [num_samples - chunk_size * (num_chunks - 1)]
+        seeds = np.random.SeedSequence(seed).spawn(num_chunks)
+
+        result = MonteCarloResult()
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for chunk in pool.map(self.evaluate_chunk, seeds, sizes):
+                    result.merge(chunk)
+        else:
+            for s, n in zip(seeds, sizes):
+                result.merge(self.evaluate_chunk(s, n))
+        return result
+
+
+def plot_distributions(result: MonteCarloResult, save_path: str = None):
+    """Plot metric distributions with PRD target lines"""
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+    targets = {
+        'density_tflops_per_mm2': DENSITY_TARGET,
+        'total_power_w': POWER_TARGET_W,
+    }
+
+    for ax, (name, label) in zip(axes, METRICS):
+        acc = result.metrics[name]
+        edges = acc.bin_edges()
+        counts = acc.counts[1:-1]
+        nonzero = np.nonzero(counts)[0]
+        lo, hi = nonzero[0], nonzero[-1] + 1
+
+        # Re-bin to ~100 bars for display
+        step = max((hi - lo) // 100, 1)
+        bar_counts = np.add.reduceat(counts[lo:hi], np.arange(0, hi - lo, step))
+        bar_edges = edges[lo:hi + 1:step]
+        if len(bar_edges) == len(bar_counts):
+            bar_edges = np.append(bar_edges, edges[hi])
+        widths = np.diff(bar_edges)
+        ax.bar(bar_edges[:-1], bar_counts / result.num_samples / widths,
+               width=widths, align='edge', alpha=0.7)
+
+        if name in targets:
+            ax.axvline(targets[name], color='k', linestyle='--', linewidth=2,
+                       label=f'Target: {targets[name]}')
+            ax.legend()
+        for q in (0.05, 0.5, 0.95):
+            ax.axvline(acc.quantile(q), color='r', linestyle=':', alpha=0.7)
+
+        ax.set_xlabel(label, fontsize=12)
+        ax.set_ylabel('Probability Density', fontsize=12)
+        ax.set_title(f'{label}\n(P5 / P50 / P95 dotted)', fontsize=12, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+
+    if save_path:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.close()
+        print(f"\n✓ Monte Carlo plot saved: {save_path}")
+    else:
+        plt.show()
+
+
+def main():
+    """Monte Carlo analysis of the aggressive optimized variant"""
+    print("=" * 100)
+    print("NexGen-AI SoC Monte Carlo Uncertainty Analysis")
+    print("=" * 100)
+
+    variant = create_aggressive_optimized()
+    sm = variant.sm_config
+    power_model = PowerModel(variant.soc_config)
+
+    distributions = {
+        # Speed binning: sustained clock spreads around the design target
+        'chiplet_config.sm_config.clock_mhz': ParameterDistribution(
+            'normal', (sm.clock_mhz, 0.03 * sm.clock_mhz),
+            clip=(0.85 * sm.clock_mhz, 1.05 * sm.clock_mhz)),
+        # Dynamic power varies with Vt and capacitance
+        'power.sm_dynamic_power_mw': ParameterDistribution(
+            'lognormal', (power_model.sm_dynamic_power_mw, 0.08)),
+        # Leakage is exponential in Vt, so heavily right-skewed
+        'power.static_power_per_chiplet_w': ParameterDistribution(
+            'lognormal', (power_model.static_power_per_chiplet_w, 0.35)),
+        # Final die area after place-and-route
+        'chiplet_config.area_mm2': ParameterDistribution(
+            'triangular', (0.97 * variant.chiplet_config.area_mm2,
+                           variant.chiplet_config.area_mm2,
+                           1.10 * variant.chiplet_config.area_mm2)),
+    }
+
+    print(f"\nDesign: {variant.name}")
+    print(f"\n{'Parameter':<45} {'Distribution':<15} {'Parameters':<30}")
+    print("-" * 100)
+    for path, dist in distributions.items():
+        params = ', '.join(f'{p:g}' for p in dist.params)
+        print(f"{path:<45} {dist.kind:<15} {params:<30}")
+
+    num_samples = 10_000_000
+    analysis = MonteCarloAnalysis(variant.soc_config, distributions)
+    result = analysis.run(num_samples, chunk_size=1_000_000,
+                          workers=os.cpu_count() or 1, seed=2026)
+
+    print("\n" + "=" * 100)
+    print(f"RESULTS ({result.num_samples:,} samples)")
+    print("=" * 100)
+
+    qs = (0.01, 0.05, 0.5, 0.95, 0.99)
+    quantiles = result.quantiles(qs)
+    header = ''.join(f"{'P' + format(q * 100, 'g'):<12}" for q in qs)
+    print(f"\n{'Metric':<28} {'Mean':<12} {header}")
+    print("-" * 100)
+    for name, label in METRICS:
+        row = ''.join(f"{quantiles[name][q]:<12.3f}" for q in qs)
+        print(f"{label:<28} {result.metrics[name].mean:<12.3f} {row}")
+
+    print(f"\nP(power <= {POWER_TARGET_W:.0f} W): {result.probability_power * 100:.2f}%")
+    print(f"P(density >= {DENSITY_TARGET} TFLOPS/mm²): {result.probability_density * 100:.2f}%")
+    print(f"P(both targets): {result.probability_both * 100:.2f}%")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    plot_distributions(result, save_path=os.path.join(outputs_dir, 'monte_carlo.png'))
+
+
+if __name__ == "__main__":
+    main()
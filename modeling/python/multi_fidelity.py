@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Multi-Fidelity Design Search
+
+The analytic models evaluate millions of designs per second through
+batch_model.py, but the models that capture throttling, scheduling or
+cache behaviour (power_capping.py, serving_simulator.py,
+cache_simulator.py) cost milliseconds to seconds per design. This
+module runs them only where they can change the answer:
+
+1. Screen: a vectorized analytic metric function over the whole sample
+   matrix, in chunks
+2. Band: designs on or near the Pareto front of two screen objectives
+   (epsilon-dominance, relative to each objective's range), optionally
+   truncated to the best max_band by the first objective
+3. Stages: each higher-fidelity stage evaluates the designs promoted by
+   the previous one, one design per task across worker processes, and
+   promotes its top-k by its own objective
+
+Stage functions take one scalar SoCConfig and return a dict of floats,
+so any existing simulator can be wrapped as a stage.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import copy
+import numpy as np
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, List, Sequence
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, Precision, BYTES_PER_ELEMENT
+from batch_model import batch_models, set_param, evaluate_batch
+from power_capping import capped_operating_point
+from memory_footprint import TransformerConfig, LLAMA_8B
+from serving_simulator import ServingSimulator, synthetic_trace, latency_summary
+
+
+@dataclass
+class FidelityStage:
+    """One higher-fidelity evaluation stage"""
+    name: str
+    evaluate: Callable[[SoCConfig], Dict[str, float]]  # Picklable for workers > 1
+    objective: str                                     # Metric used for promotion
+    keep: int                                          # Designs promoted to the next stage
+    maximize: bool = True
+
+
+@dataclass
+class StageResult:
+    """Designs evaluated by one stage and those it promoted"""
+    name: str
+    indices: np.ndarray          # Sample rows evaluated
+    metrics: Dict[str, np.ndarray]
+    promoted: np.ndarray         # Sample rows passed on (best first)
+    seconds: float
+
+
+def pareto_band(objectives: np.ndarray, epsilon: float = 0.0) -> np.ndarray:
+    """
+    Designs on or within epsilon of the Pareto front (both objectives maximized)
+
+    A design is dropped only if another design beats it by more than
+    epsilon times the objective's range in both objectives. Runs in
+    O(N log N): sort by the first objective, prefix-max the second.
+
+    Args:
+        objectives: Array (N, 2)
+        epsilon: Band width as a fraction of each objective's range
+
+    Returns:
+        Indices of the band
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    if objectives.ndim != 2 or objectives.shape[1] != 2:
+        raise ValueError(f"Pareto band needs an (N, 2) objective array, got {objectives.shape}")
+    objectives = np.where(np.isnan(objectives), -np.inf, objectives)
+
+    finite = np.where(np.isfinite(objectives), objectives, np.nan)
+    scale = np.nanmax(finite, axis=0) - np.nanmin(finite, axis=0)
+    tolerance = epsilon * np.where(scale > 0, scale, 1.0)
+    x, y = objectives[:, 0], objectives[:, 1]
+
+    order = np.argsort(-x, kind='stable')
+    best_y = np.maximum.accumulate(y[order])
+    # Number of designs whose x exceeds x_i + tolerance
+    beaten = np.searchsorted(-x[order], -(x + tolerance[0]), side='left')
+    dominated = (beaten > 0) & (best_y[np.maximum(beaten - 1, 0)] > y + tolerance[1])
+    return np.flatnonzero(~dominated & np.isfinite(x) & np.isfinite(y))
+
+
+def top_k(values: np.ndarray, k: int, maximize: bool = True) -> np.ndarray:
+    """Positions of the k best values, best first (NaN ranks last)"""
+    values = np.asarray(values, dtype=float)
+    score = values if maximize else -values
+    score = np.where(np.isnan(score), -np.inf, score)
+    k = min(k, len(score))
+    if k <= 0:
+        return np.array([], dtype=int)
+    best = np.argpartition(-score, k - 1)[:k]
+    return best[np.argsort(-score[best], kind='stable')]
+
+
+def design_config(base_soc: SoCConfig, paths: Sequence[str], row: np.ndarray) -> SoCConfig:
+    """Scalar SoCConfig for one sample row"""
+    soc = copy.deepcopy(base_soc)
+    for path, value in zip(paths, row):
+        set_param(soc, path, value.item())
+    return soc
+
+
+def screen_samples(
+    base_soc: SoCConfig,
+    paths: Sequence[str],
+    samples: np.ndarray,
+    screen: Callable = evaluate_batch,
+    chunk_size: int = 1_000_000
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized analytic screen of a sample matrix
+
+    Args:
+        base_soc: Base SoC configuration
+        paths: Dotted parameter path for each column of samples
+        samples: Array (num_samples, len(paths))
+        screen: Function (base_soc, overrides) -> dict of metric arrays,
+            e.g. batch_model.evaluate_batch
+        chunk_size: Maximum rows evaluated at once (bounds peak memory)
+
+    Returns:
+        Dictionary of 1-D metric arrays
+    """
+    samples = np.asarray(samples, dtype=float)
+    results = []
+    for start in range(0, len(samples), chunk_size):
+        block = samples[start:start + chunk_size]
+        overrides = {path: block[:, i] for i, path in enumerate(paths)}
+        metrics = screen(base_soc, overrides)
+        results.append({name: np.broadcast_to(v, (len(block),)) for name, v in metrics.items()})
+    return {name: np.concatenate([r[name] for r in results]) for name in results[0]}
+
+
+def _evaluate_row(row: np.ndarray, base_soc: SoCConfig, paths: Sequence[str],
+                  evaluate: Callable[[SoCConfig], Dict[str, float]]) -> Dict[str, float]:
+    """Evaluate one sample row at a stage's fidelity (worker entry point)"""
+    return evaluate(design_config(base_soc, paths, row))
+
+
+def multi_fidelity_search(
+    base_soc: SoCConfig,
+    paths: Sequence[str],
+    samples: np.ndarray,
+    stages: List[FidelityStage],
+    screen: Callable = evaluate_batch,
+    screen_objectives: Sequence[str] = ('density_tflops_per_mm2', 'efficiency_tflops_per_w'),
+    epsilon: float = 0.02,
+    max_band: int = None,
+    workers: int = 1
+) -> List[StageResult]:
+    """
+    Screen every sample analytically and promote the best through stages
+
+    Args:
+        base_soc: Base SoC configuration
+        paths: Dotted parameter path for each column of samples
+        samples: Array (num_samples, len(paths))
+        stages: Higher-fidelity stages, cheapest first
+        screen: Vectorized metric function (see screen_samples)
+        screen_objectives: Two screen metrics, both maximized, defining
+            the Pareto band
+        epsilon: Pareto band width (fraction of each objective's range)
+        max_band: Cap on band size (best by the first objective)
+        workers: Number of worker processes per stage
+
+    Returns:
+        One StageResult for the screen and each stage
+    """
+    samples = np.asarray(samples, dtype=float)
+    start = time.perf_counter()
+    metrics = screen_samples(base_soc, paths, samples, screen)
+    band = pareto_band(np.stack([metrics[k] for k in screen_objectives], axis=-1), epsilon)
+    if max_band is not None:
+        band = band[top_k(metrics[screen_objectives[0]][band], max_band)]
+    results = [StageResult('Analytic screen', np.arange(len(samples)), metrics, band,
+                           time.perf_counter() - start)]
+
+    candidates = band
+    for stage in stages:
+        start = time.perf_counter()
+        func = partial(_evaluate_row, base_soc=base_soc, paths=paths, evaluate=stage.evaluate)
+        rows = samples[candidates]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outputs = list(pool.map(func, rows))
+        else:
+            outputs = [func(row) for row in rows]
+
+        if not outputs:
+            raise ValueError(f"No designs promoted to stage: {stage.name}")
+        stage_metrics = {name: np.array([o[name] for o in outputs], dtype=float)
+                         for name in outputs[0]}
+        kept = candidates[top_k(stage_metrics[stage.objective], stage.keep, stage.maximize)]
+        results.append(StageResult(stage.name, candidates, stage_metrics, kept,
+                                   time.perf_counter() - start))
+        candidates = kept
+    return results
+
+
+def decode_screen(base_soc: SoCConfig, overrides: Dict[str, np.ndarray],
+                  model: TransformerConfig = LLAMA_8B, batch: int = 64, context: int = 1280,
+                  precision: Precision = Precision.FP8,
+                  utilization: float = 0.7) -> Dict[str, np.ndarray]:
+    """Analytic decode roofline: tokens/s and tokens/J at nominal clocks"""
+    soc, perf_model, power_model = batch_models(base_soc, overrides)
+    flops = batch * model.decode_flops_per_token(context)
+    bytes_moved = (model.num_params * BYTES_PER_ELEMENT[precision] +
+                   batch * context * model.kv_elements_per_token() * BYTES_PER_ELEMENT[precision])
+    step = np.maximum(flops / (perf_model.peak_compute(precision) * 1e12),
+                      bytes_moved / (perf_model.memory_bandwidth_tbps() * 1e12))
+    tokens_per_s = batch / step
+    power = power_model.total_power(utilization, precision)
+    tokens_per_s, power = np.broadcast_arrays(tokens_per_s, power)
+    return {
+        'tokens_per_s': tokens_per_s,
+        'tokens_per_joule': tokens_per_s / power,
+        'total_power_w': power,
+    }
+
+
+def capped_stage(soc: SoCConfig, utilization: float = 0.7,
+                 precision: Precision = Precision.FP8) -> Dict[str, float]:
+    """Power/thermal stage: sustained clock and TFLOPS under the 500 W cap"""
+    r = capped_operating_point(soc, utilization, precision)
+    return {
+        'capped_tflops': float(np.where(r['feasible'], r['capped_tflops'], np.nan)),
+        'sustained_clock_mhz': float(r['sustained_clock_mhz']),
+        'total_power_w': float(r['total_power_w']),
+        'junction_temp_c': float(r['junction_temp_c']),
+    }
+
+
+def serving_stage(soc: SoCConfig, model: TransformerConfig = LLAMA_8B,
+                  rate_per_s: float = 100.0, num_requests: int = 2000,
+                  utilization: float = 0.7) -> Dict[str, float]:
+    """Discrete-event stage: saturated serving throughput at the sustained clock"""
+    r = capped_operating_point(soc, utilization, Precision.FP8)
+    if not r['feasible']:
+        return {'tokens_per_s': np.nan, 'ttft_p50_s': np.nan, 'tpot_p50_s': np.nan}
+    soc.chiplet_config.sm_config.clock_mhz = float(r['sustained_clock_mhz'])
+    summary = latency_summary(ServingSimulator(soc, model).simulate(
+        synthetic_trace(num_requests, rate_per_s)))
+    return {name: summary[name] for name in ('tokens_per_s', 'ttft_p50_s', 'tpot_p50_s')}
+
+
+def main():
+    """Three-fidelity search for an 8B serving design"""
+    print("=" * 100)
+    print("NexGen-AI SoC Multi-Fidelity Design Search")
+    print("=" * 100)
+
+    base = SoCConfig()
+    num_samples = 1_000_000
+    rng = np.random.default_rng(2026)
+    space = {
+        'chiplet_config.num_sms': rng.integers(16, 129, num_samples),
+        'chiplet_config.sm_config.clock_mhz': rng.uniform(1000, 3000, num_samples),
+        'chiplet_config.sm_config.tensor_cores': rng.choice([4, 8], num_samples),
+        'hbm3e_stacks': rng.integers(4, 13, num_samples),
+        'hbm3e_bandwidth_gbps_per_stack': rng.uniform(128, 1229, num_samples),
+    }
+    paths = list(space)
+    samples = np.stack(list(space.values()), axis=-1)
+
+    stages = [
+        FidelityStage('Power/thermal cap', capped_stage, 'capped_tflops', keep=24),
+        FidelityStage('Serving simulation', serving_stage, 'tokens_per_s', keep=5),
+    ]
+    workers = min(os.cpu_count() or 1, 8)
+    results = multi_fidelity_search(base, paths, samples, stages, screen=decode_screen,
+                                    screen_objectives=('tokens_per_s', 'tokens_per_joule'),
+                                    epsilon=0.01, max_band=400, workers=workers)
+
+    print(f"\n{num_samples:,} sampled designs, {workers} worker(s)")
+    print(f"\n{'Stage':<22} {'Evaluated':<12} {'Promoted':<10} {'Time (s)':<10} {'Per design (ms)':<16}")
+    print("-" * 72)
+    for r in results:
+        print(f"{r.name:<22} {len(r.indices):<12,} {len(r.promoted):<10} {r.seconds:<10.2f} "
+              f"{r.seconds / max(len(r.indices), 1) * 1e3:<16.4f}")
+
+    # Cost of running each expensive stage on every sample instead
+    brute = sum(r.seconds / max(len(r.indices), 1) * num_samples for r in results[1:]) / workers
+    total = sum(r.seconds for r in results)
+    print(f"\nPipeline: {total:.1f} s; every stage on all designs: ~{brute / 3600:.1f} h "
+          f"({brute / total:,.0f}x)")
+
+    screen, capped, serving = results
+    position = {i: k for k, i in enumerate(serving.indices)}
+    capped_position = {i: k for k, i in enumerate(capped.indices)}
+    print(f"\nBest designs after serving simulation (LLAMA {LLAMA_8B.name}, FP8, saturated load)")
+    print(f"\n{'SMs':<6} {'Clock':<7} {'TCs':<5} {'Stacks':<8} {'GB/s/stack':<12} "
+          f"{'Screen tok/s':<14} {'Sustained MHz':<15} {'Capped TFLOPS':<15} {'Served tok/s':<14}")
+    print("-" * 100)
+    for i in serving.promoted:
+        sms, clock, tcs, stacks, bw = samples[i]
+        print(f"{sms:<6.0f} {clock:<7.0f} {tcs:<5.0f} {stacks:<8.0f} {bw:<12.0f} "
+              f"{screen.metrics['tokens_per_s'][i]:<14.0f} "
+              f"{capped.metrics['sustained_clock_mhz'][capped_position[i]]:<15.0f} "
+              f"{capped.metrics['capped_tflops'][capped_position[i]]:<15.1f} "
+              f"{serving.metrics['tokens_per_s'][position[i]]:<14.0f}")
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    shown = rng.choice(num_samples, 20_000, replace=False)
+    axes[0].scatter(screen.metrics['tokens_per_s'][shown], screen.metrics['tokens_per_joule'][shown],
+                    s=2, alpha=0.3, color='gray', label='Screened (sample)')
+    for r, color in zip(results, ('C0', 'C1', 'C3')):
+        axes[0].scatter(screen.metrics['tokens_per_s'][r.promoted],
+                        screen.metrics['tokens_per_joule'][r.promoted],
+                        s=14, color=color, label=f'Promoted by {r.name.lower()}')
+    axes[0].set_xlabel('Analytic Decode Tokens/s', fontsize=12)
+    axes[0].set_ylabel('Analytic Tokens/J', fontsize=12)
+    axes[0].set_title('Screen and Promoted Designs', fontsize=14, fontweight='bold')
+    axes[0].grid(True, alpha=0.3)
+    axes[0].legend(fontsize=9)
+
+    names = [r.name for r in results]
+    actual = [r.seconds for r in results]
+    full = [results[0].seconds] + [r.seconds / max(len(r.indices), 1) * num_samples / workers
+                                   for r in results[1:]]
+    x = np.arange(len(names))
+    axes[1].bar(x - 0.2, actual, width=0.4, label='Multi-fidelity')
+    axes[1].bar(x + 0.2, full, width=0.4, label='All designs at this fidelity')
+    axes[1].set_xticks(x)
+    axes[1].set_xticklabels(names)
+    axes[1].set_yscale('log')
+    axes[1].set_ylabel('Wall Time (s)', fontsize=12)
+    axes[1].set_title('Evaluation Cost per Stage', fontsize=14, fontweight='bold')
+    axes[1].grid(True, alpha=0.3, axis='y')
+    axes[1].legend()
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'multi_fidelity.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Multi-fidelity plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
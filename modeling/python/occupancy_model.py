@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Occupancy and Latency-Bound Kernel Model
+
+The roofline reaches peak at any intensity above the ridge point, which
+holds for large GEMMs but not for decode-phase inference, where a step is
+hundreds of small kernels. Those are limited by:
+
+1. Occupancy: CTAs resident per SM, bounded by register_file_kb,
+   shared_memory_kb, max_warps_per_sm and max_ctas_per_sm; too few
+   resident warps cannot hide pipeline and memory latency
+2. Waves: a kernel with fewer CTAs than SM slots leaves SMs idle, and a
+   partial last wave costs a full wave
+3. Launch overhead: a fixed per-kernel latency added to its run time
+
+These combine into a latency-bound ceiling, passed to
+PerformanceModel.roofline_performance(ceiling_tflops=...). Kernel
+descriptors hold arrays, so a whole step's kernels (or a sweep over
+batch sizes) are evaluated together.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import (
+    SoCConfig, SMConfig, PerformanceModel,
+    Precision, BYTES_PER_ELEMENT
+)
+from gemm_model import GemmModel, PIPELINE_STAGES, transformer_gemm_shapes
+from memory_footprint import LLAMA_8B, LLAMA_70B
+
+
+WARP_SIZE = 32
+REGISTER_ALLOCATION_UNIT = 256  # Registers allocated per warp in multiples of this
+LATENCY_HIDING_WARPS = 8        # Resident warps per SM needed to reach peak issue rate
+KERNEL_LAUNCH_US = 3.0          # Launch + teardown latency per kernel
+
+LIMITERS = np.array(['Registers', 'Shared Memory', 'Warps', 'CTA Slots'])
+
+
+@dataclass
+class KernelLaunch:
+    """
+    Resource usage and work of one or more kernel launches
+
+    Every field may be an array; fields broadcast together.
+    """
+    threads_per_cta: np.ndarray
+    registers_per_thread: np.ndarray
+    shared_memory_bytes: np.ndarray  # Per CTA
+    num_ctas: np.ndarray
+    flops: np.ndarray
+    hbm_bytes: np.ndarray
+
+
+def occupancy(sm_config: SMConfig, kernels: KernelLaunch) -> Dict[str, np.ndarray]:
+    """
+    Resident CTAs and warps per SM and the resource that limits them
+
+    Returns:
+        Dictionary with ctas_per_sm, active_warps, occupancy (fraction of
+        max_warps_per_sm) and limiter (name of the binding resource)
+    """
+    warps_per_cta = np.ceil(np.asarray(kernels.threads_per_cta) / WARP_SIZE)
+    regs_per_warp = (np.ceil(np.asarray(kernels.registers_per_thread) * WARP_SIZE /
+                             REGISTER_ALLOCATION_UNIT) * REGISTER_ALLOCATION_UNIT)
+    register_file_regs = sm_config.register_file_kb * 1024 / 4
+    smem = np.asarray(kernels.shared_memory_bytes, dtype=float)
+
+    with np.errstate(divide='ignore'):
+        limits = np.stack(np.broadcast_arrays(
+            np.floor(register_file_regs / (regs_per_warp * warps_per_cta)),
+            np.where(smem > 0, np.floor(sm_config.shared_memory_kb * 1024 / smem), np.inf),
+            np.floor(sm_config.max_warps_per_sm / warps_per_cta),
+            np.full(np.shape(warps_per_cta), float(sm_config.max_ctas_per_sm)),
+        ))
+
+    ctas_per_sm = limits.min(axis=0)
+    active_warps = ctas_per_sm * warps_per_cta
+    return {
+        'ctas_per_sm': ctas_per_sm,
+        'active_warps': active_warps,
+        'occupancy': active_warps / sm_config.max_warps_per_sm,
+        'limiter': LIMITERS[limits.argmin(axis=0)],
+    }
+
+
+def latency_ceiling(soc: SoCConfig, kernels: KernelLaunch, precision: Precision,
+                    launch_us: float = KERNEL_LAUNCH_US) -> Dict[str, np.ndarray]:
+    """
+    Latency-bound compute ceiling per kernel
+
+    The kernel's FLOPs run on the SMs its CTAs occupy (wave
+    quantization), at the issue rate its resident warps can sustain, plus
+    the launch overhead.
+
+    Returns:
+        Dictionary with waves, sm_utilization, latency_hiding, occupancy
+        fields and ceiling_tflops
+    """
+    sm_config = soc.chiplet_config.sm_config
+    occ = occupancy(sm_config, kernels)
+
+    # Kernels that do not fit on an SM at all get no throughput
+    slots = soc.total_sms * np.maximum(occ['ctas_per_sm'], 1)
+    num_ctas = np.asarray(kernels.num_ctas, dtype=float)
+    waves = np.ceil(num_ctas / slots)
+    sm_utilization = np.where(occ['ctas_per_sm'] >= 1, num_ctas / (waves * slots), 0.0)
+    latency_hiding = np.minimum(occ['active_warps'] / LATENCY_HIDING_WARPS, 1.0)
+
+    peak = PerformanceModel(soc).peak_compute(precision)
+    flops = np.asarray(kernels.flops, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        busy_s = flops / (peak * 1e12 * sm_utilization * latency_hiding)
+        ceiling = np.where(sm_utilization > 0, flops / (busy_s + launch_us * 1e-6) / 1e12, 0.0)
+
+    occ.update({
+        'waves': waves,
+        'sm_utilization': sm_utilization,
+        'latency_hiding': latency_hiding,
+        'ceiling_tflops': ceiling,
+    })
+    return occ
+
+
+def kernel_performance(soc: SoCConfig, kernels: KernelLaunch, precision: Precision,
+                       launch_us: float = KERNEL_LAUNCH_US) -> Dict[str, np.ndarray]:
+    """
+    Roofline with and without the latency-bound ceiling
+
+    Returns:
+        Dictionary with arithmetic_intensity, roofline_tflops (classic),
+        achieved_tflops (with ceiling), time_us and bound
+        ('Memory', 'Compute' or 'Latency')
+    """
+    perf_model = PerformanceModel(soc)
+    lat = latency_ceiling(soc, kernels, precision, launch_us)
+    flops = np.asarray(kernels.flops, dtype=float)
+    ai = flops / np.asarray(kernels.hbm_bytes, dtype=float)
+
+    roofline = perf_model.roofline_performance(ai, precision)
+    achieved = perf_model.roofline_performance(ai, precision, ceiling_tflops=lat['ceiling_tflops'])
+    memory_roof = perf_model.memory_bandwidth_tbps() * ai
+    bound = np.where(achieved < roofline * (1 - 1e-9), 'Latency',
+                     np.where(memory_roof < perf_model.peak_compute(precision), 'Memory', 'Compute'))
+
+    with np.errstate(divide='ignore'):
+        time_us = flops / (achieved * 1e12) * 1e6
+
+    lat.update({
+        'arithmetic_intensity': ai,
+        'roofline_tflops': roofline,
+        'achieved_tflops': achieved,
+        'time_us': time_us,
+        'bound': bound,
+    })
+    return lat
+
+
+def decode_layer_kernels(soc: SoCConfig, model, batch: int,
+                         precision: Precision = Precision.FP8) -> Dict[str, KernelLaunch]:
+    """
+    Kernel launches for one decoder layer's decode step
+
+    GEMM tiles come from gemm_model.py; CTAs use 256 threads with
+    registers sized to hold the accumulator tile.
+    """
+    gemm = GemmModel(soc, precision)
+    shapes = transformer_gemm_shapes(model, batch)[:-1]  # Per-layer GEMMs (no LM head)
+    names = [s[0] for s in shapes]
+    mnk = np.array([s[1:] for s in shapes], dtype=float)
+    tiles = gemm.best_tiles(mnk)
+
+    element = BYTES_PER_ELEMENT[precision]
+    threads = 256
+    m, n, k = mnk.T
+    bm, bn, bk = tiles['tile_m'], tiles['tile_n'], tiles['tile_k']
+    kernels = {
+        'GEMMs': KernelLaunch(
+            threads_per_cta=np.full(len(names), threads),
+            registers_per_thread=np.minimum(bm * bn / threads + 40, 255),
+            shared_memory_bytes=PIPELINE_STAGES * (bm * bk + bk * bn) * element,
+            num_ctas=np.ceil(m / bm) * np.ceil(n / bn),
+            flops=2 * m * n * k,
+            hbm_bytes=2 * m * n * k / tiles['arithmetic_intensity'],
+        ),
+    }
+
+    # Norms, rotary, residual adds and activation: one CTA per token row
+    h = model.hidden_size
+    elementwise_elements = np.array([h, h, h, h, model.intermediate_size]) * batch
+    kernels['Elementwise'] = KernelLaunch(
+        threads_per_cta=np.full(5, threads),
+        registers_per_thread=np.full(5, 32),
+        shared_memory_bytes=np.zeros(5),
+        num_ctas=np.full(5, batch),
+        flops=elementwise_elements * 5,
+        hbm_bytes=elementwise_elements * 2 * 2,
+    )
+    return kernels
+
+
+def main():
+    """Decode-step kernels: classic roofline vs latency-bound ceiling"""
+    print("=" * 100)
+    print("NexGen-AI SoC Occupancy and Latency-Bound Kernel Analysis")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    sm = soc.chiplet_config.sm_config
+    print(f"\nSM: {sm.register_file_kb} KB registers, {sm.shared_memory_kb} KB shared memory, "
+          f"{sm.max_warps_per_sm} warps, {sm.max_ctas_per_sm} CTAs max; "
+          f"{soc.total_sms} SMs; launch overhead {KERNEL_LAUNCH_US:.1f} us")
+
+    # Occupancy of a few representative kernels (one vectorized call)
+    examples = {
+        'GEMM 128x256 tile': (256, 168, 2 * (128 * 16 + 16 * 256) * 2),
+        'GEMM 64x128 tile': (128, 104, 2 * (64 * 64 + 64 * 128) * 2),
+        'Attention 128x32 tile': (128, 128, (128 * 128 + 4 * 32 * 128) * 2),
+        'LayerNorm': (256, 32, 0),
+        'Register-heavy': (512, 255, 0),
+    }
+    names = list(examples)
+    params = np.array([examples[n] for n in names], dtype=float)
+    occ = occupancy(sm, KernelLaunch(params[:, 0], params[:, 1], params[:, 2],
+                                     num_ctas=1, flops=1, hbm_bytes=1))
+
+    print(f"\n{'Kernel':<24} {'Threads':<9} {'Regs/Thr':<10} {'SMEM (KB)':<11} "
+          f"{'CTAs/SM':<9} {'Occupancy':<11} {'Limiter':<14}")
+    print("-" * 95)
+    for i, name in enumerate(names):
+        print(f"{name:<24} {params[i, 0]:<9.0f} {params[i, 1]:<10.0f} {params[i, 2] / 1024:<11.1f} "
+              f"{occ['ctas_per_sm'][i]:<9.0f} {occ['occupancy'][i]:<11.0%} {occ['limiter'][i]:<14}")
+
+    # Decode layer time vs batch: classic roofline vs with the latency ceiling
+    batches = np.array([1, 2, 4, 8, 16, 32, 64, 128, 256])
+    results = {}
+    for model in (LLAMA_8B, LLAMA_70B):
+        classic, latency = [], []
+        for b in batches:
+            t_classic = t_latency = 0.0
+            for kernels in decode_layer_kernels(soc, model, int(b)).values():
+                r = kernel_performance(soc, kernels, Precision.FP8)
+                flops = np.asarray(kernels.flops, dtype=float)
+                t_classic += (flops / (r['roofline_tflops'] * 1e12)).sum()
+                t_latency += (r['time_us'] * 1e-6).sum()
+            classic.append(t_classic * model.num_layers * 1e3)
+            latency.append(t_latency * model.num_layers * 1e3)
+        results[model.name] = (np.array(classic), np.array(latency))
+
+    print(f"\nDecode step GEMM + elementwise time (ms, FP8, all layers, excl. attention)")
+    print(f"\n{'Batch':<8}" + ''.join(f"{name + ' roofline / latency-aware':<42}"
+                                     for name in results))
+    print("-" * 95)
+    for i, b in enumerate(batches):
+        print(f"{b:<8}" + ''.join(
+            f"{f'{c[i]:.2f} / {l[i]:.2f} ({l[i] / c[i]:.2f}x)':<42}" for c, l in results.values()))
+
+    plt.figure(figsize=(10, 6))
+    for name, (classic, latency) in results.items():
+        line, = plt.loglog(batches, classic, '--', linewidth=2, label=f'{name} (roofline)')
+        plt.loglog(batches, latency, '-', color=line.get_color(), linewidth=2,
+                   label=f'{name} (occupancy + launch latency)')
+    plt.xlabel('Decode Batch Size', fontsize=12)
+    plt.ylabel('Step Time (ms)', fontsize=12)
+    plt.title('Decode Step Time: Roofline vs Latency-Bound Ceiling (FP8)', fontsize=14)
+    plt.grid(True, alpha=0.3)
+    plt.legend()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'occupancy_latency.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Latency-bound decode plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+DVFS Operating-Point Optimizer
+
+With the V-f curve in PowerModel, clock is no longer free: SM dynamic
+power scales as C·V²·f and leakage rises with voltage. The best clock
+therefore depends on the workload:
+
+- Compute-bound kernels gain throughput with clock until the power cap
+- Memory-bound kernels gain nothing above the clock where the memory
+  roof binds, so any higher clock only costs power
+- TFLOPS/W peaks at a clock set by the balance of dynamic, leakage and
+  fixed (HBM, I/O) power
+
+Workloads (arithmetic intensity, utilization) and clocks form one
+broadcast grid, evaluated through batch_model.py; design overrides add
+leading axes, so whole sweeps are solved at once.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, Precision
+from batch_model import batch_models, POWER_TARGET_W
+from arch_exploration import create_baseline, create_aggressive_optimized
+
+
+CLOCK_PATH = 'chiplet_config.sm_config.clock_mhz'
+DEFAULT_CLOCKS_MHZ = np.arange(800, 3001, 10)
+OBJECTIVES = ('throughput', 'efficiency')
+
+
+def operating_point_sweep(
+    base_soc: SoCConfig,
+    clocks_mhz: np.ndarray,
+    arithmetic_intensity: np.ndarray,
+    utilization: np.ndarray = 1.0,
+    precision: Precision = Precision.FP16,
+    overrides: Dict[str, np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Throughput and power of workloads across clocks
+
+    SM power follows the SM busy fraction (achieved / peak at that clock)
+    and HBM power the bandwidth busy fraction, so memory-bound workloads
+    draw little SM power.
+
+    Args:
+        base_soc: Base SoC configuration
+        clocks_mhz: SM clocks to evaluate (broadcast against the others)
+        arithmetic_intensity: FLOPS/Byte per workload
+        utilization: Fraction of the roofline each workload achieves
+        precision: Compute precision
+        overrides: Extra dotted-path overrides (e.g. design sweeps)
+
+    Returns:
+        Dictionary of arrays with the broadcast shape of all inputs
+    """
+    overrides = dict(overrides or {})
+    overrides[CLOCK_PATH] = clocks_mhz
+    soc, perf_model, power_model = batch_models(base_soc, overrides)
+
+    peak = perf_model.peak_compute(precision)
+    memory_roof = perf_model.memory_bandwidth_tbps() * np.asarray(arithmetic_intensity)
+    achieved = np.minimum(peak, memory_roof) * utilization
+
+    sm_busy = achieved / peak
+    memory_busy = np.minimum(achieved / memory_roof, 1.0)
+    power = (power_model.sm_power(1.0, precision) * sm_busy +
+             power_model.memory_system_power(memory_busy) +
+             power_model.static_power() +
+             power_model.interconnect_power_w +
+             power_model.io_power_w)
+
+    achieved, power, clocks = np.broadcast_arrays(achieved, power, np.asarray(clocks_mhz))
+    return {
+        'clock_mhz': clocks,
+        'voltage_v': np.broadcast_to(power_model.voltage(clocks), clocks.shape),
+        'achieved_tflops': achieved,
+        'total_power_w': power,
+        'tflops_per_watt': achieved / power,
+    }
+
+
+def optimize_clock(
+    base_soc: SoCConfig,
+    arithmetic_intensity: np.ndarray,
+    utilization: np.ndarray = 1.0,
+    precision: Precision = Precision.FP16,
+    objective: str = 'throughput',
+    power_cap_w: float = POWER_TARGET_W,
+    clocks_mhz: np.ndarray = DEFAULT_CLOCKS_MHZ,
+    overrides: Dict[str, np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Best clock per workload under a power cap
+
+    Args:
+        base_soc: Base SoC configuration
+        arithmetic_intensity: FLOPS/Byte per workload (any shape)
+        utilization: Fraction of the roofline each workload achieves
+        precision: Compute precision
+        objective: 'throughput' (max TFLOPS) or 'efficiency' (max TFLOPS/W)
+        power_cap_w: Power limit
+        clocks_mhz: Candidate clocks (1-D)
+        overrides: Extra dotted-path overrides; their shapes must leave
+            the last axis free for the clock (e.g. (D, 1))
+
+    Returns:
+        Dictionary of arrays over the workload (and design) shape; feasible
+        is False where even the lowest clock exceeds the cap
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+
+    ai = np.asarray(arithmetic_intensity, dtype=float)[..., np.newaxis]
+    util = np.asarray(utilization, dtype=float)[..., np.newaxis]
+    sweep = operating_point_sweep(base_soc, np.asarray(clocks_mhz), ai, util,
+                                  precision, overrides)
+
+    score = sweep['achieved_tflops' if objective == 'throughput' else 'tflops_per_watt']
+    # Ties (memory-bound plateaus) go to the lowest clock
+    score = np.where(sweep['total_power_w'] <= power_cap_w, score, -np.inf)
+    best = np.argmax(score, axis=-1)[..., np.newaxis]
+
+    result = {name: np.take_along_axis(v, best, axis=-1)[..., 0] for name, v in sweep.items()}
+    result['feasible'] = np.isfinite(np.take_along_axis(score, best, axis=-1)[..., 0])
+    return result
+
+
+def main():
+    """Best clock per workload for the baseline and aggressive designs"""
+    print("=" * 100)
+    print("NexGen-AI SoC DVFS Operating-Point Optimization")
+    print("=" * 100)
+
+    workloads = {
+        'GEMM (prefill, 8K tokens)': (1200.0, 0.85),
+        'Attention (fused)': (400.0, 0.75),
+        'GEMM (decode, batch 32)': (28.0, 0.80),
+        'GEMV (decode, batch 1)': (1.0, 0.90),
+        'Elementwise': (0.5, 0.90),
+    }
+    names = list(workloads)
+    ai = np.array([workloads[n][0] for n in names])
+    util = np.array([workloads[n][1] for n in names])
+
+    variants = [create_baseline(), create_aggressive_optimized()]
+    for variant in variants:
+        soc = variant.soc_config
+        sm = soc.chiplet_config.sm_config
+        print(f"\n{variant.name} (nominal {sm.clock_mhz} MHz, FP16, cap {POWER_TARGET_W:.0f} W)")
+        print(f"\n{'Workload':<26} {'Objective':<12} {'Clock (MHz)':<13} {'Voltage':<9} "
+              f"{'TFLOPS':<10} {'Power (W)':<11} {'TFLOPS/W':<10}")
+        print("-" * 95)
+        for objective in OBJECTIVES:
+            r = optimize_clock(soc, ai, util, Precision.FP16, objective)
+            for i, name in enumerate(names):
+                if not r['feasible'][i]:
+                    print(f"{name:<26} {objective:<12} {'infeasible under cap':<13}")
+                    continue
+                print(f"{name:<26} {objective:<12} {r['clock_mhz'][i]:<13.0f} "
+                      f"{r['voltage_v'][i]:<9.3f} {r['achieved_tflops'][i]:<10.1f} "
+                      f"{r['total_power_w'][i]:<11.1f} {r['tflops_per_watt'][i]:<10.3f}")
+
+    # Whole-sweep solve: best clock vs SMs per chiplet for every workload at once
+    sms = np.arange(16, 129, 8)[:, np.newaxis]
+    aggressive = variants[1].soc_config
+    r = optimize_clock(aggressive, ai[np.newaxis, :], util[np.newaxis, :], Precision.FP16,
+                       'throughput', overrides={'chiplet_config.num_sms': sms[..., np.newaxis]})
+    print(f"\nMax-throughput clock under {POWER_TARGET_W:.0f} W vs SMs per chiplet "
+          f"({variants[1].name}, {r['clock_mhz'].size} design x workload points in one call)")
+    print(f"\n{'SMs/chiplet':<13}" + ''.join(f"{n:<27}" for n in names))
+    print("-" * 148)
+    for j, n_sms in enumerate(sms[:, 0]):
+        cells = [f"{r['clock_mhz'][j, i]:.0f} MHz" if r['feasible'][j, i] else 'infeasible'
+                 for i in range(len(names))]
+        print(f"{n_sms:<13}" + ''.join(f"{c:<27}" for c in cells))
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    sweep = operating_point_sweep(aggressive, DEFAULT_CLOCKS_MHZ, ai[:, np.newaxis],
+                                  util[:, np.newaxis], Precision.FP16)
+    for i, name in enumerate(names):
+        axes[0].plot(DEFAULT_CLOCKS_MHZ, sweep['total_power_w'][i], linewidth=2, label=name)
+        axes[1].plot(DEFAULT_CLOCKS_MHZ, sweep['tflops_per_watt'][i], linewidth=2, label=name)
+    axes[0].axhline(POWER_TARGET_W, color='r', linestyle='--', label=f'{POWER_TARGET_W:.0f}W Cap')
+    axes[0].set_ylabel('Total Power (W)', fontsize=12)
+    axes[1].set_ylabel('TFLOPS/W', fontsize=12)
+    for ax in axes:
+        ax.set_xlabel('SM Clock (MHz)', fontsize=12)
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=9)
+    fig.suptitle(f'DVFS Sweep - {variants[1].name} (FP16)', fontsize=14)
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'dvfs_operating_points.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ DVFS sweep plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,12 @@ from typing import Dict, List, Tuple
 from enum import Enum
 import os
 
+try:
+    from profiling import timed
+except ImportError:  # Core model used on its own: no instrumentation
+    def timed(name):
+        return lambda func: func
+
 
 class Precision(Enum):
     """Supported compute precisions"""
@@ -31,6 +37,17 @@ class Precision(Enum):
     FP32 = "FP32"
 
 
+# Storage size of one element at each precision
+BYTES_PER_ELEMENT = {
+    Precision.FP4: 0.5,
+    Precision.FP8: 1,
+    Precision.INT8: 1,
+    Precision.FP16: 2,
+    Precision.BF16: 2,
+    Precision.FP32: 4,
+}
+
+
 @dataclass
 class SMConfig:
     """Streaming Multiprocessor Configuration"""
@@ -39,10 +56,18 @@ class SMConfig:
     l1_cache_kb: int = 128
     shared_memory_kb: int = 128
     register_file_kb: int = 256
+    max_warps_per_sm: int = 64
+    max_ctas_per_sm: int = 32
     clock_mhz: int = 2000
     
     # FLOPS per cycle per core
     tensor_core_ops_per_cycle: Dict[Precision, int] = None
+    simt_ops_per_cycle: Dict[Precision, int] = None
+    
+    # Structured (2:4) sparsity: tensor-core speedup on sparse operands and
+    # metadata bytes per byte of compressed values (2-bit index per kept value)
+    sparse_speedup: Dict[Precision, float] = None
+    sparse_metadata_overhead: Dict[Precision, float] = None
     
     def __post_init__(self):
         if self.tensor_core_ops_per_cycle is None:
@@ -55,6 +80,34 @@ class SMConfig:
                 Precision.BF16: 128,
                 Precision.FP32: 64,
             }
+        if self.simt_ops_per_cycle is None:
+            # Operations per cycle per CUDA core (FMA = 2 ops)
+            self.simt_ops_per_cycle = {
+                Precision.FP4: 4,     # No native SIMT math: upconverted to FP16
+                Precision.FP8: 4,
+                Precision.INT8: 4,
+                Precision.FP16: 4,    # Packed half2 FMA
+                Precision.BF16: 4,
+                Precision.FP32: 2,
+            }
+        if self.sparse_speedup is None:
+            self.sparse_speedup = {
+                Precision.FP4: 2.0,
+                Precision.FP8: 2.0,
+                Precision.INT8: 2.0,
+                Precision.FP16: 2.0,
+                Precision.BF16: 2.0,
+                Precision.FP32: 1.0,  # No sparse FP32 tensor path
+            }
+        if self.sparse_metadata_overhead is None:
+            self.sparse_metadata_overhead = {
+                Precision.FP4: 0.5,
+                Precision.FP8: 0.25,
+                Precision.INT8: 0.25,
+                Precision.FP16: 0.125,
+                Precision.BF16: 0.125,
+                Precision.FP32: 0.0,
+            }
     
     def peak_tflops(self, precision: Precision) -> float:
         """Calculate peak TFLOPS for given precision"""
@@ -62,6 +115,15 @@ class SMConfig:
         total_ops_per_cycle = ops_per_cycle * self.tensor_cores
         ops_per_second = total_ops_per_cycle * self.clock_mhz * 1e6
         return ops_per_second / 1e12  # Convert to TFLOPS
+    
+    def sparse_peak_tflops(self, precision: Precision) -> float:
+        """Dense-equivalent peak TFLOPS on structured-sparse operands"""
+        return self.peak_tflops(precision) * self.sparse_speedup[precision]
+    
+    def simt_peak_tflops(self, precision: Precision) -> float:
+        """Calculate peak SIMT (CUDA core) TFLOPS for given precision"""
+        ops_per_cycle = self.simt_ops_per_cycle[precision] * self.cuda_cores
+        return ops_per_cycle * self.clock_mhz * 1e6 / 1e12
 
 
 @dataclass
@@ -80,12 +142,21 @@ class ChipletConfig:
             self.sm_config = SMConfig()
 
 
+@dataclass
+class ChipletGroup:
+    """A population of identical chiplets within a heterogeneous SoC"""
+    chiplet_config: ChipletConfig
+    count: int = 1
+    name: str = "compute"
+
+
 @dataclass
 class SoCConfig:
     """Full SoC Configuration"""
     num_chiplets: int = 4
     hbm3e_stacks: int = 8
     hbm3e_bandwidth_gbps_per_stack: int = 128
+    hbm3e_capacity_gb_per_stack: int = 24  # 8-high HBM3e stack
     nvlink_lanes: int = 6
     nvlink_bandwidth_gbps_per_lane: int = 100
     pcie_gen: int = 6
@@ -94,21 +165,52 @@ class SoCConfig:
     
     chiplet_config: ChipletConfig = None
     
+    # Heterogeneous mix (compute, I/O, cache-only dies). When set, it
+    # replaces num_chiplets x chiplet_config in all aggregates, and
+    # chiplet_config refers to the first group with SMs.
+    chiplet_groups: List[ChipletGroup] = None
+    
     def __post_init__(self):
+        if self.chiplet_groups is not None:
+            if self.chiplet_config is None:
+                compute = [g for g in self.chiplet_groups if g.chiplet_config.num_sms > 0]
+                if not compute:
+                    raise ValueError("chiplet_groups must contain a group with SMs")
+                self.chiplet_config = compute[0].chiplet_config
+            self.num_chiplets = sum(g.count for g in self.chiplet_groups)
         if self.chiplet_config is None:
             self.chiplet_config = ChipletConfig()
     
+    @property
+    def groups(self) -> List[ChipletGroup]:
+        """Chiplet populations (a single group for homogeneous SoCs)"""
+        if self.chiplet_groups is None:
+            return [ChipletGroup(self.chiplet_config, self.num_chiplets)]
+        return self.chiplet_groups
+    
+    @property
+    def total_chiplets(self) -> int:
+        return sum(g.count for g in self.groups)
+    
     @property
     def total_sms(self) -> int:
-        return self.num_chiplets * self.chiplet_config.num_sms
+        return sum(g.count * g.chiplet_config.num_sms for g in self.groups)
+    
+    @property
+    def total_l2_cache_mb(self) -> float:
+        return sum(g.count * g.chiplet_config.l2_cache_mb for g in self.groups)
     
     @property
     def total_hbm_bandwidth_gbps(self) -> int:
         return self.hbm3e_stacks * self.hbm3e_bandwidth_gbps_per_stack
     
+    @property
+    def total_hbm_capacity_gb(self) -> int:
+        return self.hbm3e_stacks * self.hbm3e_capacity_gb_per_stack
+    
     @property
     def total_area_mm2(self) -> float:
-        return self.num_chiplets * self.chiplet_config.area_mm2
+        return sum(g.count * g.chiplet_config.area_mm2 for g in self.groups)
 
 
 class PerformanceModel:
@@ -118,10 +220,21 @@ class PerformanceModel:
         self.config = soc_config
         self.sm_config = soc_config.chiplet_config.sm_config
     
+    @timed('PerformanceModel.peak_compute')
     def peak_compute(self, precision: Precision) -> float:
         """Calculate peak compute in TFLOPS for entire SoC"""
-        per_sm = self.sm_config.peak_tflops(precision)
-        return per_sm * self.config.total_sms
+        return sum(g.chiplet_config.sm_config.peak_tflops(precision) *
+                   g.count * g.chiplet_config.num_sms for g in self.config.groups)
+    
+    def sparse_peak_compute(self, precision: Precision) -> float:
+        """Dense-equivalent structured-sparse peak compute in TFLOPS for entire SoC"""
+        return sum(g.chiplet_config.sm_config.sparse_peak_tflops(precision) *
+                   g.count * g.chiplet_config.num_sms for g in self.config.groups)
+    
+    def simt_peak_compute(self, precision: Precision) -> float:
+        """Calculate peak SIMT (vector unit) compute in TFLOPS for entire SoC"""
+        return sum(g.chiplet_config.sm_config.simt_peak_tflops(precision) *
+                   g.count * g.chiplet_config.num_sms for g in self.config.groups)
     
     def compute_density(self, precision: Precision) -> float:
         """Calculate TFLOPS per mm²"""
@@ -143,7 +256,9 @@ class PerformanceModel:
     def roofline_performance(
         self, 
         arithmetic_intensity: np.ndarray, 
-        precision: Precision
+        precision: Precision,
+        ceiling_tflops: np.ndarray = None,
+        bandwidth_tbps: np.ndarray = None
     ) -> np.ndarray:
         """
         Calculate achieved performance on roofline model
@@ -151,24 +266,112 @@ class PerformanceModel:
         Args:
             arithmetic_intensity: Array of FLOPS/Byte ratios
             precision: Compute precision
+            ceiling_tflops: Optional per-point ceiling below peak compute
+                (e.g. the occupancy/launch-latency ceiling from occupancy_model.py)
+            bandwidth_tbps: Optional per-point memory roof replacing the
+                theoretical bandwidth (e.g. access-pattern-aware HBM
+                bandwidth from hbm_model.py)
         
         Returns:
             Achieved TFLOPS for each intensity point
         """
         peak_tflops = self.peak_compute(precision)
-        bandwidth_tbps = self.memory_bandwidth_tbps()
+        if bandwidth_tbps is None:
+            bandwidth_tbps = self.memory_bandwidth_tbps()
         
         # Memory-bound region: Performance = Bandwidth * Intensity
         memory_bound = bandwidth_tbps * arithmetic_intensity
         
         # Compute-bound region: Performance = Peak Compute
-        compute_bound = np.full_like(arithmetic_intensity, peak_tflops)
+        # (broadcast rather than np.full_like so array/dual-valued configs work)
+        compute_bound = peak_tflops
+        if ceiling_tflops is not None:
+            compute_bound = np.minimum(compute_bound, ceiling_tflops)
         
         # Take minimum (bottleneck)
         return np.minimum(memory_bound, compute_bound)
     
-    def plot_roofline(self, precision: Precision, save_path: str = None):
-        """Generate roofline plot for given precision"""
+    def compute_ceiling(self, tensor_fraction: np.ndarray, precision: Precision) -> np.ndarray:
+        """
+        Compute ceiling (TFLOPS) for kernels splitting ops between units
+        
+        Tensor-core and SIMT ops are issued back to back, so time per op
+        is the fraction-weighted sum of each unit's time per op.
+        
+        Args:
+            tensor_fraction: Fraction of ops on tensor cores (rest on SIMT)
+            precision: Compute precision
+        """
+        f = np.asarray(tensor_fraction, dtype=float)
+        return 1.0 / (f / self.peak_compute(precision) +
+                      (1 - f) / self.simt_peak_compute(precision))
+    
+    def combined_roofline(
+        self,
+        arithmetic_intensity: np.ndarray,
+        tensor_fraction: np.ndarray,
+        precision: Precision
+    ) -> np.ndarray:
+        """
+        Roofline with a per-kernel tensor/SIMT compute ceiling
+        
+        Args:
+            arithmetic_intensity: Array of FLOPS/Byte ratios
+            tensor_fraction: Fraction of each kernel's ops on tensor cores
+            precision: Compute precision
+        
+        Returns:
+            Achieved TFLOPS (broadcast shape of the inputs)
+        """
+        memory_bound = self.memory_bandwidth_tbps() * np.asarray(arithmetic_intensity)
+        return np.minimum(memory_bound, self.compute_ceiling(tensor_fraction, precision))
+    
+    def plot_combined_roofline(self, precision: Precision,
+                               kernels: Dict[str, Tuple[float, float]],
+                               save_path: str = None):
+        """
+        Roofline with tensor-core and SIMT ceilings
+        
+        Args:
+            precision: Compute precision
+            kernels: Name -> (arithmetic intensity, tensor-core op fraction)
+            save_path: Output file (default: show)
+        """
+        ai = np.logspace(-2, 3, 1000)
+        
+        plt.figure(figsize=(10, 6))
+        plt.loglog(ai, self.combined_roofline(ai, 1.0, precision), 'b-', linewidth=2,
+                   label=f'Tensor Core Roof ({self.peak_compute(precision):.1f} TFLOPS)')
+        plt.loglog(ai, self.combined_roofline(ai, 0.0, precision), 'g-', linewidth=2,
+                   label=f'SIMT Roof ({self.simt_peak_compute(precision):.1f} TFLOPS)')
+        
+        for name, (ai_val, fraction) in kernels.items():
+            perf = self.combined_roofline(ai_val, fraction, precision)
+            plt.plot(ai_val, perf, 'o', markersize=8, label=f'{name} ({fraction:.0%} tensor)')
+        
+        plt.xlabel('Arithmetic Intensity (FLOPS/Byte)', fontsize=12)
+        plt.ylabel('Performance (TFLOPS)', fontsize=12)
+        plt.title(f'Combined Tensor/SIMT Roofline - {precision.value} Precision', fontsize=14)
+        plt.grid(True, alpha=0.3)
+        plt.legend(loc='best', fontsize=9)
+        
+        if save_path:
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            plt.close()
+        else:
+            plt.show()
+    
+    def plot_roofline(self, precision: Precision, save_path: str = None,
+                      workloads: Dict[str, float] = None):
+        """
+        Generate roofline plot for given precision
+
+        Args:
+            precision: Compute precision
+            save_path: Output file (default: show)
+            workloads: Marker name -> arithmetic intensity (default: typical kernels)
+        """
         # Arithmetic intensity range (FLOPS/Byte)
         ai = np.logspace(-2, 3, 1000)
         
@@ -181,7 +384,7 @@ class PerformanceModel:
                    label=f'Ridge Point: {ridge_point:.1f} FLOPS/Byte')
         
         # Add common workload markers
-        workloads = {
+        workloads = workloads or {
             'GEMM (Optimized)': 100,
             'GEMM (Naive)': 10,
             'Attention (FlashAttention)': 50,
@@ -209,15 +412,24 @@ class PerformanceModel:
         else:
             plt.show()
     
-    def analyze_workload(self, precision: Precision, arithmetic_intensity: float) -> Dict:
+    def analyze_workload(self, precision: Precision, arithmetic_intensity: float,
+                         tensor_fraction: float = 1.0) -> Dict:
         """Detailed analysis of a specific workload"""
         peak_tflops = self.peak_compute(precision)
-        achieved_tflops = self.roofline_performance(
-            np.array([arithmetic_intensity]), precision
-        )[0]
-        
         ridge_point = self.arithmetic_intensity_roof(precision)
-        is_memory_bound = arithmetic_intensity < ridge_point
+        
+        if tensor_fraction == 1.0:
+            achieved_tflops = self.roofline_performance(
+                np.array([arithmetic_intensity]), precision
+            )[0]
+            is_memory_bound = arithmetic_intensity < ridge_point
+            bottleneck = 'Memory' if is_memory_bound else 'Compute'
+        else:
+            # Kernels with SIMT work hit the blended tensor/SIMT ceiling
+            ceiling = float(self.compute_ceiling(tensor_fraction, precision))
+            memory_roof = self.memory_bandwidth_tbps() * arithmetic_intensity
+            achieved_tflops = min(memory_roof, ceiling)
+            bottleneck = 'Memory' if memory_roof < ceiling else 'SIMT'
         
         efficiency = (achieved_tflops / peak_tflops) * 100
         
@@ -227,7 +439,7 @@ class PerformanceModel:
             'peak_tflops': peak_tflops,
             'achieved_tflops': achieved_tflops,
             'efficiency_percent': efficiency,
-            'bottleneck': 'Memory' if is_memory_bound else 'Compute',
+            'bottleneck': bottleneck,
             'ridge_point': ridge_point,
         }
 
@@ -245,37 +457,107 @@ class PowerModel:
         self.interconnect_power_w = 20  # UCIe + NVLink
         self.io_power_w = 10  # PCIe, misc I/O
         self.static_power_per_chiplet_w = 5  # Leakage
+        
+        # DVFS: sm_dynamic_power_mw and static_power_per_chiplet_w are
+        # calibrated at the nominal operating point. Dynamic power scales
+        # as C·V²·f and leakage as V·exp(k·ΔV) along a linear V-f curve.
+        self.nominal_clock_mhz = 2000
+        self.nominal_voltage_v = 0.75
+        self.voltage_slope_v_per_mhz = 0.00015  # 0.15 V per GHz
+        self.min_voltage_v = 0.55  # Retention floor; clocks below run at V_min
+        self.leakage_voltage_coefficient = 3.0  # 1/V (DIBL)
+        
+        # Tensor-core energy per operation (pJ). sm_dynamic_power_mw is
+        # calibrated at FP16 peak; other precisions scale by energy per cycle.
+        self.energy_per_op_pj = {
+            Precision.FP4: 0.40,
+            Precision.FP8: 0.70,
+            Precision.INT8: 0.60,
+            Precision.FP16: 1.46,
+            Precision.BF16: 1.46,
+            Precision.FP32: 2.90,
+        }
     
-    def dynamic_power(self, utilization: float = 1.0) -> float:
+    def voltage(self, clock_mhz: float) -> float:
+        """Supply voltage (V) needed for a clock on the V-f curve"""
+        return np.maximum(self.min_voltage_v,
+                          self.nominal_voltage_v +
+                          self.voltage_slope_v_per_mhz * (clock_mhz - self.nominal_clock_mhz))
+    
+    def dynamic_power_scale(self, clock_mhz: float) -> float:
+        """C·V²·f dynamic power relative to the nominal operating point"""
+        v = self.voltage(clock_mhz) / self.nominal_voltage_v
+        return v ** 2 * (clock_mhz / self.nominal_clock_mhz)
+    
+    def leakage_power_scale(self, clock_mhz: float) -> float:
+        """Leakage power relative to the nominal operating point"""
+        v = self.voltage(clock_mhz)
+        return ((v / self.nominal_voltage_v) *
+                np.exp(self.leakage_voltage_coefficient * (v - self.nominal_voltage_v)))
+    
+    def precision_power_scale(self, precision: Precision,
+                              sm_config: SMConfig = None) -> float:
+        """SM power at peak for a precision relative to FP16 peak"""
+        sm_config = sm_config or self.config.chiplet_config.sm_config
+        ops = sm_config.tensor_core_ops_per_cycle
+        return ((ops[precision] * self.energy_per_op_pj[precision]) /
+                (ops[Precision.FP16] * self.energy_per_op_pj[Precision.FP16]))
+    
+    def sm_power(self, utilization: float = 1.0,
+                 precision: Precision = Precision.FP16,
+                 clock_ratio: float = 1.0) -> float:
+        """SM (tensor-core) dynamic power in Watts, with clocks scaled by clock_ratio"""
+        # SM power scales roughly with utilization
+        sm_peak_w = sum(g.count * g.chiplet_config.num_sms * self.sm_dynamic_power_mw / 1000 *
+                        self.precision_power_scale(precision, g.chiplet_config.sm_config) *
+                        self.dynamic_power_scale(g.chiplet_config.sm_config.clock_mhz * clock_ratio)
+                        for g in self.config.groups)
+        return sm_peak_w * utilization
+    
+    def memory_system_power(self, utilization: float = 1.0) -> float:
+        """L2 and HBM dynamic power in Watts"""
+        # Cache power scales with square root of utilization (less than linear)
+        total_l2_mb = self.config.total_l2_cache_mb
+        cache_power = (total_l2_mb * self.l2_power_per_mb_mw / 1000) * np.sqrt(utilization)
+        
+        # HBM power scales linearly with bandwidth utilization
+        hbm_power = self.config.hbm3e_stacks * self.hbm_stack_power_w * utilization
+        
+        return cache_power + hbm_power
+    
+    def dynamic_power(self, utilization: float = 1.0,
+                      precision: Precision = Precision.FP16,
+                      clock_ratio: float = 1.0) -> float:
         """
         Calculate dynamic power consumption
         
         Args:
             utilization: Fraction of peak utilization (0.0-1.0)
+            precision: Compute precision (sets energy per operation)
+            clock_ratio: SM clock relative to each group's configured clock
         
         Returns:
             Power in Watts
         """
-        # SM power scales roughly with utilization
-        sm_power = (self.config.total_sms * self.sm_dynamic_power_mw / 1000) * utilization
-        
-        # Cache power scales with square root of utilization (less than linear)
-        total_l2_mb = self.config.num_chiplets * self.config.chiplet_config.l2_cache_mb
-        cache_power = (total_l2_mb * self.l2_power_per_mb_mw / 1000) * np.sqrt(utilization)
-        
-        # HBM power scales linearly with bandwidth utilization
-        hbm_power = self.config.hbm3e_stacks * self.hbm_stack_power_w * utilization
-        
-        return sm_power + cache_power + hbm_power
+        return (self.sm_power(utilization, precision, clock_ratio) +
+                self.memory_system_power(utilization))
     
-    def static_power(self) -> float:
+    def static_power(self, clock_ratio: float = 1.0) -> float:
         """Calculate static (leakage) power"""
-        return self.config.num_chiplets * self.static_power_per_chiplet_w
-    
-    def total_power(self, utilization: float = 1.0) -> float:
-        """Total SoC power consumption"""
-        return (self.dynamic_power(utilization) + 
-                self.static_power() + 
+        # Dies without SMs (I/O, cache) stay at their nominal voltage
+        return sum(g.count * self.static_power_per_chiplet_w *
+                   np.where(np.asarray(g.chiplet_config.num_sms) > 0,
+                            self.leakage_power_scale(g.chiplet_config.sm_config.clock_mhz * clock_ratio),
+                            1.0)
+                   for g in self.config.groups)
+    
+    @timed('PowerModel.total_power')
+    def total_power(self, utilization: float = 1.0,
+                    precision: Precision = Precision.FP16,
+                    clock_ratio: float = 1.0) -> float:
+        """Total SoC power consumption, with SM clocks scaled by clock_ratio"""
+        return (self.dynamic_power(utilization, precision, clock_ratio) + 
+                self.static_power(clock_ratio) + 
                 self.interconnect_power_w + 
                 self.io_power_w)
     
@@ -292,7 +574,7 @@ class PowerModel:
         """
         perf_model = PerformanceModel(self.config)
         achieved_tflops = perf_model.peak_compute(precision) * utilization
-        power_w = self.total_power(utilization)
+        power_w = self.total_power(utilization, precision)
         return achieved_tflops / power_w
     
     def thermal_estimate(self, utilization: float = 1.0, 
@@ -312,23 +594,82 @@ class PowerModel:
         power = self.total_power(utilization)
         return ambient_c + (power * theta_ja)
 
+    def capped_clock_ratio(self, power_limit_w: np.ndarray = 500.0,
+                           utilization: np.ndarray = 1.0,
+                           precision: Precision = Precision.FP16,
+                           min_ratio: float = 0.2,
+                           tolerance: float = 1e-4) -> np.ndarray:
+        """
+        Sustained / nominal SM clock when throttling to a power limit
+
+        Power rises monotonically with clock, so the root of
+        total_power = power_limit_w is found by bisection, element-wise
+        over array-valued configs, utilizations and limits. Every chiplet
+        group's clock is scaled by the same ratio; the config is not
+        modified.
+
+        Args:
+            power_limit_w: Power limit (Watts)
+            utilization: Workload utilization
+            precision: Compute precision
+            min_ratio: Lowest throttle state; returned where even it
+                exceeds the limit
+            tolerance: Bisection stops when the bracket is this narrow
+
+        Returns:
+            Clock ratio (1.0 where the SoC already fits the limit)
+        """
+        uncapped = self.total_power(utilization, precision)
+        lo = np.full(np.broadcast_shapes(np.shape(uncapped), np.shape(power_limit_w)),
+                     min_ratio)
+        hi = np.ones_like(lo)
+        throttled = uncapped > power_limit_w
+        active = throttled & (self.total_power(utilization, precision, lo) <= power_limit_w)
+        while np.any(active & (hi - lo > tolerance)):
+            mid = 0.5 * (lo + hi)
+            fits = self.total_power(utilization, precision, mid) <= power_limit_w
+            lo = np.where(active & fits, mid, lo)
+            hi = np.where(active & ~fits, mid, hi)
+        return np.where(throttled, lo, 1.0)
+
 
 class ScalingModel:
     """Analyze chiplet scaling efficiency"""
     
-    def __init__(self, base_chiplet_config: ChipletConfig):
+    def __init__(self, base_chiplet_config: ChipletConfig,
+                 fixed_groups: List[ChipletGroup] = None,
+                 topology: str = None):
+        """
+        Args:
+            base_chiplet_config: Compute chiplet being replicated
+            fixed_groups: Dies present at every scale (e.g. I/O or
+                cache-only chiplets); default: compute chiplets only
+            topology: UCIe layout ('ring', 'mesh', 'torus', 'switch',
+                'fully_connected'); adds interconnect metrics when set
+        """
         self.base_config = base_chiplet_config
+        self.fixed_groups = fixed_groups
+        self.topology = topology
+    
+    def soc_config(self, num_chiplets: int, hbm3e_stacks: int = 8) -> SoCConfig:
+        """SoC with num_chiplets compute chiplets plus the fixed dies"""
+        if self.fixed_groups is None:
+            return SoCConfig(
+                num_chiplets=num_chiplets,
+                hbm3e_stacks=hbm3e_stacks,
+                chiplet_config=self.base_config
+            )
+        return SoCConfig(
+            hbm3e_stacks=hbm3e_stacks,
+            chiplet_groups=[ChipletGroup(self.base_config, num_chiplets)] + self.fixed_groups
+        )
     
     def compute_scaling(self, num_chiplets_list: List[int], 
                        precision: Precision) -> Dict[int, float]:
         """Analyze ideal compute scaling across chiplet counts"""
         results = {}
         for n in num_chiplets_list:
-            soc = SoCConfig(
-                num_chiplets=n,
-                chiplet_config=self.base_config
-            )
-            perf_model = PerformanceModel(soc)
+            perf_model = PerformanceModel(self.soc_config(n))
             results[n] = perf_model.peak_compute(precision)
         return results
     
@@ -337,12 +678,7 @@ class ScalingModel:
         results = {}
         for n in num_chiplets_list:
             # Assume HBM stacks scale with chiplets (2 stacks per chiplet)
-            soc = SoCConfig(
-                num_chiplets=n,
-                hbm3e_stacks=n * 2,
-                chiplet_config=self.base_config
-            )
-            perf_model = PerformanceModel(soc)
+            perf_model = PerformanceModel(self.soc_config(n, hbm3e_stacks=n * 2))
             results[n] = perf_model.memory_bandwidth_tbps()
         return results
     
@@ -351,15 +687,28 @@ class ScalingModel:
         """Analyze power consumption scaling"""
         results = {}
         for n in num_chiplets_list:
-            soc = SoCConfig(
-                num_chiplets=n,
-                hbm3e_stacks=n * 2,
-                chiplet_config=self.base_config
-            )
-            power_model = PowerModel(soc)
+            power_model = PowerModel(self.soc_config(n, hbm3e_stacks=n * 2))
             results[n] = power_model.total_power(utilization)
         return results
     
+    def interconnect_scaling(self, num_chiplets_list: List[int]) -> Dict[int, Dict]:
+        """Hop counts, bisection and all-to-all bandwidth of the UCIe fabric"""
+        # Imported here so the core model has no module dependencies
+        from interconnect_topology import topology_metrics
+        
+        results = {}
+        for n in num_chiplets_list:
+            soc = self.soc_config(n)
+            m = topology_metrics(self.topology, soc.total_chiplets,
+                                 self.base_config.ucIe_bandwidth_gbps)
+            results[n] = {
+                'average_hops': m.average_hops,
+                'diameter': m.diameter,
+                'bisection_tbps': m.bisection_bandwidth_gbps / 1000.0,
+                'all_to_all_tbps': m.all_to_all_gbps / 1000.0,
+            }
+        return results
+    
     def efficiency_analysis(self, num_chiplets_list: List[int],
                           precision: Precision) -> Dict[int, Dict]:
         """Combined efficiency analysis"""
@@ -374,8 +723,13 @@ class ScalingModel:
                 'memory_tbps': memory[n],
                 'power_watts': power[n],
                 'tflops_per_watt': compute[n] / power[n],
-                'compute_per_area': compute[n] / (n * self.base_config.area_mm2)
+                'compute_per_area': compute[n] / self.soc_config(n).total_area_mm2
             }
+        
+        if self.topology is not None:
+            interconnect = self.interconnect_scaling(num_chiplets_list)
+            for n in num_chiplets_list:
+                results[n].update(interconnect[n])
         return results
     
     def plot_scaling(self, num_chiplets_list: List[int], 
@@ -462,6 +816,7 @@ def main():
     print(f"  Total Area: {soc.total_area_mm2:.1f} mm²")
     print(f"  HBM Stacks: {soc.hbm3e_stacks}")
     print(f"  Total HBM BW: {soc.total_hbm_bandwidth_gbps} GB/s ({soc.total_hbm_bandwidth_gbps/1000:.2f} TB/s)")
+    print(f"  Total HBM Capacity: {soc.total_hbm_capacity_gb} GB")
     
     # Performance analysis
     print("\n" + "=" * 80)
@@ -477,6 +832,7 @@ def main():
         
         print(f"\n{precision.value}:")
         print(f"  Peak Compute: {peak:.1f} TFLOPS")
+        print(f"  Sparse (2:4) Peak: {perf_model.sparse_peak_compute(precision):.1f} TFLOPS")
         print(f"  Compute Density: {density:.3f} TFLOPS/mm²")
         print(f"  Ridge Point: {ridge:.1f} FLOPS/Byte")
         
@@ -505,6 +861,34 @@ def main():
         print(f"  Achieved: {result['achieved_tflops']:.1f} TFLOPS ({result['efficiency_percent']:.1f}% of peak)")
         print(f"  Bottleneck: {result['bottleneck']}")
     
+    # Combined tensor/SIMT roofline: (intensity, tensor-core op fraction)
+    print("\n" + "=" * 80)
+    print("TENSOR / SIMT KERNEL ANALYSIS")
+    print("=" * 80)
+    
+    print(f"\nFP8 peak: {perf_model.peak_compute(Precision.FP8):.1f} TFLOPS tensor, "
+          f"{perf_model.simt_peak_compute(Precision.FP8):.1f} TFLOPS SIMT "
+          f"(FP32 SIMT: {perf_model.simt_peak_compute(Precision.FP32):.1f} TFLOPS)")
+    
+    kernels = {
+        'GEMM': (200, 1.0),
+        'GEMM + SwiGLU epilogue': (150, 0.9),
+        'Attention (fused)': (120, 0.8),
+        'LayerNorm': (1.5, 0.0),
+        'Elementwise': (0.5, 0.0),
+    }
+    names = list(kernels)
+    ai_values = np.array([kernels[n][0] for n in names])
+    fractions = np.array([kernels[n][1] for n in names])
+    achieved = perf_model.combined_roofline(ai_values, fractions, Precision.FP8)
+    tensor_only = perf_model.roofline_performance(ai_values, Precision.FP8)
+    
+    print(f"\n{'Kernel':<26} {'AI':<8} {'Tensor %':<10} {'TFLOPS':<10} {'Tensor-only TFLOPS':<20}")
+    print("-" * 80)
+    for i, name in enumerate(names):
+        print(f"{name:<26} {ai_values[i]:<8.1f} {fractions[i]*100:<10.0f} "
+              f"{achieved[i]:<10.1f} {tensor_only[i]:<20.1f}")
+    
     # Power analysis
     print("\n" + "=" * 80)
     print("POWER ANALYSIS")
@@ -525,24 +909,59 @@ def main():
         if power <= 500:
             print(f"  ✓ Within 500W power budget")
         else:
-            print(f"  ✗ Exceeds 500W power budget")
+            ratio = power_model.capped_clock_ratio(500.0, util)
+            print(f"  ✗ Exceeds 500W power budget; throttles to "
+                  f"{soc.chiplet_config.sm_config.clock_mhz * ratio:.0f} MHz")
     
     # Scaling analysis
     print("\n" + "=" * 80)
     print("CHIPLET SCALING ANALYSIS")
     print("=" * 80)
     
-    scaling_model = ScalingModel(soc.chiplet_config)
+    scaling_model = ScalingModel(soc.chiplet_config, topology='mesh')
     chiplet_counts = [2, 4, 6, 8]
     
     analysis = scaling_model.efficiency_analysis(chiplet_counts, Precision.FP16)
     
-    print(f"\n{'Chiplets':<10} {'TFLOPS':<12} {'BW (TB/s)':<12} {'Power (W)':<12} {'TFLOPS/W':<12}")
-    print("-" * 60)
+    print(f"\n{'Chiplets':<10} {'TFLOPS':<12} {'BW (TB/s)':<12} {'Power (W)':<12} {'TFLOPS/W':<12} "
+          f"{'Mesh Bisection (TB/s)':<22} {'500W Capped TFLOPS':<20}")
+    print("-" * 103)
     for n in chiplet_counts:
         a = analysis[n]
+        # Over budget, the SoC throttles (peak compute is linear in clock)
+        ratio = PowerModel(scaling_model.soc_config(n, hbm3e_stacks=n * 2)).capped_clock_ratio(500.0)
         print(f"{n:<10} {a['compute_tflops']:<12.1f} {a['memory_tbps']:<12.2f} "
-              f"{a['power_watts']:<12.1f} {a['tflops_per_watt']:<12.2f}")
+              f"{a['power_watts']:<12.1f} {a['tflops_per_watt']:<12.2f} {a['bisection_tbps']:<22.2f} "
+              f"{a['compute_tflops'] * ratio:<20.1f}")
+    
+    # Heterogeneous mix: compute dies plus I/O and cache-only dies
+    print("\n" + "=" * 80)
+    print("HETEROGENEOUS CHIPLET MIX")
+    print("=" * 80)
+    
+    io_die = ChipletConfig(num_sms=0, l2_cache_mb=0, area_mm2=150, process_node="TSMC 5nm")
+    cache_die = ChipletConfig(num_sms=0, l2_cache_mb=64, area_mm2=200, process_node="TSMC 5nm")
+    mixes = {
+        'Homogeneous (4 compute)': soc,
+        '4 compute + 1 I/O': SoCConfig(chiplet_groups=[
+            ChipletGroup(soc.chiplet_config, 4, 'compute'),
+            ChipletGroup(io_die, 1, 'io'),
+        ]),
+        '4 compute + 1 I/O + 2 cache': SoCConfig(chiplet_groups=[
+            ChipletGroup(soc.chiplet_config, 4, 'compute'),
+            ChipletGroup(io_die, 1, 'io'),
+            ChipletGroup(cache_die, 2, 'cache'),
+        ]),
+    }
+    
+    print(f"\n{'SoC':<30} {'Chiplets':<10} {'L2 (MB)':<10} {'Area (mm²)':<12} "
+          f"{'FP16 TFLOPS':<13} {'Power (W)':<11} {'TFLOPS/W':<10}")
+    print("-" * 100)
+    for name, mix in mixes.items():
+        mix_power = PowerModel(mix)
+        print(f"{name:<30} {mix.total_chiplets:<10} {mix.total_l2_cache_mb:<10.0f} "
+              f"{mix.total_area_mm2:<12.0f} {PerformanceModel(mix).peak_compute(Precision.FP16):<13.1f} "
+              f"{mix_power.total_power():<11.1f} {mix_power.power_efficiency(Precision.FP16):<10.3f}")
     
     print("\n" + "=" * 80)
     print("GENERATING PLOTS...")
@@ -553,6 +972,10 @@ def main():
     perf_model.plot_roofline(Precision.FP16, save_path=roofline_path)
     print(f"✓ Generated: {roofline_path}")
     
+    combined_path = os.path.join(outputs_dir, 'roofline_combined_fp8.png')
+    perf_model.plot_combined_roofline(Precision.FP8, kernels, save_path=combined_path)
+    print(f"✓ Generated: {combined_path}")
+    
     # Generate scaling plot
     scaling_path = os.path.join(outputs_dir, 'chiplet_scaling.png')
     scaling_model.plot_scaling(chiplet_counts, Precision.FP16, save_path=scaling_path)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Power-Cap Throttling Model
+
+A chip over its power budget does not fail; firmware lowers the SM clock
+until board power fits the cap (and the junction stays under its thermal
+limit). This module solves for that sustained clock:
+
+- Power is monotonic in clock (V-f curve in PowerModel), so the sustained
+  clock is the root of total_power(f) = limit
+- PowerModel.capped_clock_ratio() finds the root by bisection on a
+  throttle ratio applied to every chiplet group's nominal clock; here it
+  runs over batch_model.py arrays, so all configurations, utilizations
+  and limits are solved at once
+- The thermal limit becomes a power limit through thermal_estimate's
+  model: T_j = ambient + P·theta_ja
+
+Designs over budget are then ranked by capped TFLOPS instead of being
+discarded.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, Precision
+from batch_model import batch_models, POWER_TARGET_W
+
+
+DEFAULT_MAX_JUNCTION_C = 85.0
+MIN_CLOCK_RATIO = 0.2       # Lowest throttle state (fraction of nominal clock)
+RATIO_TOLERANCE = 1e-4      # Bisection stops below ~0.2 MHz at 2 GHz
+
+
+def capped_operating_point(
+    base_soc: SoCConfig,
+    utilization: np.ndarray = 1.0,
+    precision: Precision = Precision.FP16,
+    power_limit_w: np.ndarray = POWER_TARGET_W,
+    max_junction_c: np.ndarray = DEFAULT_MAX_JUNCTION_C,
+    ambient_c: float = 25.0,
+    theta_ja: float = 0.1,
+    arithmetic_intensity: np.ndarray = None,
+    overrides: Dict[str, np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Sustained clock and throughput under power and thermal limits
+
+    All array arguments and overrides broadcast together; every element
+    is solved in the same bisection loop.
+
+    Args:
+        base_soc: Base SoC configuration
+        utilization: Workload utilization (0.0-1.0)
+        precision: Compute precision
+        power_limit_w: Board power limit
+        max_junction_c: Junction temperature limit (°C)
+        ambient_c: Ambient temperature (°C)
+        theta_ja: Thermal resistance junction-to-ambient (°C/W)
+        arithmetic_intensity: FLOPS/Byte; caps throughput at the memory
+            roof when given (default: compute-bound)
+        overrides: Dotted-path overrides (see batch_model.py)
+
+    Returns:
+        Dictionary of arrays; feasible is False where even the lowest
+        throttle state exceeds the limit
+    """
+    soc, perf_model, power_model = batch_models(base_soc, overrides or {})
+    utilization = np.asarray(utilization, dtype=float)
+
+    thermal_limit_w = (np.asarray(max_junction_c) - ambient_c) / theta_ja
+    limit = np.minimum(power_limit_w, thermal_limit_w)
+
+    uncapped_power = power_model.total_power(utilization, precision)
+    uncapped_tflops = perf_model.peak_compute(precision) * utilization
+    ratio = power_model.capped_clock_ratio(limit, utilization, precision,
+                                           MIN_CLOCK_RATIO, RATIO_TOLERANCE)
+    nominal_mhz = soc.chiplet_config.sm_config.clock_mhz
+
+    # Re-evaluate at the sustained clock of every group. soc is the private
+    # deep copy made by batch_models, so throttling its clocks is not visible
+    # to the caller.
+    power = power_model.total_power(utilization, precision, ratio)
+    sm_configs = {id(g.chiplet_config.sm_config): g.chiplet_config.sm_config
+                  for g in soc.groups}.values()
+    for sm in sm_configs:
+        sm.clock_mhz = sm.clock_mhz * ratio
+    capped_tflops = perf_model.peak_compute(precision)
+    if arithmetic_intensity is not None:
+        roof = perf_model.memory_bandwidth_tbps() * np.asarray(arithmetic_intensity)
+        capped_tflops = np.minimum(capped_tflops, roof)
+        uncapped_tflops = np.minimum(uncapped_tflops, roof * utilization)
+    capped_tflops = capped_tflops * utilization
+
+    arrays = np.broadcast_arrays(ratio, nominal_mhz * ratio, capped_tflops,
+                                 uncapped_tflops, power, uncapped_power, limit)
+    ratio, clock, capped_tflops, uncapped_tflops, power, uncapped_power, limit = arrays
+    return {
+        'clock_ratio': ratio,
+        'sustained_clock_mhz': clock,
+        'capped_tflops': capped_tflops,
+        'uncapped_tflops': uncapped_tflops,
+        'total_power_w': power,
+        'uncapped_power_w': uncapped_power,
+        'junction_temp_c': ambient_c + power * theta_ja,
+        'power_limit_w': limit,
+        'throttled': ratio < 1.0,
+        'feasible': power <= limit,
+    }
+
+
+def main():
+    """Sustained clocks of the exploration variants under power and thermal caps"""
+    from arch_exploration import (
+        create_baseline, create_realistic_optimized, create_high_sm_density,
+        create_aggressive_optimized, create_power_optimized
+    )
+
+    print("=" * 100)
+    print("NexGen-AI SoC Power-Cap Throttling")
+    print("=" * 100)
+
+    variants = [
+        create_baseline(),
+        create_realistic_optimized(),
+        create_high_sm_density(),
+        create_aggressive_optimized(),
+        create_power_optimized(),
+    ]
+    utilizations = np.array([1.0, 0.75, 0.5])
+    scenarios = [('25°C ambient', 25.0), ('45°C ambient', 45.0)]
+
+    for label, ambient in scenarios:
+        thermal_w = (DEFAULT_MAX_JUNCTION_C - ambient) / 0.1
+        print(f"\n{label}: cap {POWER_TARGET_W:.0f} W, T_j ≤ {DEFAULT_MAX_JUNCTION_C:.0f}°C "
+              f"(≤ {thermal_w:.0f} W)")
+        print(f"\n{'Variant':<25} {'Util':<7} {'Nominal':<10} {'Sustained':<11} {'Uncapped W':<12} "
+              f"{'Capped W':<10} {'T_j (°C)':<10} {'TFLOPS':<10} {'Uncapped':<10}")
+        print("-" * 110)
+        for variant in variants:
+            r = capped_operating_point(variant.soc_config, utilizations, ambient_c=ambient)
+            nominal = variant.soc_config.chiplet_config.sm_config.clock_mhz
+            for i, util in enumerate(utilizations):
+                clock = (f"{r['sustained_clock_mhz'][i]:.0f}" if r['feasible'][i]
+                         else 'infeasible')
+                print(f"{variant.name:<25} {util*100:<7.0f} {nominal:<10} {clock:<11} "
+                      f"{r['uncapped_power_w'][i]:<12.1f} {r['total_power_w'][i]:<10.1f} "
+                      f"{r['junction_temp_c'][i]:<10.1f} {r['capped_tflops'][i]:<10.1f} "
+                      f"{r['uncapped_tflops'][i]:<10.1f}")
+
+    # Vectorized across configs: SMs per chiplet x power limit in one solve
+    aggressive = variants[3]
+    sms = np.arange(16, 129, 4)
+    limits = np.array([300.0, 400.0, 500.0, 600.0])
+    r = capped_operating_point(aggressive.soc_config, 1.0,
+                               power_limit_w=limits[:, np.newaxis],
+                               max_junction_c=np.inf,
+                               overrides={'chiplet_config.num_sms': sms[np.newaxis, :]})
+    print(f"\n{aggressive.name}: capped FP16 TFLOPS vs SMs per chiplet "
+          f"({r['capped_tflops'].size} configs in one solve)")
+    print(f"\n{'SMs/chiplet':<13}" + ''.join(f"{f'{l:.0f}W cap':<22}" for l in limits))
+    print("-" * 101)
+    for j in range(0, len(sms), 4):
+        cells = [f"{r['capped_tflops'][i, j]:.0f} @ {r['sustained_clock_mhz'][i, j]:.0f} MHz"
+                 if r['feasible'][i, j] else 'infeasible' for i in range(len(limits))]
+        print(f"{sms[j]:<13}" + ''.join(f"{c:<22}" for c in cells))
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for i, limit in enumerate(limits):
+        tflops = np.where(r['feasible'][i], r['capped_tflops'][i], np.nan)
+        axes[0].plot(sms, tflops, linewidth=2, marker='o', markersize=4,
+                     label=f'{limit:.0f}W cap')
+        axes[1].plot(sms, r['sustained_clock_mhz'][i], linewidth=2, marker='o',
+                     markersize=4, label=f'{limit:.0f}W cap')
+    axes[0].plot(sms, r['uncapped_tflops'][0], 'k--', linewidth=1.5, label='Uncapped')
+    axes[0].set_ylabel('Sustained FP16 TFLOPS', fontsize=12)
+    axes[1].set_ylabel('Sustained SM Clock (MHz)', fontsize=12)
+    for ax in axes:
+        ax.set_xlabel('SMs per Chiplet', fontsize=12)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+    fig.suptitle(f'Power-Capped Performance - {aggressive.name}', fontsize=14)
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'power_capping.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Power-capping plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Per-Layer Precision Assignment
+
+Deployments mix FP4, FP8 and FP16 layer by layer: low precision where a
+layer tolerates it, high precision where quantization error shows up in
+accuracy. Given per-layer FLOPs and bytes and a per-layer, per-precision
+accuracy-cost table (e.g. perplexity increase measured layer by layer),
+this module picks the precision of every layer that minimizes step time
+on an SoC within a total accuracy budget.
+
+1. Layer time at each precision is its own roofline time,
+   max(FLOPs / peak, bytes / bandwidth); layers run back to back, so
+   step time is the sum
+2. The choice is a multiple-choice knapsack: one precision per layer,
+   costs add up against the budget. Costs are discretized into
+   budget_steps units (rounded up, so solutions never exceed the budget)
+   and solved by dynamic programming in O(layers x precisions x steps)
+3. The DP table is an array over every leading axis of the layer times,
+   so all configs of a batch_model.py sweep are solved in one pass, and
+   its last row gives the best step time for every smaller budget
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import itertools
+import numpy as np
+import matplotlib.pyplot as plt
+from typing import Dict, Sequence
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, PerformanceModel, Precision, BYTES_PER_ELEMENT
+from memory_footprint import TransformerConfig, LLAMA_70B
+from batch_model import batch_models
+
+
+PRECISION_CHOICES = (Precision.FP16, Precision.FP8, Precision.FP4)
+DEFAULT_BUDGET_STEPS = 1000
+
+
+def layer_times(
+    perf_model: PerformanceModel,
+    flops: np.ndarray,
+    weight_elements: np.ndarray,
+    other_bytes: np.ndarray,
+    precisions: Sequence[Precision] = PRECISION_CHOICES
+) -> np.ndarray:
+    """
+    Roofline time of every layer at every precision
+
+    Args:
+        perf_model: Performance model (config fields may be arrays)
+        flops: FLOPs per layer (..., L)
+        weight_elements: Weight elements per layer (..., L), stored at the
+            layer's precision
+        other_bytes: Bytes per layer independent of its precision (..., L),
+            e.g. KV cache reads
+        precisions: Candidate precisions (last axis of the result)
+
+    Returns:
+        Array (config..., ..., L, P) of seconds
+    """
+    peaks = [perf_model.peak_compute(p) for p in precisions]
+    bandwidth = perf_model.memory_bandwidth_tbps()
+    config_shape = np.broadcast_shapes(*(np.shape(x) for x in peaks + [bandwidth]))
+    peaks = np.stack([np.broadcast_to(x, config_shape) for x in peaks], axis=-1) * 1e12
+    bandwidth = np.broadcast_to(bandwidth, config_shape) * 1e12
+    element_bytes = np.array([BYTES_PER_ELEMENT[p] for p in precisions])
+
+    # Config axes lead; layer axes follow, with the precision axis last
+    layer_axes = max(np.ndim(flops), np.ndim(weight_elements), np.ndim(other_bytes))
+    expand = (Ellipsis,) + (np.newaxis,) * layer_axes
+    peaks = peaks[expand + (slice(None),)]
+    bandwidth = bandwidth[expand + (np.newaxis,)]
+
+    compute = np.asarray(flops, dtype=float)[..., np.newaxis] / peaks
+    memory = (np.asarray(weight_elements, dtype=float)[..., np.newaxis] * element_bytes +
+              np.asarray(other_bytes, dtype=float)[..., np.newaxis]) / bandwidth
+    return np.maximum(compute, memory)
+
+
+def assign_precisions(
+    times: np.ndarray,
+    accuracy_cost: np.ndarray,
+    budget: float,
+    budget_steps: int = DEFAULT_BUDGET_STEPS
+) -> Dict[str, np.ndarray]:
+    """
+    Fastest per-layer precision assignment within an accuracy budget
+
+    Args:
+        times: Layer times (..., L, P) from layer_times()
+        accuracy_cost: Accuracy cost of each layer at each precision (L, P)
+        budget: Total accuracy cost allowed
+        budget_steps: Discretization of the budget
+
+    Returns:
+        Dictionary of arrays over the leading axes: choice (..., L) indexes
+        the precision axis (-1 where no assignment fits the budget, with
+        step_s and accuracy_cost inf); time_by_budget (..., budget_steps + 1)
+        is the best step time for budgets 0..budget
+    """
+    times = np.asarray(times, dtype=float)
+    cost = np.asarray(accuracy_cost, dtype=float)
+    num_layers, num_choices = times.shape[-2:]
+    if cost.shape != (num_layers, num_choices):
+        raise ValueError(f"Accuracy cost table must have shape {(num_layers, num_choices)}, "
+                         f"got {cost.shape}")
+
+    if budget > 0:
+        units = np.ceil(cost / budget * budget_steps - 1e-9).astype(int)
+    else:
+        units = np.where(cost > 0, budget_steps + 1, 0)
+    lead = times.shape[:-2]
+
+    # best[..., b]: minimum time of the layers so far with cost <= b units
+    best = np.zeros(lead + (budget_steps + 1,))
+    choice = np.zeros(lead + (num_layers, budget_steps + 1), dtype=np.int8)
+    for l in range(num_layers):
+        candidates = np.full(lead + (num_choices, budget_steps + 1), np.inf)
+        for p in range(num_choices):
+            u = units[l, p]
+            if u <= budget_steps:
+                candidates[..., p, u:] = best[..., :budget_steps + 1 - u] + times[..., l, p, np.newaxis]
+        choice[..., l, :] = np.argmin(candidates, axis=-2)
+        best = np.min(candidates, axis=-2)
+
+    # Backtrack from the full budget; infeasible configs follow a dummy
+    # path at zero budget so the table indices stay valid
+    feasible = np.isfinite(best[..., -1])
+    remaining = np.where(feasible, budget_steps, 0)
+    assignment = np.zeros(lead + (num_layers,), dtype=int)
+    for l in range(num_layers - 1, -1, -1):
+        p = np.take_along_axis(choice[..., l, :], remaining[..., np.newaxis], axis=-1)[..., 0]
+        assignment[..., l] = p
+        remaining = np.maximum(remaining - units[l][p], 0)
+
+    layer_index = np.arange(num_layers)
+    chosen_times = np.take_along_axis(times, assignment[..., np.newaxis], axis=-1)[..., 0]
+    return {
+        'choice': np.where(feasible[..., np.newaxis], assignment, -1),
+        'step_s': np.where(feasible, chosen_times.sum(axis=-1), np.inf),
+        'accuracy_cost': np.where(feasible, cost[layer_index, assignment].sum(axis=-1), np.inf),
+        'feasible': feasible,
+        'time_by_budget': best,
+    }
+
+
+def check_against_brute_force(trials: int = 300, configs: int = 3, seed: int = 0) -> int:
+    """
+    Compare assign_precisions() with exhaustive search on small random tables
+
+    Integer costs with budget_steps = budget make the discretization
+    exact, so the DP must match the brute-force optimum, including
+    budgets no assignment fits.
+
+    Returns:
+        Number of mismatching configs (0 when the DP is correct)
+    """
+    rng = np.random.default_rng(seed)
+    mismatches = 0
+    for _ in range(trials):
+        num_layers, num_choices = rng.integers(1, 6), rng.integers(1, 4)
+        times = rng.uniform(0.1, 1.0, (configs, num_layers, num_choices))
+        cost = rng.integers(0, 5, (num_layers, num_choices)).astype(float)
+        budget = int(rng.integers(0, 2 * num_layers + 1))
+        r = assign_precisions(times, cost, budget, budget_steps=max(budget, 1))
+
+        combos = np.array(list(itertools.product(range(num_choices), repeat=num_layers)))
+        combo_cost = cost[np.arange(num_layers), combos].sum(axis=-1)
+        for c in range(configs):
+            combo_time = times[c, np.arange(num_layers), combos].sum(axis=-1)
+            fits = combo_cost <= budget
+            expected = combo_time[fits].min() if fits.any() else np.inf
+            if r['feasible'][c] != fits.any() or not np.isclose(r['step_s'][c], expected):
+                mismatches += 1
+            elif fits.any():
+                chosen = r['choice'][c]
+                if (cost[np.arange(num_layers), chosen].sum() > budget or
+                        not np.isclose(times[c, np.arange(num_layers), chosen].sum(), expected)):
+                    mismatches += 1
+            elif np.any(r['choice'][c] != -1) or np.isfinite(r['accuracy_cost'][c]):
+                mismatches += 1
+    return mismatches
+
+
+def transformer_decode_layers(model: TransformerConfig, batch: np.ndarray, context: np.ndarray,
+                              kv_precision: Precision = Precision.FP8) -> Dict[str, np.ndarray]:
+    """
+    Per-layer decode work: every transformer block, then the LM head
+
+    Returns:
+        flops, weight_elements and other_bytes arrays (..., num_layers + 1)
+    """
+    batch = np.asarray(batch, dtype=float)[..., np.newaxis]
+    context = np.asarray(context, dtype=float)[..., np.newaxis]
+    block = np.arange(model.num_layers + 1) < model.num_layers
+    head_params = model.vocab_size * model.hidden_size
+    params = np.where(block, model.params_per_layer, head_params)
+
+    attention_flops = 4 * model.num_heads * model.head_dim * context
+    kv_bytes = (2 * model.num_kv_heads * model.head_dim * context *
+                BYTES_PER_ELEMENT[kv_precision])
+    flops = batch * (2 * params + np.where(block, attention_flops, 0.0))
+    other = batch * np.where(block, kv_bytes, 0.0)
+    flops, other = np.broadcast_arrays(flops, other)
+    return {'flops': flops, 'weight_elements': params, 'other_bytes': other}
+
+
+def layer_sensitivity(num_layers: int, edge_boost: float = 3.0, edge_width: float = 4.0,
+                      head_sensitivity: float = 5.0) -> np.ndarray:
+    """Relative quantization sensitivity: first and last blocks and the LM head are fragile"""
+    l = np.arange(num_layers)
+    blocks = (1 + edge_boost * np.exp(-l / edge_width) +
+              edge_boost * np.exp(-(num_layers - 1 - l) / edge_width))
+    return np.append(blocks, head_sensitivity)
+
+
+def main():
+    """Precision assignment for 70B decode across budgets and a design sweep"""
+    print("=" * 100)
+    print("NexGen-AI SoC Per-Layer Precision Assignment")
+    print("=" * 100)
+
+    model = LLAMA_70B
+    names = [p.value for p in PRECISION_CHOICES]
+    # Perplexity increase per layer: FP16 free, FP8 small, FP4 large
+    sensitivity = layer_sensitivity(model.num_layers)
+    cost = sensitivity[:, np.newaxis] * np.array([0.0, 0.002, 0.03])
+    print(f"\n{model.name}: {model.num_layers} blocks + LM head; accuracy cost = perplexity increase")
+    print(f"All FP8: {cost[:, 1].sum():.3f}, all FP4: {cost[:, 2].sum():.3f}")
+    trials = 300
+    mismatches = check_against_brute_force(trials)
+    print(f"DP vs brute force on {trials} random tables: "
+          + ("all match" if mismatches == 0 else f"{mismatches} mismatching configs"))
+
+    soc = SoCConfig()
+    perf_model = PerformanceModel(soc)
+    batches = np.array([1, 32, 256])
+    layers = transformer_decode_layers(model, batches, 4096)
+    times = layer_times(perf_model, layers['flops'], layers['weight_elements'], layers['other_bytes'])
+
+    budgets = [0.0, 0.25, 0.5, 1.0, 2.0, 4.0]
+    print(f"\nBaseline SoC, 4k context")
+    print(f"\n{'Batch':<8} {'Budget':<9} {'Step (ms)':<11} {'vs FP16':<9} {'Cost':<8} "
+          + ''.join(f"{n + ' layers':<13}" for n in names))
+    print("-" * 85)
+    for budget in budgets:
+        r = assign_precisions(times, cost, budget)
+        for i, b in enumerate(batches):
+            counts = np.bincount(r['choice'][i], minlength=len(names))
+            fp16_s = times[i, :, 0].sum()
+            print(f"{b:<8} {budget:<9.2f} {r['step_s'][i]*1e3:<11.2f} "
+                  f"{fp16_s / r['step_s'][i]:<9.2f} {r['accuracy_cost'][i]:<8.3f} "
+                  + ''.join(f"{c:<13}" for c in counts))
+
+    # Re-solve for every config of a sweep: HBM bandwidth x FP4 tensor rate
+    bandwidths = np.array([128, 256, 512, 1024, 1229])
+    fp4_ops = np.array([256, 512, 1024])
+    _, sweep_perf, _ = batch_models(soc, {
+        'hbm3e_bandwidth_gbps_per_stack': bandwidths[:, np.newaxis],
+        'chiplet_config.sm_config.tensor_core_ops_per_cycle.FP4': fp4_ops[np.newaxis, :],
+    })
+    sweep_layers = transformer_decode_layers(model, 256, 4096)
+    start = time.perf_counter()
+    sweep_times = layer_times(sweep_perf, sweep_layers['flops'], sweep_layers['weight_elements'],
+                              sweep_layers['other_bytes'])
+    r = assign_precisions(sweep_times, cost, 1.0)
+    elapsed = time.perf_counter() - start
+    print(f"\nBatch 256, budget 1.0: {r['step_s'].size} configs solved in {elapsed*1e3:.0f} ms")
+    print(f"\n{'GB/s per stack':<16}" + ''.join(f"{f'FP4 {o} ops/clk':<26}" for o in fp4_ops))
+    print("-" * 95)
+    for i, bw in enumerate(bandwidths):
+        cells = []
+        for j in range(len(fp4_ops)):
+            counts = np.bincount(r['choice'][i, j], minlength=len(names))
+            cells.append(f"{r['step_s'][i, j]*1e3:.2f} ms ({'/'.join(str(c) for c in counts)})")
+        print(f"{bw:<16}" + ''.join(f"{c:<26}" for c in cells))
+    print(f"(layer counts {'/'.join(names)})")
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    r = assign_precisions(times, cost, max(budgets))
+    steps = np.linspace(0, max(budgets), r['time_by_budget'].shape[-1])
+    for i, b in enumerate(batches):
+        axes[0].plot(steps, r['time_by_budget'][i] * 1e3, linewidth=2, label=f'Batch {b}')
+    axes[0].set_xlabel('Accuracy Budget (perplexity increase)', fontsize=12)
+    axes[0].set_ylabel('Decode Step Time (ms)', fontsize=12)
+    axes[0].set_title('Step Time vs Accuracy Budget', fontsize=14, fontweight='bold')
+    axes[0].set_yscale('log')
+    axes[0].grid(True, alpha=0.3)
+    axes[0].legend()
+
+    r = assign_precisions(times, cost, 1.0)
+    axes[1].imshow(r['choice'], aspect='auto', cmap='viridis', interpolation='nearest',
+                   vmin=0, vmax=len(names) - 1)
+    axes[1].set_yticks(range(len(batches)))
+    axes[1].set_yticklabels([f'Batch {b}' for b in batches])
+    axes[1].set_xlabel('Layer (last = LM head)', fontsize=12)
+    axes[1].set_title('Assignment at Budget 1.0 (' +
+                      ', '.join(f'{n}={k}' for k, n in enumerate(names)) + ')',
+                      fontsize=14, fontweight='bold')
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'precision_assignment.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Precision assignment plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Opt-in Profiling Hooks
+
+Instrumentation for slow sweeps: where the time of a run goes between
+config construction, peak_compute(), total_power(), plotting and I/O.
+
+1. Per-stage timers: stage() context manager and timed() decorator,
+   recording calls, total/mean/max seconds and peak RSS at stage exit
+2. Throughput counters: evaluations() credits design points to a stage,
+   reported as evaluations per second of that stage's time
+3. Cache counters: cache_hit() / cache_miss() for hand-rolled caches and
+   register_cache() for functools.lru_cache functions
+4. Peak memory: process max RSS, plus the tracemalloc peak when tracing
+5. cProfile: whole-run profile dumped to a .prof file, with the top
+   functions by cumulative time in the report
+
+Everything is controlled by environment variables read at import time,
+so they must be set before the modeling modules are imported:
+
+    NGAISOC_PROFILE=1               report to ../../outputs/profile_<script>.json
+    NGAISOC_PROFILE=<path>          report to <path>
+    NGAISOC_PROFILE_CPROFILE=1      also run cProfile
+    NGAISOC_PROFILE_TRACEMALLOC=1   also trace Python allocations
+
+When enabled, the JSON report is written when the interpreter exits, so
+any CLI script is covered without changes. When disabled, timed()
+returns the undecorated function, stage() returns a shared null context
+and counters return immediately.
+
+Only the calling process is instrumented: work done in
+ProcessPoolExecutor workers is not aggregated.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+PROFILE_ENV = 'NGAISOC_PROFILE'
+CPROFILE_ENV = 'NGAISOC_PROFILE_CPROFILE'
+TRACEMALLOC_ENV = 'NGAISOC_PROFILE_TRACEMALLOC'
+TOP_FUNCTIONS = 25
+
+ENABLED = False
+
+_NULL_STAGE = contextlib.nullcontext()
+_options = {'report_path': None, 'cprofile': False, 'tracemalloc': False}
+_stages: Dict[str, 'StageStats'] = {}
+_counters: Dict[str, int] = {}
+_caches: Dict[str, Dict[str, int]] = {}
+_registered_caches: Dict[str, Callable] = {}
+_profiler = None
+_start = time.perf_counter()
+
+
+@dataclass
+class StageStats:
+    """Accumulated timings of one named stage"""
+    calls: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    evaluations: int = 0
+    peak_rss_mb: float = 0.0
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (0 where unavailable)"""
+    if resource is None:
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def _stats(name: str) -> StageStats:
+    stats = _stages.get(name)
+    if stats is None:
+        stats = _stages[name] = StageStats()
+    return stats
+
+
+class _Stage:
+    """Times one entry of a named stage"""
+    __slots__ = ('name', 'evaluations', 'start')
+
+    def __init__(self, name: str, evaluations: int):
+        self.name = name
+        self.evaluations = evaluations
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stats = _stats(self.name)
+        stats.calls += 1
+        stats.total_s += elapsed
+        stats.max_s = max(stats.max_s, elapsed)
+        stats.evaluations += self.evaluations
+        stats.peak_rss_mb = max(stats.peak_rss_mb, peak_rss_mb())
+        return False
+
+
+def stage(name: str, evaluations: int = 0):
+    """
+    Context manager timing a named stage
+
+    Nested stages are timed inclusively. Entries with the same name
+    accumulate.
+
+    Args:
+        name: Stage name, e.g. 'plot.savefig'
+        evaluations: Design points evaluated by this entry
+    """
+    if not ENABLED:
+        return _NULL_STAGE
+    return _Stage(name, evaluations)
+
+
+def timed(name: str) -> Callable:
+    """
+    Decorator timing every call of a function as a stage
+
+    Decided at decoration time: when profiling is disabled the function
+    is returned unchanged, so there is no per-call cost.
+    """
+    def decorator(func: Callable) -> Callable:
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Stage(name, 0):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def evaluations(name: str, count: int) -> None:
+    """Credit design points evaluated to a stage's throughput"""
+    if ENABLED:
+        _stats(name).evaluations += int(count)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Increment a free-form counter"""
+    if ENABLED:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def cache_hit(name: str, hits: int = 1) -> None:
+    """Record hits of a hand-rolled cache"""
+    if ENABLED:
+        _caches.setdefault(name, {'hits': 0, 'misses': 0})['hits'] += hits
+
+
+def cache_miss(name: str, misses: int = 1) -> None:
+    """Record misses of a hand-rolled cache"""
+    if ENABLED:
+        _caches.setdefault(name, {'hits': 0, 'misses': 0})['misses'] += misses
+
+
+def register_cache(name: str, func: Callable) -> None:
+    """Report the cache_info() of an lru_cache function"""
+    if ENABLED:
+        _registered_caches[name] = func
+
+
+def enable(report_path: str = None, cprofile: bool = False, trace_memory: bool = False) -> None:
+    """
+    Turn profiling on for the rest of the run
+
+    Functions decorated with timed() before this call stay untimed; call
+    it before importing the modeling modules (the environment variables
+    do this automatically).
+
+    Args:
+        report_path: JSON report written at exit (None: no automatic report)
+        cprofile: Run cProfile over the rest of the run
+        trace_memory: Trace Python allocations with tracemalloc
+    """
+    global ENABLED, _profiler
+    if not ENABLED:
+        _install_savefig_timer()
+        atexit.register(_write_at_exit)
+    ENABLED = True
+    _options.update(report_path=report_path, cprofile=cprofile, tracemalloc=trace_memory)
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if cprofile and _profiler is None:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def _install_savefig_timer() -> None:
+    """Time plot rendering, which every script does through Figure.savefig"""
+    try:
+        from matplotlib.figure import Figure
+    except ImportError:
+        return
+    savefig = Figure.savefig
+    if getattr(savefig, '_profiled', False):
+        return
+
+    @functools.wraps(savefig)
+    def wrapper(self, *args, **kwargs):
+        with _Stage('plot.savefig', 0):
+            return savefig(self, *args, **kwargs)
+    wrapper._profiled = True
+    Figure.savefig = wrapper
+
+
+def _top_functions(limit: int = TOP_FUNCTIONS) -> list:
+    """Functions with the highest cumulative time in the cProfile run"""
+    if _profiler is None:
+        return []
+    import pstats
+    _profiler.disable()
+    stats = pstats.Stats(_profiler)
+    _profiler.enable()
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{
+        'function': f'{os.path.basename(filename)}:{line}({func})',
+        'calls': nc,
+        'total_s': tt,
+        'cumulative_s': ct,
+    } for (filename, line, func), (cc, nc, tt, ct, callers) in rows]
+
+
+def report() -> Dict:
+    """Current profiling report as a JSON-serializable dictionary"""
+    stages = {}
+    for name, s in sorted(_stages.items(), key=lambda item: item[1].total_s, reverse=True):
+        stages[name] = {
+            'calls': s.calls,
+            'total_s': s.total_s,
+            'mean_s': s.total_s / s.calls if s.calls else 0.0,
+            'max_s': s.max_s,
+            'evaluations': s.evaluations,
+            'evals_per_s': s.evaluations / s.total_s if s.evaluations and s.total_s > 0 else None,
+            'peak_rss_mb': s.peak_rss_mb,
+        }
+
+    caches = {name: dict(c) for name, c in _caches.items()}
+    for name, func in _registered_caches.items():
+        info = func.cache_info()
+        caches[name] = {'hits': info.hits, 'misses': info.misses,
+                        'size': info.currsize, 'maxsize': info.maxsize}
+    for c in caches.values():
+        lookups = c['hits'] + c['misses']
+        c['hit_rate'] = c['hits'] / lookups if lookups else None
+
+    memory = {'peak_rss_mb': peak_rss_mb()}
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        memory.update(traced_current_mb=current / 2**20, traced_peak_mb=peak / 2**20)
+
+    return {
+        'script': os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None,
+        'argv': sys.argv[1:],
+        'wall_s': time.perf_counter() - _start,
+        'options': dict(_options),
+        'stages': stages,
+        'counters': dict(_counters),
+        'caches': caches,
+        'memory': memory,
+        'top_functions': _top_functions(),
+    }
+
+
+def write_report(path: str) -> Dict:
+    """Write the report (and the cProfile dump, when profiling) to path"""
+    data = report()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if _profiler is not None:
+        prof_path = os.path.splitext(path)[0] + '.prof'
+        _profiler.dump_stats(prof_path)
+        data['options']['cprofile_path'] = prof_path
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    return data
+
+
+def default_report_path() -> str:
+    """../../outputs/profile_<script>.json, relative to this file"""
+    script = os.path.splitext(os.path.basename(sys.argv[0] if sys.argv and sys.argv[0] else ''))[0]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    return os.path.join(outputs_dir, f'profile_{script or "interactive"}.json')
+
+
+def _write_at_exit() -> None:
+    path = _options['report_path']
+    if path:
+        write_report(path)
+        print(f"\n✓ Profiling report saved: {path}")
+
+
+def print_report(data: Dict) -> None:
+    """Print the stage and cache tables of a report"""
+    print(f"\n{'Stage':<36} {'Calls':<10} {'Total (s)':<11} {'Mean (ms)':<11} "
+          f"{'Evals/s':<14} {'Peak RSS (MB)':<14}")
+    print("-" * 100)
+    for name, s in data['stages'].items():
+        rate = f"{s['evals_per_s']:,.0f}" if s['evals_per_s'] else '-'
+        print(f"{name:<36} {s['calls']:<10,} {s['total_s']:<11.3f} {s['mean_s']*1e3:<11.3f} "
+              f"{rate:<14} {s['peak_rss_mb']:<14.0f}")
+    if data['caches']:
+        print(f"\n{'Cache':<40} {'Hits':<12} {'Misses':<12} {'Hit rate':<10}")
+        print("-" * 75)
+        for name, c in data['caches'].items():
+            rate = f"{c['hit_rate']*100:.1f}%" if c['hit_rate'] is not None else '-'
+            print(f"{name:<40} {c['hits']:<12,} {c['misses']:<12,} {rate:<10}")
+    memory = data['memory']
+    print(f"\nPeak RSS: {memory['peak_rss_mb']:.0f} MB", end='')
+    if 'traced_peak_mb' in memory:
+        print(f", traced Python peak: {memory['traced_peak_mb']:.0f} MB", end='')
+    print(f"; wall time {data['wall_s']:.2f} s")
+
+
+_env = os.environ.get(PROFILE_ENV, '')
+# A script run of this file is a second module instance; main() enables the shared one
+if _env and _env != '0' and __name__ != '__main__':
+    enable(report_path=default_report_path() if _env == '1' else _env,
+           cprofile=os.environ.get(CPROFILE_ENV, '') == '1',
+           trace_memory=os.environ.get(TRACEMALLOC_ENV, '') == '1')
+
+
+def main():
+    """Profile a design sweep, a memoized GEMM search and topology metrics"""
+    print("=" * 100)
+    print("NexGen-AI SoC Model Profiling")
+    print("=" * 100)
+
+    if not ENABLED:
+        # Turn on before the models are imported so timed() wraps them
+        enable(report_path=default_report_path())
+
+    import numpy as np
+    from performance_model import SoCConfig, Precision
+    from batch_model import evaluate_samples
+    from gemm_model import GemmModel, model_gemm_summary
+    from interconnect_topology import topology_metrics, TOPOLOGIES
+    from memory_footprint import LLAMA_8B, LLAMA_70B
+
+    soc = SoCConfig()
+    rng = np.random.default_rng(0)
+    paths = ['num_chiplets', 'chiplet_config.num_sms', 'chiplet_config.sm_config.clock_mhz']
+    samples = np.column_stack([
+        rng.integers(2, 17, 2_000_000),
+        rng.integers(8, 33, 2_000_000),
+        rng.uniform(1200, 2400, 2_000_000),
+    ])
+    with stage('demo.sweep'):
+        evaluate_samples(soc, paths, samples, Precision.FP16, chunk_size=250_000)
+
+    gemm = GemmModel(soc, Precision.FP16)
+    tokens = np.unique(np.logspace(0, 12, 500, base=2).astype(int))
+    with stage('demo.gemm_tiles'):
+        # The second pass over each model is served by the tile cache
+        for model in (LLAMA_8B, LLAMA_70B, LLAMA_8B, LLAMA_70B):
+            model_gemm_summary(gemm, model, tokens)
+
+    link_gbps = soc.chiplet_config.ucIe_bandwidth_gbps
+    with stage('demo.topology'):
+        for _ in range(2):
+            for topology in TOPOLOGIES:
+                for n in (4, 8, 16):
+                    topology_metrics(topology, n, link_gbps)
+
+    data = report()
+    print_report(data)
+
+
+if __name__ == "__main__":
+    # Run in the module instance the models import, not this __main__ copy
+    import profiling
+    profiling.main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Stack-Distance Cache Reuse Model
+
+Cache sizes (l1_cache_kb, l2_cache_mb) only matter through the traffic
+they filter. This tool reads a memory address trace, computes the LRU
+stack-distance (reuse-distance) histogram once, and derives the miss
+ratio curve for a fully-associative LRU cache of ANY capacity:
+
+    miss_ratio(C lines) = P(stack distance >= C) + cold misses
+
+Every cache size in a sweep is then an O(1) lookup into the same
+histogram, and misses x line size gives the effective HBM traffic that
+sets arithmetic intensity on the roofline.
+
+Stack distances are computed offline without a per-access Python loop.
+For the access at time t whose previous use of the same line was at p,
+
+    distance = (t - p - 1) - #{j in (p, t) : next(j) < t}
+
+and the second term reduces to a 2-D dominance count answered with a
+merge-sort tree (log n levels of block-sorted keys, queried with one
+vectorized searchsorted per level).
+
+Traces are raw little-endian integer byte addresses (uint64 by
+default) and are memory-mapped, not read into Python objects.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(__file__))
+import profiling
+from performance_model import SoCConfig, PerformanceModel, Precision
+
+
+DEFAULT_LINE_BYTES = 128
+
+
+def load_trace(path: str, dtype=np.uint64) -> np.ndarray:
+    """Memory-map a binary address trace (no copy is made)"""
+    return np.memmap(path, dtype=dtype, mode='r')
+
+
+def previous_use(lines: np.ndarray) -> np.ndarray:
+    """Index of the previous access to the same line (-1 for first use)"""
+    order = np.argsort(lines, kind='stable')
+    sorted_lines = lines[order]
+    prev = np.full(len(lines), -1, dtype=np.int64)
+    same = sorted_lines[1:] == sorted_lines[:-1]
+    prev[order[1:][same]] = order[:-1][same]
+    return prev
+
+
+def stack_distances(lines: np.ndarray) -> np.ndarray:
+    """
+    LRU stack distance of every access
+
+    Args:
+        lines: Cache-line identifiers in access order
+
+    Returns:
+        int64 array; distance = number of distinct lines touched since the
+        previous use of the same line, or -1 for a cold (first) access
+    """
+    n = len(lines)
+    prev = previous_use(np.asarray(lines))
+
+    # next(j) for every position (n if never reused)
+    reuse = np.nonzero(prev >= 0)[0]
+    next_use = np.full(n, n, dtype=np.int64)
+    next_use[prev[reuse]] = reuse
+
+    # Queries (p, t) ordered by p, which keeps searchsorted lookups local
+    p = np.nonzero(next_use < n)[0]
+    t = next_use[p]
+
+    # #{j < t : next(j) < t} == number of reuses before t
+    reuses_before = np.cumsum(prev >= 0) - (prev >= 0)
+
+    # #{j <= p : next(j) < t}: prefix [0, p+1) decomposed into aligned
+    # power-of-two blocks, one block per set bit of p+1
+    prefix = p + 1
+    nested_before_p = np.zeros(len(p), dtype=np.int64)
+    scale = n + 1
+    positions = np.arange(n, dtype=np.int64)
+    values = next_use
+    level = 0
+    while (1 << level) <= n:
+        # Level keys: block id, then next(j) sorted within the block. The
+        # previous level is already sorted in half-blocks, so the stable
+        # (run-merging) sort only merges pairs of runs.
+        keys = np.sort((positions >> level) * scale + values, kind='stable')
+        values = keys % scale
+
+        mask = (prefix >> level) & 1 == 1
+        if mask.any():
+            block = (prefix[mask] >> (level + 1)) << 1
+            found = np.searchsorted(keys, block * scale + t[mask], side='left')
+            nested_before_p[mask] += found - (block << level)
+        level += 1
+
+    distances = np.full(n, -1, dtype=np.int64)
+    distances[t] = (t - p - 1) - (reuses_before[t] - nested_before_p)
+    return distances
+
+
+@dataclass
+class ReuseProfile:
+    """Stack-distance histogram of one trace at one line size"""
+    histogram: np.ndarray  # histogram[d] = accesses with stack distance d
+    cold_misses: int
+    num_accesses: int
+    line_bytes: int = DEFAULT_LINE_BYTES
+
+    @classmethod
+    def from_addresses(cls, addresses: np.ndarray,
+                       line_bytes: int = DEFAULT_LINE_BYTES) -> 'ReuseProfile':
+        """Build a profile from byte addresses"""
+        shift = int(np.log2(line_bytes))
+        lines = np.asarray(addresses) >> np.uint64(shift) if np.asarray(addresses).dtype == np.uint64 \
+            else np.asarray(addresses) >> shift
+        # Dense line ids keep the working arrays compact
+        _, line_ids = np.unique(lines, return_inverse=True)
+        distances = stack_distances(line_ids.astype(np.int64))
+        warm = distances[distances >= 0]
+        return cls(
+            histogram=np.bincount(warm),
+            cold_misses=int(len(distances) - len(warm)),
+            num_accesses=int(len(distances)),
+            line_bytes=line_bytes,
+        )
+
+    @classmethod
+    def from_trace(cls, path: str, line_bytes: int = DEFAULT_LINE_BYTES,
+                   dtype=np.uint64) -> 'ReuseProfile':
+        """Build (or reuse) the profile of a trace file"""
+        stat = os.stat(path)
+        return _cached_profile(os.path.abspath(path), stat.st_size, stat.st_mtime_ns,
+                               line_bytes, np.dtype(dtype).str)
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, histogram=self.histogram, cold_misses=self.cold_misses,
+                            num_accesses=self.num_accesses, line_bytes=self.line_bytes)
+
+    @classmethod
+    def load(cls, path: str) -> 'ReuseProfile':
+        data = np.load(path)
+        return cls(data['histogram'], int(data['cold_misses']),
+                   int(data['num_accesses']), int(data['line_bytes']))
+
+    def miss_ratio(self, capacity_bytes: np.ndarray) -> np.ndarray:
+        """
+        Fully-associative LRU miss ratio (vectorized over capacities)
+
+        Args:
+            capacity_bytes: Cache capacity/capacities in bytes
+
+        Returns:
+            Miss ratio for each capacity
+        """
+        lines = np.floor(np.asarray(capacity_bytes, dtype=float) / self.line_bytes).astype(np.int64)
+        # hits(C) = accesses with distance < C
+        cumulative = np.concatenate([[0], np.cumsum(self.histogram)])
+        hits = cumulative[np.clip(lines, 0, len(self.histogram))]
+        return 1.0 - hits / self.num_accesses
+
+    def miss_bytes(self, capacity_bytes: np.ndarray) -> np.ndarray:
+        """Traffic below a cache of the given capacity, in bytes"""
+        return self.miss_ratio(capacity_bytes) * self.num_accesses * self.line_bytes
+
+
+@lru_cache(maxsize=32)
+def _cached_profile(path: str, size: int, mtime_ns: int,
+                    line_bytes: int, dtype: str) -> ReuseProfile:
+    """Profile cache keyed on file identity, so sweeps reuse one histogram"""
+    return ReuseProfile.from_addresses(load_trace(path, np.dtype(dtype)), line_bytes)
+
+
+profiling.register_cache('reuse_distance.profile', _cached_profile)
+
+
+def cache_traffic(soc: SoCConfig, profile: ReuseProfile) -> Dict[str, np.ndarray]:
+    """
+    Traffic through the L1/L2 hierarchy of a SoC for a chip-wide trace
+
+    The trace is treated as the aggregate stream of the chip: L1 capacity
+    is the sum over all SMs and L2 capacity the sum over all chiplets
+    (address-sliced, shared). Inclusive LRU is assumed, so the L2 miss
+    stream is given by the L2 capacity alone.
+
+    Returns:
+        Dictionary with L1/L2 miss ratios and bytes into L2 and HBM
+    """
+    l1_bytes = soc.total_sms * soc.chiplet_config.sm_config.l1_cache_kb * 1024
+    l2_bytes = soc.total_l2_cache_mb * 1024 ** 2
+    return {
+        'l1_miss_ratio': profile.miss_ratio(l1_bytes),
+        'l2_miss_ratio': profile.miss_ratio(l2_bytes),
+        'l2_traffic_bytes': profile.miss_bytes(l1_bytes),
+        'hbm_traffic_bytes': profile.miss_bytes(l2_bytes),
+    }
+
+
+def effective_arithmetic_intensity(flops: float, hbm_traffic_bytes: np.ndarray) -> np.ndarray:
+    """FLOPs per byte of HBM traffic (input to roofline_performance)"""
+    return flops / np.maximum(np.asarray(hbm_traffic_bytes, dtype=float), 1.0)
+
+
+def synthetic_trace(num_accesses: int, line_bytes: int = DEFAULT_LINE_BYTES,
+                    seed: int = 0) -> np.ndarray:
+    """
+    Synthetic chip-wide trace with working sets of several sizes
+
+    Mix of a small hot set (random), two looping tensors (4 MB and 48 MB,
+    sequential) and streaming data that is never reused.
+    """
+    rng = np.random.default_rng(seed)
+    kind = rng.choice(4, size=num_accesses, p=[0.25, 0.30, 0.30, 0.15])
+    addresses = np.empty(num_accesses, dtype=np.uint64)
+
+    hot_lines = (512 * 1024) // line_bytes
+    loop_small = (4 * 1024 ** 2) // line_bytes
+    loop_large = (48 * 1024 ** 2) // line_bytes
+    base = [0, 1 << 32, 2 << 32, 3 << 32]
+
+    for k, (count_fn) in enumerate([
+        lambda m: rng.integers(0, hot_lines, m),
+        lambda m: np.arange(m) % loop_small,
+        lambda m: np.arange(m) % loop_large,
+        lambda m: np.arange(m),
+    ]):
+        idx = np.nonzero(kind == k)[0]
+        addresses[idx] = base[k] + count_fn(len(idx)).astype(np.uint64) * line_bytes
+    return addresses
+
+
+def main():
+    """Miss-ratio curve and cache-aware roofline for a synthetic trace"""
+    import time
+
+    print("=" * 100)
+    print("NexGen-AI SoC Stack-Distance Reuse Analysis")
+    print("=" * 100)
+
+    num_accesses = 4_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic_trace.bin')
+        synthetic_trace(num_accesses).tofile(path)
+
+        start = time.perf_counter()
+        profile = ReuseProfile.from_trace(path)
+        elapsed = time.perf_counter() - start
+        print(f"\nTrace: {num_accesses:,} accesses, {profile.line_bytes} B lines")
+        print(f"Stack-distance histogram built in {elapsed:.2f} s "
+              f"({num_accesses / elapsed / 1e6:.2f} M accesses/s)")
+
+        start = time.perf_counter()
+        ReuseProfile.from_trace(path)
+        print(f"Cached profile lookup: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+    print(f"Cold misses: {profile.cold_misses / num_accesses:.1%}")
+
+    # L2 sweep: every size is a lookup into the same histogram
+    print("\n" + "=" * 100)
+    print("L2 CAPACITY SWEEP")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    perf_model = PerformanceModel(soc)
+    flops_per_access = 8.0  # FLOPs performed per line touched
+    flops = flops_per_access * num_accesses
+
+    l2_total_mb = np.array([4, 8, 16, 24, 32, 48, 64, 96])
+    traffic = profile.miss_bytes(l2_total_mb * 1024 ** 2)
+    ai = effective_arithmetic_intensity(flops, traffic)
+    achieved = perf_model.roofline_performance(ai, Precision.FP16)
+
+    print(f"\n{'Total L2 (MB)':<15} {'Miss Ratio':<12} {'HBM Traffic (MB)':<18} "
+          f"{'AI (FLOP/B)':<14} {'FP16 TFLOPS':<12}")
+    print("-" * 75)
+    for i, mb in enumerate(l2_total_mb):
+        print(f"{mb:<15} {profile.miss_ratio(mb * 1024 ** 2):<12.3f} {traffic[i] / 1e6:<18.1f} "
+              f"{ai[i]:<14.2f} {achieved[i]:<12.1f}")
+
+    baseline = cache_traffic(soc, profile)
+    print(f"\nBaseline SoC ({soc.num_chiplets} x {soc.chiplet_config.l2_cache_mb} MB L2): "
+          f"L1 miss {float(baseline['l1_miss_ratio']):.3f}, "
+          f"L2 miss {float(baseline['l2_miss_ratio']):.3f}")
+
+    capacities = np.logspace(np.log10(16 * 1024), np.log10(256 * 1024 ** 2), 400)
+    plt.figure(figsize=(10, 6))
+    plt.semilogx(capacities / 1024 ** 2, profile.miss_ratio(capacities), 'b-', linewidth=2)
+    l2_bytes = soc.total_l2_cache_mb * 1024 ** 2
+    plt.axvline(l2_bytes / 1024 ** 2, color='r', linestyle='--',
+                label=f'Baseline L2: {l2_bytes / 1024 ** 2:.0f} MB')
+    plt.xlabel('Cache Capacity (MB)', fontsize=12)
+    plt.ylabel('Miss Ratio', fontsize=12)
+    plt.title('Miss Ratio Curve (fully-associative LRU)', fontsize=14)
+    plt.grid(True, alpha=0.3)
+    plt.legend()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'miss_ratio_curve.png')
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Miss ratio curve saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Inference Serving Simulator
+
+Event-driven simulation of online LLM serving with iteration-level
+(continuous) batching, as in Orca/vLLM-style schedulers:
+
+1. Requests arrive by a renewal process (Poisson or bursty gamma) with
+   lognormal prompt and output lengths
+2. Each iteration runs one decode token for every running sequence plus
+   chunked prefill of queued prompts, up to a token budget
+3. Requests are admitted FIFO while the sequence limit and the KV cache
+   (HBM left after weights and workspace) can hold their full length
+4. Every iteration is charged a roofline step time from PerformanceModel:
+   weights plus KV reads against HBM bandwidth vs FLOPs against peak
+
+The scheduler keeps only aggregates (decode batch size, total context)
+and a per-iteration completion bucket, so each iteration is O(1) plus
+the prefill chunks it runs; millions of requests simulate in minutes.
+Per-request TTFT, TPOT and end-to-end latency are derived vectorized
+from the iteration timeline at the end.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, PerformanceModel, Precision
+from memory_footprint import MemoryFootprintModel, TransformerConfig, LLAMA_8B, LLAMA_70B
+
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class RequestTrace:
+    """Arrival time and prompt/output lengths of each request"""
+    arrival_s: np.ndarray
+    prompt_tokens: np.ndarray
+    output_tokens: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.arrival_s)
+
+
+def synthetic_trace(
+    num_requests: int,
+    rate_per_s: float,
+    mean_prompt_tokens: float = 1024,
+    mean_output_tokens: float = 256,
+    length_sigma: float = 0.8,
+    arrival_cv: float = 1.0,
+    max_tokens: int = 16384,
+    seed: int = 0
+) -> RequestTrace:
+    """
+    Gamma-renewal arrivals with lognormal prompt and output lengths
+
+    Args:
+        num_requests: Number of requests
+        rate_per_s: Mean arrival rate
+        mean_prompt_tokens: Mean prompt length
+        mean_output_tokens: Mean output length
+        length_sigma: Lognormal shape of both length distributions
+        arrival_cv: Coefficient of variation of inter-arrival gaps
+            (1.0 is Poisson, > 1 is bursty)
+        max_tokens: Lengths are clipped to [1, max_tokens]
+        seed: Random seed
+
+    Returns:
+        RequestTrace sorted by arrival time
+    """
+    rng = np.random.default_rng(seed)
+    shape = 1.0 / arrival_cv ** 2
+    arrival = np.cumsum(rng.gamma(shape, 1.0 / (rate_per_s * shape), num_requests))
+
+    def lengths(mean):
+        mu = np.log(mean) - length_sigma ** 2 / 2
+        return np.clip(np.rint(rng.lognormal(mu, length_sigma, num_requests)),
+                       1, max_tokens).astype(np.int64)
+
+    return RequestTrace(arrival, lengths(mean_prompt_tokens), lengths(mean_output_tokens))
+
+
+@dataclass
+class SchedulerConfig:
+    """Continuous-batching scheduler limits and achievable efficiencies"""
+    max_num_seqs: int = 256           # Running sequences (decode + prefill)
+    max_batched_tokens: int = 8192    # Tokens per iteration (decode + prefill chunks)
+    compute_efficiency: float = 0.7   # Achieved fraction of peak tensor throughput
+    memory_efficiency: float = 0.8    # Achieved fraction of HBM bandwidth
+    step_overhead_s: float = 100e-6   # Scheduling and launch overhead per iteration
+
+
+class ServingSimulator:
+    """Continuous-batching serving of one transformer on one SoC"""
+
+    def __init__(self, soc_config: SoCConfig, model: TransformerConfig,
+                 weight_precision: Precision = Precision.FP8,
+                 kv_precision: Precision = Precision.FP8,
+                 compute_precision: Precision = None,
+                 scheduler: SchedulerConfig = None):
+        """
+        Args:
+            soc_config: SoC configuration
+            model: Transformer shape
+            weight_precision: Storage precision of the weights
+            kv_precision: Storage precision of the KV cache
+            compute_precision: Tensor-core precision (default: weight precision)
+            scheduler: Scheduler limits (default: SchedulerConfig())
+        """
+        self.model = model
+        self.scheduler = scheduler or SchedulerConfig()
+        self.footprint = MemoryFootprintModel(
+            soc_config, model, weight_precision, kv_precision,
+            prefill_chunk_tokens=self.scheduler.max_batched_tokens
+        )
+        precision = compute_precision or weight_precision
+
+        perf_model = PerformanceModel(soc_config)
+        self.flops_per_s = perf_model.peak_compute(precision) * 1e12 * self.scheduler.compute_efficiency
+        self.bytes_per_s = perf_model.memory_bandwidth_tbps() * 1e12 * self.scheduler.memory_efficiency
+
+        self.matmul_flops_per_token = float(model.decode_flops_per_token(0))
+        self.attention_flops_per_pair = 4.0 * model.num_layers * model.num_heads * model.head_dim
+        self.weight_bytes = self.footprint.weight_bytes()
+        self.kv_bytes_per_token = self.footprint.kv_bytes_per_token()
+
+        free = (self.footprint.usable_bytes() - self.weight_bytes -
+                self.footprint.activation_bytes(self.scheduler.max_num_seqs))
+        self.kv_capacity_tokens = int(free // self.kv_bytes_per_token)
+        if self.kv_capacity_tokens <= 0:
+            raise ValueError(f"{model.name} does not fit in HBM")
+
+    def step_time(self, tokens: float, attention_pairs: float, kv_tokens: float) -> float:
+        """
+        Roofline time of one iteration
+
+        Args:
+            tokens: Tokens processed (decode + prefill)
+            attention_pairs: Query-key pairs scored across all sequences
+            kv_tokens: KV-cache tokens read or written
+
+        Returns:
+            Step time in seconds
+        """
+        flops = tokens * self.matmul_flops_per_token + attention_pairs * self.attention_flops_per_pair
+        bytes_moved = self.weight_bytes + kv_tokens * self.kv_bytes_per_token
+        return max(flops / self.flops_per_s, bytes_moved / self.bytes_per_s) + self.scheduler.step_overhead_s
+
+    def simulate(self, trace: RequestTrace) -> Dict[str, np.ndarray]:
+        """
+        Run the trace through the continuous-batching scheduler
+
+        Admitted requests reserve KV for prompt + output tokens, so no
+        preemption occurs; requests are admitted in arrival order.
+
+        Args:
+            trace: Request arrivals and lengths
+
+        Returns:
+            Dictionary of per-request latencies, iteration statistics and
+            per-iteration arrays (start and end time, decode batch,
+            batched tokens)
+        """
+        arrival = trace.arrival_s
+        prompt = trace.prompt_tokens
+        output = trace.output_tokens
+        seq_tokens = prompt + output
+        n = len(trace)
+        if np.any(seq_tokens > self.kv_capacity_tokens):
+            raise ValueError("Request longer than the KV-cache capacity")
+
+        max_seqs = self.scheduler.max_num_seqs
+        max_tokens = self.scheduler.max_batched_tokens
+        capacity = self.kv_capacity_tokens
+        step_time = self.step_time
+
+        # The loop is scalar; Python lists index far faster than arrays
+        arrival_list = arrival.tolist()
+        prompt_list = prompt.tolist()
+        output_list = output.tolist()
+        seq_list = seq_tokens.tolist()
+        admit_time = [0.0] * n
+        first_token_iter = [0] * n
+        finish_iter = [0] * n
+        step_start: List[float] = []
+        step_end: List[float] = []
+        decode_batch: List[int] = []
+        batched_tokens: List[int] = []
+
+        prefilling = deque()     # [request, prompt tokens done], oldest first
+        finishing = {}           # iteration -> requests completing in it
+        num_decoding = 0
+        context_tokens = 0       # Sum of decoding sequences' context lengths
+        kv_reserved = 0
+        next_request = 0
+        completed = 0
+        now = 0.0
+        it = 0
+
+        while completed < n:
+            while (next_request < n and arrival_list[next_request] <= now and
+                   num_decoding + len(prefilling) < max_seqs and
+                   kv_reserved + seq_list[next_request] <= capacity):
+                prefilling.append([next_request, 0])
+                admit_time[next_request] = now
+                kv_reserved += seq_list[next_request]
+                next_request += 1
+
+            if num_decoding == 0 and not prefilling:
+                now = arrival_list[next_request]  # Idle until the next arrival
+                continue
+
+            # One decode token per running sequence; prefill chunks fill the budget
+            budget = max_tokens - num_decoding
+            pairs = context_tokens
+            kv_tokens = context_tokens + num_decoding
+            for entry in prefilling:
+                if budget <= 0:
+                    break
+                request, done = entry
+                chunk = min(prompt_list[request] - done, budget)
+                pairs += chunk * done + chunk * (chunk + 1) // 2
+                kv_tokens += done + chunk
+                budget -= chunk
+                entry[1] = done + chunk
+            tokens = max_tokens - budget
+
+            step_start.append(now)
+            now += step_time(tokens, pairs, kv_tokens)
+            step_end.append(now)
+            decode_batch.append(num_decoding)
+            batched_tokens.append(tokens)
+            context_tokens += num_decoding
+
+            for request in finishing.pop(it, ()):
+                finish_iter[request] = it
+                num_decoding -= 1
+                context_tokens -= seq_list[request]
+                kv_reserved -= seq_list[request]
+                completed += 1
+
+            # Finished prompts emit their first token and join the decode batch
+            while prefilling and prefilling[0][1] == prompt_list[prefilling[0][0]]:
+                request = prefilling.popleft()[0]
+                first_token_iter[request] = it
+                if output_list[request] == 1:
+                    finish_iter[request] = it
+                    kv_reserved -= seq_list[request]
+                    completed += 1
+                    continue
+                num_decoding += 1
+                context_tokens += prompt_list[request] + 1
+                finishing.setdefault(it + output_list[request] - 1, []).append(request)
+            it += 1
+
+        step_start = np.array(step_start)
+        step_end = np.array(step_end)
+        first_token_iter = np.array(first_token_iter)
+        finish_iter = np.array(finish_iter)
+        ttft = step_end[first_token_iter] - arrival
+        e2e = step_end[finish_iter] - arrival
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tpot = np.where(output > 1, (e2e - ttft) / (output - 1), np.nan)
+
+        return {
+            'ttft_s': ttft,
+            'tpot_s': tpot,
+            'e2e_s': e2e,
+            'queue_s': np.array(admit_time) - arrival,
+            'output_tokens': output,
+            'arrival_s': arrival,
+            'finish_s': step_end[finish_iter],
+            'iterations': it,
+            'step_start_s': step_start,
+            'step_end_s': step_end,
+            'decode_batch': np.array(decode_batch),
+            'batched_tokens': np.array(batched_tokens),
+            'mean_decode_batch': float(np.mean(decode_batch)),
+            # Busy time per iteration, excluding idle gaps between arrivals
+            'mean_step_ms': float(np.mean(step_end - step_start)) * 1e3,
+        }
+
+
+def latency_summary(result: Dict[str, np.ndarray],
+                    warmup_fraction: float = 0.05) -> Dict[str, float]:
+    """
+    Throughput and latency percentiles of a simulation
+
+    Args:
+        result: Output of ServingSimulator.simulate()
+        warmup_fraction: Leading fraction of requests excluded from
+            latency percentiles (empty-system start-up)
+
+    Returns:
+        Dictionary of scalar metrics
+    """
+    start = int(len(result['ttft_s']) * warmup_fraction)
+    duration = result['finish_s'].max() - result['arrival_s'][0]
+    summary = {
+        'requests_per_s': len(result['ttft_s']) / duration,
+        'tokens_per_s': result['output_tokens'].sum() / duration,
+        'mean_decode_batch': result['mean_decode_batch'],
+    }
+    for name in ('ttft_s', 'tpot_s', 'e2e_s'):
+        values = np.nanpercentile(result[name][start:], PERCENTILES)
+        for p, v in zip(PERCENTILES, values):
+            summary[f'{name[:-2]}_p{p}_s'] = v
+    return summary
+
+
+def _simulate_rate(rate_per_s: float, soc_config: SoCConfig, model: TransformerConfig,
+                   num_requests: int, trace_kwargs: Dict, sim_kwargs: Dict) -> Dict[str, float]:
+    """Simulate one arrival rate (worker entry point)"""
+    trace = synthetic_trace(num_requests, rate_per_s, **trace_kwargs)
+    return latency_summary(ServingSimulator(soc_config, model, **sim_kwargs).simulate(trace))
+
+
+def latency_throughput_curve(
+    soc_config: SoCConfig,
+    model: TransformerConfig,
+    rates_per_s: np.ndarray,
+    num_requests: int = 100_000,
+    workers: int = 1,
+    trace_kwargs: Dict = None,
+    sim_kwargs: Dict = None
+) -> List[Dict[str, float]]:
+    """
+    Latency percentiles vs achieved throughput across arrival rates
+
+    Args:
+        soc_config: SoC configuration
+        model: Transformer shape
+        rates_per_s: Arrival rates to simulate
+        num_requests: Requests per rate
+        workers: Number of worker processes (one rate per task)
+        trace_kwargs: Extra synthetic_trace() arguments
+        sim_kwargs: Extra ServingSimulator() arguments
+
+    Returns:
+        One latency_summary() per rate, with 'offered_rate_per_s' added
+    """
+    func = partial(_simulate_rate, soc_config=soc_config, model=model,
+                   num_requests=num_requests, trace_kwargs=trace_kwargs or {},
+                   sim_kwargs=sim_kwargs or {})
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(func, rates_per_s))
+    else:
+        results = [func(rate) for rate in rates_per_s]
+
+    for rate, r in zip(rates_per_s, results):
+        r['offered_rate_per_s'] = rate
+    return results
+
+
+def main():
+    """Serving latency vs throughput for 8B and 70B models on the baseline SoC"""
+    print("=" * 100)
+    print("NexGen-AI SoC Inference Serving Simulation")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    scheduler = SchedulerConfig()
+    print(f"\nScheduler: {scheduler.max_num_seqs} seqs, {scheduler.max_batched_tokens} tokens/iteration, "
+          f"FP8 weights and KV, prompts ~1024 / outputs ~256 tokens (lognormal), Poisson arrivals")
+
+    cases = [
+        (LLAMA_8B, np.array([1.0, 2.0, 3.0, 3.5, 4.0, 4.3, 4.5])),
+        (LLAMA_70B, np.array([0.1, 0.2, 0.3, 0.4, 0.45, 0.48])),
+    ]
+    workers = min(os.cpu_count() or 1, 8)
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for model, rates in cases:
+        sim = ServingSimulator(soc, model, scheduler=scheduler)
+        print(f"\n{model.name}: KV capacity {sim.kv_capacity_tokens:,} tokens")
+        print(f"\n{'Offered (req/s)':<17} {'Achieved':<10} {'Tokens/s':<10} {'Batch':<8} "
+              f"{'TTFT p50':<10} {'TTFT p99':<10} {'TPOT p50':<10} {'TPOT p99':<10} {'E2E p99':<10}")
+        print("-" * 100)
+        curve = latency_throughput_curve(soc, model, rates, num_requests=20_000,
+                                         workers=workers, sim_kwargs={'scheduler': scheduler})
+        for r in curve:
+            print(f"{r['offered_rate_per_s']:<17.2f} {r['requests_per_s']:<10.2f} "
+                  f"{r['tokens_per_s']:<10.0f} {r['mean_decode_batch']:<8.1f} "
+                  f"{r['ttft_p50_s']*1e3:<10.0f} {r['ttft_p99_s']*1e3:<10.0f} "
+                  f"{r['tpot_p50_s']*1e3:<10.1f} {r['tpot_p99_s']*1e3:<10.1f} {r['e2e_p99_s']:<10.1f}")
+
+        tokens = [r['tokens_per_s'] for r in curve]
+        for p, style in ((50, '-o'), (99, '--s')):
+            axes[0].plot(tokens, [r[f'ttft_p{p}_s'] * 1e3 for r in curve], style,
+                         linewidth=2, label=f'{model.name} p{p}')
+            axes[1].plot(tokens, [r[f'tpot_p{p}_s'] * 1e3 for r in curve], style,
+                         linewidth=2, label=f'{model.name} p{p}')
+    print("\n(latencies in ms, E2E in s)")
+
+    # Scale check: one million requests in a single simulation
+    trace = synthetic_trace(1_000_000, 4.0)
+    start = time.perf_counter()
+    result = ServingSimulator(soc, LLAMA_8B, scheduler=scheduler).simulate(trace)
+    elapsed = time.perf_counter() - start
+    summary = latency_summary(result)
+    print(f"\n{LLAMA_8B.name}, 1,000,000 requests at 4 req/s: {result['iterations']:,} iterations "
+          f"simulated in {elapsed:.1f} s")
+    print(f"  {summary['tokens_per_s']:.0f} tokens/s, TTFT p50/p99 "
+          f"{summary['ttft_p50_s']*1e3:.0f}/{summary['ttft_p99_s']*1e3:.0f} ms")
+
+    axes[0].set_ylabel('Time to First Token (ms)', fontsize=12)
+    axes[0].set_title('TTFT vs Throughput', fontsize=14, fontweight='bold')
+    axes[1].set_ylabel('Time per Output Token (ms)', fontsize=12)
+    axes[1].set_title('TPOT vs Throughput', fontsize=14, fontweight='bold')
+    for ax in axes:
+        ax.set_xlabel('Output Tokens/s', fontsize=12)
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.grid(True, alpha=0.3, which='both')
+        ax.legend()
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'serving_latency.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Serving latency plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Structured-Sparsity Workload Model
+
+peak_compute() assumes dense math. Pruned weights change both sides of
+the roofline:
+
+1. N:M structured sparsity (2:4) runs on the sparse tensor-core path at
+   up to SMConfig.sparse_speedup, and the weights are stored compressed
+   (kept values plus SMConfig.sparse_metadata_overhead index bytes)
+2. Block sparsity skips all-zero weight tiles in the kernel, on any
+   hardware, removing their FLOPs and bytes
+3. Without a sparse tensor-core path (speedup 1), N:M weights are stored
+   and multiplied dense
+
+Only the sparse_fraction of a workload's FLOPs and weights (e.g. the
+linear layers, not attention) is pruned. Power follows the SM and HBM
+busy fractions, so the energy saved by shorter steps and fewer bytes is
+included.
+
+Workload fields and dotted-path overrides broadcast together, so sparse
+vs dense designs and workloads are compared in one batch.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, Precision, BYTES_PER_ELEMENT
+from batch_model import batch_models
+
+
+SPARSE_SPEEDUP_PATH = 'chiplet_config.sm_config.sparse_speedup'
+
+
+@dataclass
+class SparseWorkload:
+    """
+    Work per step of one or more kernels with pruned weights
+
+    Every field may be an array; fields broadcast together.
+    """
+    flops: np.ndarray                  # Dense-equivalent FLOPs
+    weight_bytes: np.ndarray           # Dense weight bytes
+    activation_bytes: np.ndarray       # Activation / KV bytes (never pruned)
+    sparse_fraction: np.ndarray = 1.0  # Fraction of FLOPs and weights that are pruned
+    nm_density: np.ndarray = 1.0       # Kept fraction within N:M groups (0.5 for 2:4)
+    block_density: np.ndarray = 1.0    # Fraction of weight blocks that are non-zero
+
+
+def gemm_workload(m: np.ndarray, n: np.ndarray, k: np.ndarray, precision: Precision,
+                  nm_density: np.ndarray = 1.0, block_density: np.ndarray = 1.0) -> SparseWorkload:
+    """Workload of a GEMM with an M x K activation and a pruned K x N weight"""
+    m, n, k = (np.asarray(x, dtype=float) for x in (m, n, k))
+    element = BYTES_PER_ELEMENT[precision]
+    return SparseWorkload(
+        flops=2 * m * n * k,
+        weight_bytes=k * n * element,
+        activation_bytes=(m * k + m * n) * element,
+        nm_density=nm_density,
+        block_density=block_density,
+    )
+
+
+def sparse_performance(
+    base_soc: SoCConfig,
+    workload: SparseWorkload,
+    precision: Precision = Precision.FP8,
+    utilization: np.ndarray = 1.0,
+    overrides: Dict[str, np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Step time, dense-equivalent throughput and power of sparse workloads
+
+    Args:
+        base_soc: Base SoC configuration
+        workload: Workload descriptor(s)
+        precision: Compute and weight storage precision
+        utilization: Fraction of the roofline achieved
+        overrides: Dotted-path overrides (see batch_model.py), e.g.
+            'chiplet_config.sm_config.sparse_speedup.FP8' for designs
+            with and without a sparse tensor-core path
+
+    Returns:
+        Dictionary of arrays with the broadcast shape of the workload and
+        overrides; speedup is relative to the same workload run dense
+    """
+    soc, perf_model, power_model = batch_models(base_soc, overrides or {})
+    sm = soc.chiplet_config.sm_config
+
+    peak = perf_model.peak_compute(precision) * 1e12
+    hw_speedup = perf_model.sparse_peak_compute(precision) * 1e12 / peak
+    bandwidth = perf_model.memory_bandwidth_tbps() * 1e12
+
+    flops = np.asarray(workload.flops, dtype=float)
+    weights = np.asarray(workload.weight_bytes, dtype=float)
+    sparse = np.asarray(workload.sparse_fraction, dtype=float)
+    block = np.asarray(workload.block_density, dtype=float)
+    # N:M weights only shrink where the sparse tensor-core path exists
+    nm = np.where(hw_speedup > 1.0, workload.nm_density, 1.0)
+
+    compute_s = flops * ((1 - sparse) + sparse * block / np.minimum(hw_speedup, 1.0 / nm)) / peak
+    metadata = np.where(nm < 1.0, sm.sparse_metadata_overhead[precision], 0.0)
+    bytes_moved = (weights * ((1 - sparse) + sparse * block * nm * (1 + metadata)) +
+                   np.asarray(workload.activation_bytes, dtype=float))
+    memory_s = bytes_moved / bandwidth
+    step_s = np.maximum(compute_s, memory_s) / utilization
+    dense_s = np.maximum(flops / peak, (weights + workload.activation_bytes) / bandwidth) / utilization
+
+    sm_busy = compute_s / step_s
+    memory_busy = memory_s / step_s
+    power = (power_model.sm_power(1.0, precision) * sm_busy +
+             power_model.memory_system_power(memory_busy) +
+             power_model.static_power() +
+             power_model.interconnect_power_w +
+             power_model.io_power_w)
+
+    arrays = np.broadcast_arrays(step_s, compute_s, memory_s, bytes_moved, power, dense_s, flops)
+    step_s, compute_s, memory_s, bytes_moved, power, dense_s, flops = arrays
+    return {
+        'step_s': step_s,
+        'compute_s': compute_s,
+        'memory_s': memory_s,
+        'bytes_moved': bytes_moved,
+        'effective_tflops': flops / step_s / 1e12,
+        'speedup': dense_s / step_s,
+        'total_power_w': power,
+        'energy_j': power * step_s,
+        'tflops_per_watt': flops / step_s / 1e12 / power,
+        'memory_bound': memory_s > compute_s,
+    }
+
+
+def main():
+    """Sparse vs dense designs on decode and prefill GEMMs"""
+    print("=" * 100)
+    print("NexGen-AI SoC Structured-Sparsity Analysis")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    precision = Precision.FP8
+    hidden = 8192
+
+    # Axes: design (D, 1, 1) x tokens per GEMM (1, M, 1) x sparsity (1, 1, S)
+    designs = {'Dense tensor cores': 1.0, '2:4 sparse tensor cores': 2.0}
+    tokens = np.array([1, 16, 128, 512, 4096])
+    sparsity = {
+        'Dense': (1.0, 1.0),
+        '2:4': (0.5, 1.0),
+        'Block 50%': (1.0, 0.5),
+        '2:4 + block 50%': (0.5, 0.5),
+    }
+    nm = np.array([v[0] for v in sparsity.values()])
+    block = np.array([v[1] for v in sparsity.values()])
+    workload = gemm_workload(tokens[np.newaxis, :, np.newaxis], hidden, hidden, precision,
+                             nm[np.newaxis, np.newaxis, :], block[np.newaxis, np.newaxis, :])
+    r = sparse_performance(soc, workload, precision, overrides={
+        f'{SPARSE_SPEEDUP_PATH}.{precision.value}':
+            np.array(list(designs.values()))[:, np.newaxis, np.newaxis],
+    })
+
+    print(f"\n{hidden}x{hidden} {precision.value} GEMM ({r['step_s'].size} points in one call)")
+    for d, design in enumerate(designs):
+        print(f"\n{design}")
+        print(f"\n{'Tokens':<8} {'Sparsity':<18} {'Step (us)':<11} {'Bound':<9} "
+              f"{'Eff. TFLOPS':<13} {'Speedup':<9} {'Power (W)':<11} {'Energy (mJ)':<12}")
+        print("-" * 95)
+        for i, m in enumerate(tokens):
+            for j, name in enumerate(sparsity):
+                bound = 'Memory' if r['memory_bound'][d, i, j] else 'Compute'
+                print(f"{m:<8} {name:<18} {r['step_s'][d, i, j]*1e6:<11.1f} {bound:<9} "
+                      f"{r['effective_tflops'][d, i, j]:<13.1f} {r['speedup'][d, i, j]:<9.2f} "
+                      f"{r['total_power_w'][d, i, j]:<11.1f} {r['energy_j'][d, i, j]*1e3:<12.3f}")
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for j, name in enumerate(sparsity):
+        for d, (design, style) in enumerate(zip(designs, ('--', '-'))):
+            axes[0].plot(tokens, r['effective_tflops'][d, :, j], linestyle=style, marker='o',
+                         linewidth=2, label=f'{name} ({design})',
+                         color=f'C{j}')
+            axes[1].plot(tokens, r['energy_j'][d, :, j] / tokens * 1e6, linestyle=style,
+                         marker='o', linewidth=2, color=f'C{j}')
+    axes[0].set_ylabel('Dense-Equivalent TFLOPS', fontsize=12)
+    axes[0].set_title(f'Sparse GEMM Throughput ({precision.value})', fontsize=14, fontweight='bold')
+    axes[1].set_ylabel('Energy per Token (uJ)', fontsize=12)
+    axes[1].set_title('Energy per Token', fontsize=14, fontweight='bold')
+    for ax in axes:
+        ax.set_xlabel('Tokens per GEMM', fontsize=12)
+        ax.set_xscale('log', base=2)
+        ax.grid(True, alpha=0.3)
+    axes[1].set_yscale('log')
+    axes[0].legend(fontsize=8)
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'sparsity.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Sparsity plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Chrome-Trace Timeline Export
+
+Printed tables and PNGs say how long a simulated step takes, not why.
+This module writes the simulated timeline in Chrome trace JSON (object
+format), which chrome://tracing and Perfetto (ui.perfetto.dev) open
+directly:
+
+- TraceWriter streams events to disk: events are formatted into a
+  buffer of at most buffer_events entries, which is flushed when full,
+  so memory stays flat for multi-million-event timelines
+- Tracks are (process, thread) name pairs; pid/tid numbers and the
+  process_name/thread_name metadata are assigned on first use
+- complete_array(), counter_array() and async_array() take NumPy
+  arrays, so models that produce per-event arrays are exported without
+  building an event object per element
+- Adapters lay out events from the time-based models: serving
+  iterations and request lifetimes (serving_simulator.py), a pipelined
+  training step (training_model.py) and double-buffered PCIe chunks
+  (host_transfer.py)
+
+Timestamps are seconds in the API and microseconds in the file.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import json
+import numpy as np
+from typing import Dict, Tuple
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+import profiling
+from performance_model import SoCConfig
+from memory_footprint import MemoryFootprintModel, LLAMA_8B, LLAMA_70B, LLAMA_405B
+from serving_simulator import ServingSimulator, synthetic_trace
+from training_model import TrainingModel
+from host_transfer import HostTransferModel, TOKEN_ID_BYTES
+
+
+DEFAULT_BUFFER_EVENTS = 65536
+DEMO_REQUESTS = 15_000  # Serving demo size; larger runs are opt-in via --requests
+
+Track = Tuple[str, str]  # (process name, thread name)
+
+
+class TraceWriter:
+    """Streaming Chrome trace JSON writer with a bounded event buffer"""
+
+    def __init__(self, path: str, buffer_events: int = DEFAULT_BUFFER_EVENTS):
+        """
+        Args:
+            path: Output .json file
+            buffer_events: Events held in memory before a flush
+        """
+        if buffer_events < 1:
+            raise ValueError(f"Buffer must hold at least one event, got {buffer_events}")
+        self.path = path
+        self.buffer_events = buffer_events
+        self.events_written = 0
+        self._buffer = []
+        self._processes: Dict[str, int] = {}
+        self._tracks: Dict[Track, Tuple[int, int]] = {}
+        self._names: Dict[str, str] = {}
+        self._first = True
+        self._file = open(path, 'w')
+        self._file.write('{"traceEvents":[\n')
+
+    def __enter__(self) -> 'TraceWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _quote(self, name: str) -> str:
+        """JSON string literal for a name (cached)"""
+        quoted = self._names.get(name)
+        if quoted is None:
+            quoted = self._names[name] = json.dumps(name)
+        return quoted
+
+    def _emit(self, event: str) -> None:
+        self._buffer.append(event)
+        if len(self._buffer) >= self.buffer_events:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered events to the file"""
+        if not self._buffer:
+            return
+        with profiling.stage('trace_writer.flush'):
+            if not self._first:
+                self._file.write(',\n')
+            self._file.write(',\n'.join(self._buffer))
+        self.events_written += len(self._buffer)
+        self._buffer.clear()
+        self._first = False
+
+    def close(self) -> None:
+        """Flush and terminate the JSON document"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.write('\n],"displayTimeUnit":"ns"}\n')
+        self._file.close()
+
+    def process(self, name: str) -> int:
+        """pid of a named process, emitting its metadata on first use"""
+        pid = self._processes.get(name)
+        if pid is None:
+            pid = self._processes[name] = len(self._processes) + 1
+            self._emit(f'{{"name":"process_name","ph":"M","pid":{pid},'
+                       f'"args":{{"name":{self._quote(name)}}}}}')
+        return pid
+
+    def track(self, track: Track) -> Tuple[int, int]:
+        """(pid, tid) of a (process, thread) track, emitting metadata on first use"""
+        ids = self._tracks.get(track)
+        if ids is None:
+            pid = self.process(track[0])
+            tid = sum(1 for p, _ in self._tracks if p == track[0]) + 1
+            ids = self._tracks[track] = (pid, tid)
+            self._emit(f'{{"name":"thread_name","ph":"M","pid":{pid},"tid":{tid},'
+                       f'"args":{{"name":{self._quote(track[1])}}}}}')
+            self._emit(f'{{"name":"thread_sort_index","ph":"M","pid":{pid},"tid":{tid},'
+                       f'"args":{{"sort_index":{tid}}}}}')
+        return ids
+
+    def complete(self, name: str, start_s: float, duration_s: float, track: Track,
+                 category: str = 'sim', args: Dict = None) -> None:
+        """One duration ('X') event"""
+        pid, tid = self.track(track)
+        event = (f'{{"name":{self._quote(name)},"cat":{self._quote(category)},"ph":"X",'
+                 f'"ts":{start_s * 1e6:.3f},"dur":{duration_s * 1e6:.3f},"pid":{pid},"tid":{tid}')
+        if args:
+            event += f',"args":{json.dumps(args)}'
+        self._emit(event + '}')
+
+    def instant(self, name: str, time_s: float, track: Track, category: str = 'sim') -> None:
+        """One instant ('i') event on a thread"""
+        pid, tid = self.track(track)
+        self._emit(f'{{"name":{self._quote(name)},"cat":{self._quote(category)},"ph":"i","s":"t",'
+                   f'"ts":{time_s * 1e6:.3f},"pid":{pid},"tid":{tid}}}')
+
+    def counter(self, name: str, time_s: float, values: Dict[str, float], process: str) -> None:
+        """One counter ('C') sample; each key is a series"""
+        pid = self.process(process)
+        self._emit(f'{{"name":{self._quote(name)},"ph":"C","ts":{time_s * 1e6:.3f},'
+                   f'"pid":{pid},"args":{json.dumps(values)}}}')
+
+    def complete_array(self, name: str, start_s: np.ndarray, duration_s: np.ndarray,
+                       track: Track, category: str = 'sim',
+                       args: Dict[str, np.ndarray] = None) -> None:
+        """Duration events from arrays (one per element), formatted a buffer at a time"""
+        pid, tid = self.track(track)
+        head = f'{{"name":{self._quote(name)},"cat":{self._quote(category)},"ph":"X","ts":'
+        tail = f',"pid":{pid},"tid":{tid}'
+        start, duration = np.broadcast_arrays(np.asarray(start_s, dtype=float) * 1e6,
+                                              np.asarray(duration_s, dtype=float) * 1e6)
+        keys = [self._quote(k) for k in (args or {})]
+        columns = [np.broadcast_to(v, start.shape) for v in (args or {}).values()]
+        for lo in range(0, start.size, self.buffer_events):
+            hi = lo + self.buffer_events
+            rows = zip(start[lo:hi].tolist(), duration[lo:hi].tolist(),
+                       *(c[lo:hi].tolist() for c in columns))
+            for ts, dur, *values in rows:
+                event = f'{head}{ts:.3f},"dur":{dur:.3f}{tail}'
+                if keys:
+                    event += ',"args":{' + ','.join(f'{k}:{v}' for k, v in zip(keys, values)) + '}'
+                self._emit(event + '}')
+
+    def counter_array(self, name: str, time_s: np.ndarray, values: Dict[str, np.ndarray],
+                      process: str) -> None:
+        """Counter samples from arrays; each key is a series"""
+        pid = self.process(process)
+        head = f'{{"name":{self._quote(name)},"ph":"C","pid":{pid},"ts":'
+        times = np.asarray(time_s, dtype=float) * 1e6
+        keys = [self._quote(k) for k in values]
+        columns = [np.broadcast_to(v, times.shape) for v in values.values()]
+        for lo in range(0, times.size, self.buffer_events):
+            hi = lo + self.buffer_events
+            for ts, *row in zip(times[lo:hi].tolist(), *(c[lo:hi].tolist() for c in columns)):
+                self._emit(f'{head}{ts:.3f},"args":{{' +
+                           ','.join(f'{k}:{v}' for k, v in zip(keys, row)) + '}}')
+
+    def async_array(self, name: str, ids: np.ndarray, start_s: np.ndarray, end_s: np.ndarray,
+                    process: str, category: str = 'async') -> None:
+        """Overlapping spans (async 'b'/'e' pairs), e.g. request lifetimes"""
+        pid = self.process(process)
+        head = f'{{"name":{self._quote(name)},"cat":{self._quote(category)},"pid":{pid},"id":'
+        ids, start, end = np.broadcast_arrays(np.asarray(ids), np.asarray(start_s, dtype=float) * 1e6,
+                                              np.asarray(end_s, dtype=float) * 1e6)
+        for lo in range(0, ids.size, self.buffer_events):
+            hi = lo + self.buffer_events
+            for i, b, e in zip(ids[lo:hi].tolist(), start[lo:hi].tolist(), end[lo:hi].tolist()):
+                self._emit(f'{head}{i},"ph":"b","ts":{b:.3f}}}')
+                self._emit(f'{head}{i},"ph":"e","ts":{e:.3f}}}')
+
+
+def write_serving_timeline(writer: TraceWriter, result: Dict[str, np.ndarray],
+                           process: str = 'Serving', requests: bool = True) -> None:
+    """
+    Scheduler iterations, batch counters and request lifetimes
+
+    Args:
+        writer: Open trace writer
+        result: Output of ServingSimulator.simulate()
+        process: Process name for the tracks
+        requests: Also emit queue+prefill and decode spans per request
+    """
+    start, end = result['step_start_s'], result['step_end_s']
+    writer.complete_array('Iteration', start, end - start, (process, 'Scheduler'), 'iteration',
+                          {'decode_batch': result['decode_batch'],
+                           'batched_tokens': result['batched_tokens']})
+    writer.counter_array('Batch', start, {'decode_batch': result['decode_batch'],
+                                          'batched_tokens': result['batched_tokens']}, process)
+    if requests:
+        ids = np.arange(len(result['arrival_s']))
+        first_token = result['arrival_s'] + result['ttft_s']
+        writer.async_array('Queue + prefill', ids, result['arrival_s'], first_token, process, 'request')
+        writer.async_array('Decode', ids, first_token, result['finish_s'], process, 'request')
+
+
+def write_training_step(writer: TraceWriter, training: TrainingModel, breakdown: Dict[str, float],
+                        start_s: float = 0.0, process: str = 'Training') -> float:
+    """
+    One optimizer step of the slowest pipeline stage's schedule on every stage
+
+    Forward passes of all microbatches flow down the pipeline, then
+    backward passes flow back (same bubble as 1F1B). Each pass is split
+    into compute, TP all-reduce and the stage-boundary transfer; the DP
+    gradient all-reduce overlaps the last backward and the optimizer
+    update follows.
+
+    Args:
+        writer: Open trace writer
+        training: Model that produced the breakdown
+        breakdown: One row of TrainingModel.step_time() (scalars)
+        start_s: Start time of the step
+        process: Process name for the tracks
+
+    Returns:
+        End time of the step
+    """
+    pp, microbatches = int(breakdown['pp']), int(breakdown['microbatches'])
+    passes = 4 if training.activation_recompute else 3
+    compute = breakdown['compute_s'] / microbatches
+    tp_comm = breakdown['tp_comm_s'] / microbatches
+    pp_comm = breakdown['pp_comm_s'] / microbatches
+    slot = compute + tp_comm + pp_comm
+    waves = microbatches + pp - 1
+    # Shares of (compute, TP all-reduces, PP transfers): forward is one compute
+    # pass with 2 of the 2 * (passes - 1) all-reduces per layer, and one of
+    # the two boundary transfers
+    tp_forward = 1 / (passes - 1)
+    shares = {'Forward': (1 / passes, tp_forward, 0.5),
+              'Backward': ((passes - 1) / passes, 1 - tp_forward, 0.5)}
+    phase_slot = {name: compute * c + tp_comm * t + pp_comm * p for name, (c, t, p) in shares.items()}
+    phase_start = {'Forward': start_s, 'Backward': start_s + waves * phase_slot['Forward']}
+
+    for stage in range(pp):
+        compute_track = (process, f'Stage {stage} compute')
+        comm_track = (process, f'Stage {stage} comm')
+        for name, (c, t, p) in shares.items():
+            # Backward runs the pipeline in reverse
+            order = stage if name == 'Forward' else pp - 1 - stage
+            slots = phase_start[name] + (np.arange(microbatches) + order) * phase_slot[name]
+            writer.complete_array(name, slots, compute * c, compute_track, 'compute',
+                                  {'microbatch': np.arange(microbatches)})
+            if tp_comm > 0:
+                writer.complete_array('TP all-reduce', slots + compute * c, tp_comm * t,
+                                      comm_track, 'nvlink')
+            if pp_comm > 0:
+                writer.complete_array('PP send/recv', slots + compute * c + tp_comm * t,
+                                      pp_comm * p, comm_track, 'nvlink')
+
+    pipeline_end = start_s + waves * slot
+    # DP all-reduce overlaps the last backward; only its tail past the pipeline is exposed
+    if breakdown['dp'] > 1:
+        backward = compute * 2 / passes
+        for stage in range(pp):
+            writer.complete('DP all-reduce', pipeline_end - backward,
+                            backward + breakdown['dp_exposed_s'], (process, f'Stage {stage} comm'),
+                            'nvlink', {'exposed_ms': breakdown['dp_exposed_s'] * 1e3})
+    optimizer_start = pipeline_end + breakdown['dp_exposed_s']
+    for stage in range(pp):
+        writer.complete('Optimizer', optimizer_start, breakdown['optimizer_s'],
+                        (process, f'Stage {stage} compute'), 'hbm')
+    return optimizer_start + breakdown['optimizer_s']
+
+
+def write_host_transfer_step(writer: TraceWriter, transfers: HostTransferModel, compute_s: float,
+                             h2d_bytes: float, d2h_bytes: float, chunks: int,
+                             double_buffered: bool = True, start_s: float = 0.0,
+                             process: str = 'PCIe') -> float:
+    """
+    Chunked H2D -> compute -> D2H pipeline of one step
+
+    With double buffering, chunk k+1 is copied in while chunk k computes
+    (at most two chunks resident); otherwise each chunk's copy-in, compute
+    and copy-out run back to back.
+
+    Args:
+        writer: Open trace writer
+        transfers: PCIe model (scalar config)
+        compute_s: Device compute time per step
+        h2d_bytes: Host-to-device bytes per step
+        d2h_bytes: Device-to-host bytes per step
+        chunks: DMA transfers per direction
+        double_buffered: Overlap transfers with compute
+        start_s: Start time of the step
+        process: Process name for the tracks
+
+    Returns:
+        End time of the step
+    """
+    h2d = float(transfers.transfer_time(h2d_bytes / chunks))
+    d2h = float(transfers.transfer_time(d2h_bytes / chunks))
+    compute = compute_s / chunks
+    buffers = 2 if double_buffered else 1
+    h2d_end = [start_s] * chunks
+    compute_end = [start_s] * chunks
+    d2h_end = start_s
+    for k in range(chunks):
+        # The copy-in needs the link and a free buffer
+        link_free = h2d_end[k - 1] if k > 0 else start_s
+        buffer_free = compute_end[k - buffers] if k >= buffers else start_s
+        if not double_buffered and k > 0:
+            buffer_free = max(buffer_free, d2h_end)
+        h2d_start = max(link_free, buffer_free)
+        h2d_end[k] = h2d_start + h2d
+        compute_start = max(h2d_end[k], compute_end[k - 1] if k > 0 else start_s)
+        compute_end[k] = compute_start + compute
+        d2h_start = max(compute_end[k], d2h_end)
+        d2h_end = d2h_start + d2h
+        writer.complete('H2D', h2d_start, h2d, (process, 'PCIe H2D'), 'pcie', {'chunk': k})
+        writer.complete('Compute', compute_start, compute, (process, 'SMs'), 'compute', {'chunk': k})
+        writer.complete('D2H', d2h_start, d2h, (process, 'PCIe D2H'), 'pcie', {'chunk': k})
+    return max(compute_end[-1], d2h_end)
+
+
+def main():
+    """Timelines of serving, training and PCIe streaming on the baseline SoC"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--requests', type=int, default=DEMO_REQUESTS,
+                        help=f'Serving requests to trace (default {DEMO_REQUESTS:,}, ~25 MB; '
+                             f'200,000 writes ~350 MB)')
+    args = parser.parse_args()
+
+    print("=" * 100)
+    print("NexGen-AI SoC Timeline Export (Chrome trace JSON)")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    os.makedirs(outputs_dir, exist_ok=True)
+
+    # Serving: every iteration, batch counter and request lifetime
+    num_requests = args.requests
+    result = ServingSimulator(soc, LLAMA_8B).simulate(synthetic_trace(num_requests, 4.0))
+    path = os.path.join(outputs_dir, 'serving_trace.json')
+    start = time.perf_counter()
+    with TraceWriter(path) as writer:
+        write_serving_timeline(writer, result)
+    elapsed = time.perf_counter() - start
+    print(f"\n{LLAMA_8B.name} serving, {num_requests:,} requests, {result['iterations']:,} iterations")
+    print(f"  {writer.events_written:,} events, {os.path.getsize(path) / 1e6:.0f} MB in {elapsed:.1f} s "
+          f"({writer.events_written / elapsed / 1e6:.2f} M events/s, "
+          f"buffer {writer.buffer_events:,} events)")
+    print(f"✓ Serving trace saved: {path}")
+
+    # Training: fastest 70B split on 1024 SoCs
+    training = TrainingModel(soc, LLAMA_70B, activation_recompute=True)
+    r = training.search(1024, 1024)
+    # Fastest split that fits and uses pipeline parallelism
+    index = np.flatnonzero(r['fits'] & (r['pp'] > 1))[0]
+    best = {name: values[index].item() for name, values in r.items()}
+    path = os.path.join(outputs_dir, 'training_trace.json')
+    with TraceWriter(path) as writer:
+        end = 0.0
+        for _ in range(2):
+            end = write_training_step(writer, training, best, end)
+    print(f"\n{LLAMA_70B.name} training (fastest pipelined split), DP/TP/PP {best['dp']}/{best['tp']}/{best['pp']}, "
+          f"{best['microbatches']} microbatches: two steps, {end:.2f} s "
+          f"(model step {best['step_time_s']:.2f} s), {writer.events_written:,} events")
+    print(f"✓ Training trace saved: {path}")
+
+    # PCIe: 405B decode with streamed weights, single vs double buffered
+    transfers = HostTransferModel(soc)
+    footprint = MemoryFootprintModel(soc, LLAMA_405B)
+    batch, context = 32, 8192
+    step = transfers.inference_step(LLAMA_405B, batch, context)
+    h2d = float(step['weight_stream_bytes'] + batch * TOKEN_ID_BYTES)
+    d2h = batch * TOKEN_ID_BYTES
+    chunks = LLAMA_405B.num_layers
+    compute = float(footprint.decode_step(batch, context)['step_time_s'])
+    path = os.path.join(outputs_dir, 'host_transfer_trace.json')
+    print(f"\n{LLAMA_405B.name} decode, batch {batch}: {h2d / 1e9:.1f} GB streamed per step, "
+          f"compute {compute * 1e3:.1f} ms")
+    with TraceWriter(path) as writer:
+        for double_buffered in (False, True):
+            label = 'Double buffered' if double_buffered else 'Single buffered'
+            end = 0.0
+            for _ in range(3):
+                end = write_host_transfer_step(writer, transfers, compute, h2d, d2h, chunks,
+                                               double_buffered, end, label)
+            modeled = float(transfers.step(compute, h2d, d2h, chunks, double_buffered)['step_s'])
+            print(f"  {label}: 3 steps in {end * 1e3:.1f} ms (model: {modeled * 3e3:.1f} ms)")
+    print(f"✓ Host-transfer trace saved: {path}")
+    print("\nOpen the .json files in ui.perfetto.dev or chrome://tracing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Distributed Training Step-Time Model
+
+Splits a transformer over data (DP), tensor (TP) and pipeline (PP)
+parallel groups of SoCs and estimates the training step time:
+
+1. Per-device compute from the roofline (stage FLOPs vs weight and
+   activation traffic), Megatron-style sharding of every layer over TP
+2. Communication over NVLink (nvlink_lanes x nvlink_bandwidth_gbps_per_lane
+   per SoC): TP all-reduces on the critical path, PP activation sends,
+   and the DP gradient all-reduce overlapped with the last backward pass
+3. 1F1B pipeline schedule: (microbatches + PP - 1) stage slots per step
+4. Memory feasibility: weights, gradients, Adam state (optionally
+   sharded over DP) and in-flight activations against HBM capacity
+
+All valid (DP, TP, PP) factorizations of a device count are evaluated
+as arrays in one pass.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import SoCConfig, PerformanceModel, Precision, BYTES_PER_ELEMENT
+from memory_footprint import TransformerConfig, LLAMA_8B, LLAMA_70B
+
+
+# Adam with FP32 master weights: master + first and second moments
+OPTIMIZER_BYTES_PER_PARAM = 12
+# Stored activations per token per layer in units of hidden size x 16-bit
+# element (fused attention, sequence parallel; Korthikanti et al. 2022)
+ACTIVATION_ELEMENTS_PER_HIDDEN = 17
+
+
+def parallel_factorizations(num_devices: int, model: TransformerConfig,
+                            global_batch: int, micro_batch: int = 1) -> Dict[str, np.ndarray]:
+    """
+    All (DP, TP, PP) splits of a device count that the model and batch allow
+
+    TP must divide the attention heads, PP may not exceed the layer count,
+    and the global batch must split into whole microbatches per replica.
+
+    Args:
+        num_devices: Total SoCs
+        model: Transformer shape
+        global_batch: Sequences per optimizer step
+        micro_batch: Sequences per microbatch
+
+    Returns:
+        Dictionary of integer arrays 'dp', 'tp', 'pp'
+    """
+    divisors = np.arange(1, num_devices + 1)
+    divisors = divisors[num_devices % divisors == 0]
+    tp, pp = (a.ravel() for a in np.meshgrid(divisors, divisors, indexing='ij'))
+    valid = num_devices % (tp * pp) == 0
+    dp = np.where(valid, num_devices // (tp * pp), 1)
+    valid &= ((model.num_heads % tp == 0) & (pp <= model.num_layers) &
+              (global_batch % (dp * micro_batch) == 0))
+    return {'dp': dp[valid], 'tp': tp[valid], 'pp': pp[valid]}
+
+
+class TrainingModel:
+    """Training step time of one transformer on a cluster of SoCs"""
+
+    def __init__(self, soc_config: SoCConfig, model: TransformerConfig,
+                 precision: Precision = Precision.BF16,
+                 seq_len: int = 4096,
+                 micro_batch: int = 1,
+                 activation_recompute: bool = False,
+                 shard_optimizer: bool = True,
+                 compute_efficiency: float = 0.75,
+                 comm_efficiency: float = 0.8,
+                 link_latency_us: float = 2.0):
+        """
+        Args:
+            soc_config: SoC configuration (one SoC per device)
+            model: Transformer shape
+            precision: Compute, weight and gradient precision
+            seq_len: Tokens per sequence
+            micro_batch: Sequences per microbatch
+            activation_recompute: Recompute activations in the backward pass
+            shard_optimizer: Shard Adam state over DP (ZeRO-1)
+            compute_efficiency: Achieved fraction of the roofline
+            comm_efficiency: Achieved fraction of NVLink bandwidth
+            link_latency_us: Per-hop latency of a collective step
+        """
+        self.config = soc_config
+        self.model = model
+        self.precision = precision
+        self.seq_len = seq_len
+        self.micro_batch = micro_batch
+        self.activation_recompute = activation_recompute
+        self.shard_optimizer = shard_optimizer
+        self.compute_efficiency = compute_efficiency
+        self.link_bytes_per_s = (soc_config.nvlink_lanes * soc_config.nvlink_bandwidth_gbps_per_lane *
+                                 1e9 * comm_efficiency)
+        self.link_latency_s = link_latency_us * 1e-6
+        self.perf_model = PerformanceModel(soc_config)
+
+    def all_reduce_time(self, bytes_per_device: np.ndarray, group: np.ndarray) -> np.ndarray:
+        """Ring all-reduce: 2(n-1) steps each moving 1/n of the buffer"""
+        steps = 2 * (group - 1)
+        return steps * (bytes_per_device / group / self.link_bytes_per_s + self.link_latency_s)
+
+    def step_time(self, dp: np.ndarray, tp: np.ndarray, pp: np.ndarray,
+                  global_batch: int) -> Dict[str, np.ndarray]:
+        """
+        Step time breakdown for arrays of parallel splits
+
+        The slowest pipeline stage (ceil(layers / PP) layers plus the LM
+        head) sets the pace of the 1F1B schedule.
+
+        Args:
+            dp: Data-parallel degree(s)
+            tp: Tensor-parallel degree(s)
+            pp: Pipeline-parallel degree(s)
+            global_batch: Sequences per optimizer step
+
+        Returns:
+            Dictionary of arrays broadcast over the splits
+        """
+        m = self.model
+        dp, tp, pp = (np.asarray(a) for a in (dp, tp, pp))
+        elem = BYTES_PER_ELEMENT[self.precision]
+        tokens = self.micro_batch * self.seq_len
+        microbatches = global_batch // (dp * self.micro_batch)
+        passes = 4 if self.activation_recompute else 3   # fwd, (recompute), 2x bwd
+        layers = -(-m.num_layers // pp)
+
+        # Bottleneck stage: its layers plus the LM head (last stage)
+        head_params = m.vocab_size * m.hidden_size
+        stage_params = layers * m.params_per_layer + head_params
+        attention_flops = 2 * m.num_heads * m.head_dim * self.seq_len  # per token per layer, causal
+        forward_flops = tokens * (2 * stage_params + layers * attention_flops)
+        flops = passes * forward_flops / tp
+
+        act_bytes_per_layer = ACTIVATION_ELEMENTS_PER_HIDDEN * m.hidden_size * elem
+        traffic = passes * (stage_params * elem + layers * tokens * act_bytes_per_layer) / tp
+        intensity = flops / traffic
+        achieved = self.perf_model.roofline_performance(np.atleast_1d(intensity), self.precision)
+        achieved = achieved.reshape(np.shape(intensity)) * self.compute_efficiency
+        compute = flops / (achieved * 1e12)
+
+        # TP: two all-reduces of the layer activations per layer in the forward,
+        # the backward and the recompute (backward FLOPs count twice, not its comm)
+        activation_bytes = tokens * m.hidden_size * elem
+        tp_all_reduces = 2 * (passes - 1)
+        tp_comm = np.where(tp > 1, tp_all_reduces * layers * self.all_reduce_time(activation_bytes, tp), 0.0)
+        # PP: forward activations and backward gradients cross each stage boundary
+        pp_comm = np.where(pp > 1, 2 * (activation_bytes / self.link_bytes_per_s + self.link_latency_s), 0.0)
+        slot = compute + tp_comm + pp_comm
+
+        # DP: gradient all-reduce, overlapped with the last microbatch's backward
+        grad_bytes = stage_params / tp * elem
+        dp_comm = np.where(dp > 1, self.all_reduce_time(grad_bytes, dp), 0.0)
+        backward = compute * 2 / passes
+        dp_exposed = np.maximum(dp_comm - backward, 0.0)
+
+        # Memory-bound optimizer update (read and write master weights and moments)
+        params_per_device = stage_params / tp
+        optimizer_bytes = params_per_device * OPTIMIZER_BYTES_PER_PARAM
+        if self.shard_optimizer:
+            optimizer_bytes = optimizer_bytes / dp
+        optimizer = 2 * optimizer_bytes / (self.perf_model.memory_bandwidth_tbps() * 1e12)
+
+        bubble = (pp - 1) * slot
+        step = microbatches * slot + bubble + dp_exposed + optimizer
+
+        # First stage holds activations of min(PP, microbatches) microbatches under 1F1B
+        in_flight = np.minimum(pp, microbatches)
+        if self.activation_recompute:
+            stored = layers * tokens * m.hidden_size * elem / tp  # Layer inputs only
+        else:
+            stored = layers * tokens * act_bytes_per_layer / tp
+        memory = (params_per_device * 2 * elem + optimizer_bytes + in_flight * stored)
+
+        step_tokens = global_batch * self.seq_len
+        model_flops = 6 * m.num_params * step_tokens  # Excludes recompute
+        num_devices = dp * tp * pp
+        peak = self.perf_model.peak_compute(self.precision) * 1e12
+        arrays = np.broadcast_arrays(dp, tp, pp, microbatches, step, microbatches * compute,
+                                     microbatches * tp_comm, microbatches * pp_comm, bubble,
+                                     dp_exposed, optimizer, memory)
+        dp, tp, pp, microbatches, step, compute, tp_comm, pp_comm, bubble, dp_exposed, optimizer, memory = arrays
+        return {
+            'dp': dp, 'tp': tp, 'pp': pp,
+            'microbatches': microbatches,
+            'step_time_s': step,
+            'compute_s': compute,
+            'tp_comm_s': tp_comm,
+            'pp_comm_s': pp_comm,
+            'bubble_s': bubble,
+            'dp_exposed_s': dp_exposed,
+            'optimizer_s': optimizer,
+            'bubble_fraction': bubble / step,
+            'tokens_per_s': step_tokens / step,
+            'mfu': model_flops / (num_devices * peak * step),
+            'memory_gb': memory / 1e9,
+            'fits': memory <= self.config.total_hbm_capacity_gb * 1e9,
+        }
+
+    def search(self, num_devices: int, global_batch: int,
+               total_tokens: float = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every valid factorization of a device count
+
+        Args:
+            num_devices: Total SoCs
+            global_batch: Sequences per optimizer step
+            total_tokens: Training tokens for time-to-train (optional)
+
+        Returns:
+            step_time() arrays sorted fastest first (configs that do not
+            fit in HBM last), with 'time_to_train_days' when total_tokens
+            is given
+        """
+        splits = parallel_factorizations(num_devices, self.model, global_batch, self.micro_batch)
+        result = self.step_time(splits['dp'], splits['tp'], splits['pp'], global_batch)
+        if total_tokens is not None:
+            result['time_to_train_days'] = total_tokens / result['tokens_per_s'] / 86400
+        order = np.lexsort((result['step_time_s'], ~result['fits']))
+        return {name: values[order] for name, values in result.items()}
+
+
+def main():
+    """Best DP/TP/PP splits for 8B and 70B training on the baseline SoC"""
+    print("=" * 100)
+    print("NexGen-AI SoC Distributed Training Model")
+    print("=" * 100)
+
+    soc = SoCConfig()
+    link = soc.nvlink_lanes * soc.nvlink_bandwidth_gbps_per_lane
+    print(f"\nPer SoC: {PerformanceModel(soc).peak_compute(Precision.BF16):.1f} BF16 TFLOPS, "
+          f"{soc.total_hbm_capacity_gb} GB HBM, NVLink {link} GB/s")
+
+    cases = [
+        (LLAMA_8B, 256, 512, 2e12, False),
+        (LLAMA_70B, 1024, 1024, 2e12, True),
+    ]
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for ax, (model, devices, batch, tokens, recompute) in zip(axes, cases):
+        training = TrainingModel(soc, model, activation_recompute=recompute)
+        r = training.search(devices, batch, tokens)
+        print(f"\n{model.name}: {devices} SoCs, global batch {batch} x {training.seq_len} tokens, "
+              f"{tokens/1e12:.0f}T tokens, recompute {'on' if recompute else 'off'} "
+              f"({len(r['dp'])} factorizations, {int(r['fits'].sum())} fit in HBM)")
+        print(f"\n{'DP':<6} {'TP':<5} {'PP':<5} {'Step (s)':<10} {'Compute':<9} {'TP comm':<9} "
+              f"{'Bubble':<9} {'DP exp.':<9} {'MFU':<7} {'Mem (GB)':<10} {'Days':<8}")
+        print("-" * 95)
+        for i in range(min(10, len(r['dp']))):
+            print(f"{r['dp'][i]:<6} {r['tp'][i]:<5} {r['pp'][i]:<5} {r['step_time_s'][i]:<10.2f} "
+                  f"{r['compute_s'][i]:<9.2f} {r['tp_comm_s'][i]:<9.2f} {r['bubble_s'][i]:<9.2f} "
+                  f"{r['dp_exposed_s'][i]:<9.2f} {r['mfu'][i]*100:<7.1f} {r['memory_gb'][i]:<10.1f} "
+                  f"{r['time_to_train_days'][i]:<8.1f}" + ("" if r['fits'][i] else "  (exceeds HBM)"))
+
+        # Step-time breakdown of the fastest configurations that fit
+        top = np.flatnonzero(r['fits'])[:8]
+        labels = [f"{r['dp'][i]}/{r['tp'][i]}/{r['pp'][i]}" for i in top]
+        bottom = np.zeros(len(top))
+        for key, label in [('compute_s', 'Compute'), ('tp_comm_s', 'TP comm'),
+                           ('pp_comm_s', 'PP comm'), ('bubble_s', 'Pipeline bubble'),
+                           ('dp_exposed_s', 'Exposed DP comm'), ('optimizer_s', 'Optimizer')]:
+            ax.bar(labels, r[key][top], bottom=bottom, label=label, alpha=0.8)
+            bottom += r[key][top]
+        ax.set_xlabel('DP / TP / PP', fontsize=12)
+        ax.set_ylabel('Step Time (s)', fontsize=12)
+        ax.set_title(f'{model.name} on {devices} SoCs', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3, axis='y')
+        ax.legend(fontsize=9)
+    plt.tight_layout()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    save_path = os.path.join(outputs_dir, 'training_parallelism.png')
+    os.makedirs(outputs_dir, exist_ok=True)
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"\n✓ Training parallelism plot saved: {save_path}")
+
+
+if __name__ == "__main__":
+    main()
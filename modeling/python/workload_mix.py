@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Mixed-Precision Workload Analysis
+
+Real inference traffic is not single-precision: most GEMM FLOPs run in
+FP8/FP4 while attention softmax, norms and accumulation stay in
+FP16/BF16/FP32. This tool evaluates workload mixes given as the fraction
+of FLOPs at each Precision and reports blended TFLOPS, power and
+TFLOPS/W using the per-precision energy table in PowerModel.
+
+Blending rules (at a given utilization):
+- Each precision's FLOPs run at that precision's peak, so the blended
+  peak is the harmonic mean 1 / sum(f_p / peak_p)
+- SM power is time-weighted across precisions (equivalently, energy per
+  FLOP weighted by f_p)
+
+Mixes are arrays with a trailing precision axis, so any number of mixes
+is evaluated in one vectorized pass.
+
+Author: Architecture Team
+Date: 2026-10-19
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from typing import Dict, List
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from performance_model import (
+    SoCConfig, PerformanceModel, PowerModel,
+    Precision
+)
+from arch_exploration import (
+    create_baseline, create_realistic_optimized, create_high_sm_density,
+    create_aggressive_optimized, create_power_optimized
+)
+
+
+# Order of the trailing axis of mix arrays
+PRECISIONS = list(Precision)
+
+# Representative FLOP mixes by deployment type
+WORKLOAD_MIXES = {
+    'Training (BF16)': {Precision.BF16: 0.90, Precision.FP32: 0.10},
+    'Inference (FP16)': {Precision.FP16: 0.95, Precision.FP32: 0.05},
+    'Inference (FP8)': {Precision.FP8: 0.85, Precision.FP16: 0.12, Precision.FP32: 0.03},
+    'Inference (FP4-heavy)': {Precision.FP4: 0.70, Precision.FP8: 0.20,
+                              Precision.FP16: 0.08, Precision.FP32: 0.02},
+    'Inference (INT8)': {Precision.INT8: 0.85, Precision.FP16: 0.15},
+}
+
+
+def mix_vector(mix: Dict[Precision, float]) -> np.ndarray:
+    """Convert a {Precision: fraction} mix to a normalized vector over PRECISIONS"""
+    vector = np.array([mix.get(p, 0.0) for p in PRECISIONS], dtype=float)
+    return vector / vector.sum()
+
+
+def evaluate_mix(
+    soc: SoCConfig,
+    mixes: np.ndarray,
+    utilization: float = 1.0,
+    arithmetic_intensity: float = None,
+    power_model: PowerModel = None
+) -> Dict[str, np.ndarray]:
+    """
+    Blended throughput, power and efficiency for FLOP mixes
+
+    Args:
+        soc: SoC configuration
+        mixes: Array (..., len(PRECISIONS)) of FLOP fractions per precision
+        utilization: Compute utilization (0.0-1.0)
+        arithmetic_intensity: Optional FLOPS/Byte; caps throughput at the
+            memory roof (utilization then applies to the capped value)
+        power_model: PowerModel to use (default: PowerModel(soc))
+
+    Returns:
+        Dictionary of arrays with shape mixes.shape[:-1]
+    """
+    mixes = np.asarray(mixes, dtype=float)
+    mixes = mixes / mixes.sum(axis=-1, keepdims=True)
+    perf_model = PerformanceModel(soc)
+    power_model = power_model or PowerModel(soc)
+
+    peaks = np.array([perf_model.peak_compute(p) for p in PRECISIONS])
+    sm_peak_power = np.array([power_model.sm_power(1.0, p) for p in PRECISIONS])
+
+    time_per_flop = mixes / peaks
+    blended_peak = 1.0 / time_per_flop.sum(axis=-1)
+    busy_fraction = time_per_flop * blended_peak[..., np.newaxis]
+
+    achievable = blended_peak
+    if arithmetic_intensity is not None:
+        achievable = np.minimum(blended_peak,
+                                perf_model.memory_bandwidth_tbps() * arithmetic_intensity)
+    achieved = achievable * utilization
+    sm_util = achieved / blended_peak
+
+    power = (sm_util * (busy_fraction @ sm_peak_power) +
+             power_model.memory_system_power(utilization) +
+             power_model.static_power() +
+             power_model.interconnect_power_w +
+             power_model.io_power_w)
+
+    return {
+        'blended_peak_tflops': blended_peak,
+        'achieved_tflops': achieved,
+        'total_power_w': power,
+        'tflops_per_watt': achieved / power,
+        'energy_per_flop_pj': power / achieved,  # W / TFLOPS == pJ / FLOP
+    }
+
+
+def rank_designs(
+    socs: Dict[str, SoCConfig],
+    mixes: Dict[str, Dict[Precision, float]],
+    weights: Dict[str, float] = None,
+    utilization: float = 1.0
+) -> List[Dict]:
+    """
+    Rank designs by traffic-weighted TFLOPS/W over a set of mixes
+
+    Args:
+        socs: Design name -> SoC configuration
+        mixes: Mix name -> {Precision: FLOP fraction}
+        weights: Mix name -> share of traffic; mixes not listed get no
+            traffic (default: equal shares of every mix)
+        utilization: Compute utilization
+
+    Returns:
+        List of per-design result dicts, best first
+    """
+    names = list(mixes)
+    matrix = np.stack([mix_vector(mixes[n]) for n in names])
+    if weights is None:
+        w = np.ones(len(names))
+    else:
+        for name in weights:
+            if name not in mixes:
+                raise ValueError(f"Unknown workload mix: {name}")
+        w = np.array([weights.get(n, 0.0) for n in names], dtype=float)
+    w = w / w.sum()
+
+    results = []
+    for design, soc in socs.items():
+        r = evaluate_mix(soc, matrix, utilization)
+        # Traffic-weighted energy: total FLOPs / total joules
+        results.append({
+            'name': design,
+            'per_mix': {n: {k: float(v[i]) for k, v in r.items()} for i, n in enumerate(names)},
+            'weighted_tflops_per_watt': float(1.0 / (w / r['tflops_per_watt']).sum()),
+        })
+    return sorted(results, key=lambda x: -x['weighted_tflops_per_watt'])
+
+
+def plot_mix_sweep(soc: SoCConfig, save_path: str = None):
+    """Sweep FP4/FP8/FP16 mixes on a simplex grid (one vectorized call)"""
+    n = 201
+    fp4 = np.linspace(0, 1, n)[:, np.newaxis]
+    fp8 = np.linspace(0, 1, n)[np.newaxis, :]
+    fp16 = 1 - fp4 - fp8
+    valid = fp16 >= -1e-12
+
+    mixes = np.zeros((n, n, len(PRECISIONS)))
+    mixes[..., PRECISIONS.index(Precision.FP4)] = fp4
+    mixes[..., PRECISIONS.index(Precision.FP8)] = fp8
+    mixes[..., PRECISIONS.index(Precision.FP16)] = np.clip(fp16, 0, None)
+    mixes[~valid] = 1.0  # placeholder, masked below
+
+    r = evaluate_mix(soc, mixes)
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    for ax, (key, label) in zip(axes, [('achieved_tflops', 'Blended TFLOPS'),
+                                       ('tflops_per_watt', 'TFLOPS/W')]):
+        data = np.where(valid, r[key], np.nan)
+        mesh = ax.pcolormesh(fp8.ravel(), fp4.ravel(), data, shading='auto', cmap='viridis')
+        plt.colorbar(mesh, ax=ax, label=label)
+        ax.set_xlabel('FP8 Fraction of FLOPs', fontsize=11)
+        ax.set_ylabel('FP4 Fraction of FLOPs', fontsize=11)
+        ax.set_title(f'{label} vs Precision Mix (remainder FP16)', fontsize=12, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+
+    if save_path:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.close()
+        print(f"\n✓ Workload mix plot saved: {save_path}")
+    else:
+        plt.show()
+
+
+def main():
+    """Rank architecture variants for mixed-precision traffic"""
+    print("=" * 100)
+    print("NexGen-AI SoC Mixed-Precision Workload Analysis")
+    print("=" * 100)
+
+    variants = [
+        create_baseline(),
+        create_realistic_optimized(),
+        create_high_sm_density(),
+        create_aggressive_optimized(),
+        create_power_optimized(),
+    ]
+    socs = {v.name: v.soc_config for v in variants}
+
+    power_model = PowerModel(variants[0].soc_config)
+    print(f"\n{'Precision':<12} {'Energy/op (pJ)':<16}")
+    print("-" * 30)
+    for p in PRECISIONS:
+        print(f"{p.value:<12} {power_model.energy_per_op_pj[p]:<16.2f}")
+
+    traffic = {'Training (BF16)': 0.2, 'Inference (FP8)': 0.4, 'Inference (FP4-heavy)': 0.4}
+    ranking = rank_designs(socs, WORKLOAD_MIXES, weights=traffic)
+
+    print("\n" + "=" * 100)
+    print("TFLOPS/W BY WORKLOAD MIX")
+    print("=" * 100)
+    mix_names = list(WORKLOAD_MIXES)
+    print(f"\n{'Variant':<25}" + ''.join(f"{n:<22}" for n in mix_names))
+    print("-" * 135)
+    for r in ranking:
+        print(f"{r['name']:<25}" + ''.join(
+            f"{r['per_mix'][n]['tflops_per_watt']:<22.2f}" for n in mix_names))
+
+    print("\n" + "=" * 100)
+    print("RANKING (traffic: " + ', '.join(f"{k} {v:.0%}" for k, v in traffic.items()) + ")")
+    print("=" * 100)
+    print(f"\n{'Rank':<6} {'Variant':<25} {'Weighted TFLOPS/W':<20} "
+          f"{'FP4-heavy TFLOPS':<18} {'FP4-heavy Power (W)':<20}")
+    print("-" * 100)
+    for i, r in enumerate(ranking, 1):
+        fp4 = r['per_mix']['Inference (FP4-heavy)']
+        print(f"{i:<6} {r['name']:<25} {r['weighted_tflops_per_watt']:<20.2f} "
+              f"{fp4['achieved_tflops']:<18.1f} {fp4['total_power_w']:<20.1f}")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs_dir = os.path.join(script_dir, '..', '..', 'outputs')
+    plot_mix_sweep(create_aggressive_optimized().soc_config,
+                   save_path=os.path.join(outputs_dir, 'workload_mix.png'))
+
+
+if __name__ == "__main__":
+    main()